@@ -14,6 +14,7 @@ from .api import app as api_app
 from .api import clear_agents, register_agent_instance
 
 # Utilities
+from .cache import AsyncCache, CacheStats, LRUCache, SQLiteCache
 from .config import Config
 
 # Confidence Calculation
@@ -38,13 +39,31 @@ from .compression import (
 )
 
 # Database
-from .database import DBConnectionError, Database, DatabaseError, QueryError
+from .database import (
+    BulkLoadResult,
+    DBConnectionError,
+    Database,
+    DatabaseError,
+    PriceMatrix,
+    QueryError,
+    TickerIndex,
+)
 
 # LLM and RAG
-from .llm import APIError, LLMClient, LLMError, RateLimitError
+from .llm import (
+    APIError,
+    LLMClient,
+    LLMError,
+    RateLimitError,
+    aclose_llm_clients,
+    capture_tokens,
+    get_llm_cache,
+)
+from .metrics import LatencyTracker
 from .models import AgentConfig, DatabaseConfig, LLMConfig, RAGConfig, Signal
 from .rag import RAGError, RAGSystem
 from .utils import calculate_sentiment_score, format_fundamentals, parse_llm_signal
+from .vector_index import ExactIndex, IVFIndex, VectorIndex
 
 __all__ = [
     # Core
@@ -58,8 +77,21 @@ __all__ = [
     "Config",
     # Components
     "LLMClient",
+    "aclose_llm_clients",
+    "capture_tokens",
+    "get_llm_cache",
     "RAGSystem",
+    "VectorIndex",
+    "ExactIndex",
+    "IVFIndex",
     "Database",
+    "TickerIndex",
+    "BulkLoadResult",
+    "PriceMatrix",
+    "AsyncCache",
+    "LRUCache",
+    "SQLiteCache",
+    "CacheStats",
     # Exceptions
     "LLMError",
     "APIError",
@@ -76,6 +108,7 @@ __all__ = [
     "parse_llm_signal",
     "format_fundamentals",
     "calculate_sentiment_score",
+    "LatencyTracker",
     # Confidence
     "ConfidenceCalculator",
     "EnhancedConfidenceCalculator",
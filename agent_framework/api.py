@@ -1,18 +1,34 @@
 """FastAPI REST API with dependency injection and proper error handling."""
 
+import asyncio
+import json
 import logging
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from .config import Config
 from .database import DBConnectionError
-from .database import Database, DatabaseError
+from .database import Database, DatabaseError, TickerIndex
+from .llm import (
+    aclose_llm_clients,
+    batch_stats,
+    call_stats,
+    capture_tokens,
+    circuit_breaker_stats,
+    get_llm_cache,
+    llm_client_stats,
+    llm_latency,
+    rate_limiter_stats,
+    token_usage_stats,
+)
+from .metrics import LatencyTracker
 
 # Configure logging
 logging.basicConfig(level=getattr(logging, Config.get_log_level()))
@@ -38,13 +54,39 @@ class AnalysisRequest(BaseModel):
     parameters: Dict[str, Any] = Field(default_factory=dict)
 
 
+class BatchAnalysisRequest(BaseModel):
+    """API request for running many agents over many tickers."""
+
+    agent_names: List[str] = Field(min_length=1)
+    tickers: List[str] = Field(min_length=1)
+    max_concurrency: Optional[int] = Field(default=None, gt=0, le=256)
+    stream: bool = False  # Stream results as NDJSON in completion order
+
+
+class BatchAnalysisItem(BaseModel):
+    """Result for a single (agent, ticker) pair in a batch."""
+
+    agent_name: str
+    ticker: str
+    signal: Optional[SignalResponse] = None
+    error: Optional[str] = None
+
+
+class BatchAnalysisResponse(BaseModel):
+    """API response for batch analysis."""
+
+    results: List[BatchAnalysisItem]
+    succeeded: int
+    failed: int
+
+
 class TickerData(BaseModel):
     """Complete ticker data response."""
 
     ticker: str
     fundamentals: Optional[Dict[str, Any]]
     prices: List[Dict[str, Any]]
-    news: List[Dict[str, str]]
+    news: List[Dict[str, Any]]
 
 
 class HealthResponse(BaseModel):
@@ -54,6 +96,8 @@ class HealthResponse(BaseModel):
     database: str
     agents: int
     tickers: int
+    # Circuit breaker per LLM provider used so far (state, failures, retry_in)
+    llm_providers: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
 
 
 class ErrorResponse(BaseModel):
@@ -66,6 +110,9 @@ class ErrorResponse(BaseModel):
 # Global agent registry (agents registered at startup)
 _agents: Dict[str, Any] = {}
 
+# Per-endpoint latency (time until the response starts)
+endpoint_latency = LatencyTracker()
+
 
 # Database dependency injection
 async def get_db(request: Request) -> Database:
@@ -88,11 +135,37 @@ async def get_db(request: Request) -> Database:
     return db
 
 
+async def get_ticker_index(request: Request) -> TickerIndex:
+    """Dependency injection for the in-process ticker index.
+
+    Args:
+        request: FastAPI request object
+
+    Returns:
+        TickerIndex from app state (created lazily if startup did not run)
+
+    Raises:
+        HTTPException: If database not available
+    """
+    index = getattr(request.app.state, "ticker_index", None)
+    if index is None:
+        index = _create_ticker_index(await get_db(request))
+        request.app.state.ticker_index = index
+    return index
+
+
+def _create_ticker_index(db: Database) -> TickerIndex:
+    """Create a ticker index that is invalidated by database change notifications."""
+    index = TickerIndex(db)
+    db.add_change_listener(index.handle_change)
+    return index
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle.
 
-    Startup: Connect to database
+    Startup: Connect to database and load the ticker index
     Shutdown: Disconnect from database
     """
     # Startup
@@ -110,6 +183,10 @@ async def lifespan(app: FastAPI):
         app.state.db = db
         logger.info("✅ Database connected successfully")
 
+        app.state.ticker_index = _create_ticker_index(db)
+        await app.state.ticker_index.load()
+        logger.info(f"✅ Ticker index loaded ({len(app.state.ticker_index)} tickers)")
+
         yield
 
     finally:
@@ -118,6 +195,7 @@ async def lifespan(app: FastAPI):
         if hasattr(app.state, "db"):
             await app.state.db.disconnect()
             logger.info("✅ Database disconnected")
+        await aclose_llm_clients()
 
 
 # Create FastAPI app with lifespan
@@ -138,6 +216,18 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    """Record latency per route template (e.g., 'GET /tickers/{ticker}')."""
+    started = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or "unmatched"
+        endpoint_latency.record(f"{request.method} {path}", time.perf_counter() - started)
+
+
 # Exception handlers
 @app.exception_handler(DatabaseError)
 async def database_exception_handler(request: Request, exc: DatabaseError):
@@ -172,24 +262,33 @@ def root():
 
 
 @app.get("/health", response_model=HealthResponse, tags=["health"])
-async def health_check(db: Database = Depends(get_db)):
-    """Detailed health check with database status.
+async def health_check(
+    db: Database = Depends(get_db), index: TickerIndex = Depends(get_ticker_index)
+):
+    """Detailed health check with database and LLM provider status.
+
+    Status is "degraded" if the database is down or an LLM provider's circuit
+    breaker is open (calls are going to fallbacks or failing fast).
 
     Args:
         db: Database instance (injected)
+        index: Ticker index (injected)
 
     Returns:
         Health status
     """
     try:
         db_healthy = await db.health_check()
-        tickers = await db.list_tickers()
+        tickers = await index.list_tickers()
+        breakers = circuit_breaker_stats()
+        llm_healthy = all(b["state"] == "closed" for b in breakers.values())
 
         return HealthResponse(
-            status="healthy" if db_healthy else "degraded",
+            status="healthy" if db_healthy and llm_healthy else "degraded",
             database="connected" if db_healthy else "disconnected",
             agents=len(_agents),
             tickers=len(tickers),
+            llm_providers=breakers,
         )
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -198,18 +297,81 @@ async def health_check(db: Database = Depends(get_db)):
         )
 
 
+@app.get("/metrics/latency", tags=["health"])
+def latency_metrics():
+    """Per-endpoint latency percentiles over the most recent requests.
+
+    Returns:
+        Mapping of 'METHOD /route' to count, mean, max and p50/p90/p95/p99 in ms
+    """
+    return endpoint_latency.summary()
+
+
+@app.get("/metrics/cache", tags=["health"])
+async def cache_metrics(db: Database = Depends(get_db)):
+    """Database query cache counters.
+
+    Args:
+        db: Database instance (injected)
+
+    Returns:
+        Hits, misses, evictions, invalidations, hit rate and entry count
+        (enabled=false when caching is off)
+    """
+    if db.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "entries": len(db.cache), **db.cache.stats.to_dict()}
+
+
+@app.get("/metrics/llm", tags=["health"])
+async def llm_metrics():
+    """LLM client counters.
+
+    Returns:
+        {"calls": ..., "cache": ..., "rate_limits": ..., "clients": ...,
+        "batches": ..., "tokens": ..., "latency": ...}:
+        chat() requests, coalesced calls, provider calls and hedges; response
+        cache hits, misses, evictions, invalidations, hit rate and entry count
+        (enabled=false when LLM_CACHE is off); per provider/model limits,
+        calls in flight and waiting, and time spent throttled; per provider
+        shared SDK clients and their open (and idle) HTTP connections; per
+        provider batch-mode requests queued, batch jobs running and submitted,
+        and requests succeeded or failed (LLMConfig.batch); per
+        provider/model input tokens read from the provider's prompt cache vs
+        processed in full, and output tokens; per provider/model latency
+        percentiles and histogram (the data hedging thresholds are taken from)
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        cache_metrics = {"enabled": False}
+    else:
+        cache_metrics = {"enabled": True, "entries": len(cache), **cache.stats.to_dict()}
+    return {
+        "calls": call_stats.to_dict(),
+        "cache": cache_metrics,
+        "rate_limits": rate_limiter_stats(),
+        "clients": llm_client_stats(),
+        "batches": batch_stats(),
+        "tokens": token_usage_stats(),
+        "latency": {
+            key: {**stats, "histogram": llm_latency.histogram(key)}
+            for key, stats in llm_latency.summary().items()
+        },
+    }
+
+
 @app.get("/tickers", response_model=List[str], tags=["data"])
-async def list_tickers(db: Database = Depends(get_db)):
+async def list_tickers(index: TickerIndex = Depends(get_ticker_index)):
     """List all available tickers.
 
     Args:
-        db: Database instance (injected)
+        index: Ticker index (injected)
 
     Returns:
         List of ticker symbols
     """
     try:
-        return await db.list_tickers()
+        return await index.list_tickers()
     except DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -217,14 +379,47 @@ async def list_tickers(db: Database = Depends(get_db)):
         )
 
 
+@app.post("/tickers/refresh", response_model=List[str], tags=["data"])
+async def refresh_tickers(index: TickerIndex = Depends(get_ticker_index)):
+    """Reload the ticker index from the database (e.g., after loading new filings).
+
+    Args:
+        index: Ticker index (injected)
+
+    Returns:
+        Refreshed list of ticker symbols
+    """
+    try:
+        index.invalidate()
+        await index.refresh()
+        return await index.list_tickers()
+    except DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to refresh tickers: {str(e)}",
+        )
+
+
 @app.get("/tickers/{ticker}", response_model=TickerData, tags=["data"])
-async def get_ticker_data(ticker: str, days: int = 30, db: Database = Depends(get_db)):
+async def get_ticker_data(
+    ticker: str,
+    days: int = 30,
+    single_query: bool = False,
+    db: Database = Depends(get_db),
+    index: TickerIndex = Depends(get_ticker_index),
+):
     """Get complete data for a ticker.
 
+    Fundamentals, prices and news are fetched concurrently on separate pool
+    connections, or as one combined statement on a single connection when
+    single_query is true.
+
     Args:
         ticker: Stock ticker symbol
         days: Number of days of price history
+        single_query: Fetch everything in one round trip
         db: Database instance (injected)
+        index: Ticker index (injected)
 
     Returns:
         Complete ticker data
@@ -234,17 +429,19 @@ async def get_ticker_data(ticker: str, days: int = 30, db: Database = Depends(ge
     """
     try:
         # Check if ticker exists
-        tickers = await db.list_tickers()
-        if ticker not in tickers:
+        if not await index.exists(ticker):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Ticker {ticker} not found"
             )
 
         # Get all data
-        fundamentals = await db.get_fundamentals(ticker)
-        prices = await db.get_prices(ticker, days)
-        news = await db.get_news(ticker)
+        if single_query:
+            snapshot = await db.get_ticker_snapshot(ticker, days)
+            return TickerData(ticker=ticker, **snapshot)
 
+        fundamentals, prices, news = await asyncio.gather(
+            db.get_fundamentals(ticker), db.get_prices(ticker, days), db.get_news(ticker)
+        )
         return TickerData(ticker=ticker, fundamentals=fundamentals, prices=prices, news=news)
     except DatabaseError as e:
         raise HTTPException(
@@ -264,12 +461,17 @@ def list_agents():
 
 
 @app.post("/analyze", response_model=SignalResponse, tags=["analysis"])
-async def analyze(request: AnalysisRequest, db: Database = Depends(get_db)):
+async def analyze(
+    request: AnalysisRequest,
+    db: Database = Depends(get_db),
+    index: TickerIndex = Depends(get_ticker_index),
+):
     """Run agent analysis on ticker.
 
     Args:
         request: Analysis request with agent name and ticker
         db: Database instance (injected)
+        index: Ticker index (injected)
 
     Returns:
         Analysis signal
@@ -287,8 +489,7 @@ async def analyze(request: AnalysisRequest, db: Database = Depends(get_db)):
 
     try:
         # Check ticker exists
-        tickers = await db.list_tickers()
-        if request.ticker not in tickers:
+        if not await index.exists(request.ticker):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Ticker {request.ticker} not found"
             )
@@ -304,13 +505,7 @@ async def analyze(request: AnalysisRequest, db: Database = Depends(get_db)):
         # Run analysis (now async)
         signal = await agent.analyze(request.ticker, data)
 
-        return SignalResponse(
-            direction=signal.direction,
-            confidence=signal.confidence,
-            reasoning=signal.reasoning,
-            timestamp=signal.timestamp,
-            metadata=signal.metadata,
-        )
+        return _to_signal_response(signal)
     except DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}"
@@ -322,6 +517,191 @@ async def analyze(request: AnalysisRequest, db: Database = Depends(get_db)):
         )
 
 
+@app.post("/analyze/stream", tags=["analysis"])
+async def analyze_stream(
+    request: AnalysisRequest,
+    db: Database = Depends(get_db),
+    index: TickerIndex = Depends(get_ticker_index),
+):
+    """Run agent analysis and stream LLM output as Server-Sent Events.
+
+    Events:
+        token: {"delta": "..."} for each fragment the agent's LLM generates
+        signal: the final SignalResponse, sent once the analysis finishes
+        error: {"detail": "..."} if the analysis fails after streaming started
+
+    Agents without an LLM just send the signal event.
+
+    Args:
+        request: Analysis request with agent name and ticker
+        db: Database instance (injected)
+        index: Ticker index (injected)
+
+    Returns:
+        text/event-stream response
+
+    Raises:
+        HTTPException: If agent, ticker or data not found (before streaming)
+    """
+    agent = _agents.get(request.agent_name)
+    if not agent:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Agent {request.agent_name} not found. Available: {list(_agents.keys())}",
+        )
+
+    try:
+        if not await index.exists(request.ticker):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=f"Ticker {request.ticker} not found"
+            )
+        data = await db.get_fundamentals(request.ticker)
+    except DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}"
+        )
+    if not data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"No data available for {request.ticker}"
+        )
+
+    async def sse_stream():
+        queue: asyncio.Queue = asyncio.Queue()
+        with capture_tokens(queue.put_nowait):
+            task = asyncio.create_task(agent.analyze(request.ticker, data))
+        # Runs after every token has been queued, so None marks the end
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (delta := await queue.get()) is not None:
+                yield _sse("token", {"delta": delta})
+            try:
+                signal = task.result()
+            except Exception as e:
+                logger.error(f"Streaming analysis failed: {e}")
+                yield _sse("error", {"detail": f"Analysis failed: {str(e)}"})
+                return
+            yield _sse("signal", _to_signal_response(signal).model_dump(mode="json"))
+        finally:
+            # Client disconnected - stop generating
+            task.cancel()
+
+    return StreamingResponse(
+        sse_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse, tags=["analysis"])
+async def analyze_batch(
+    request: BatchAnalysisRequest,
+    db: Database = Depends(get_db),
+    index: TickerIndex = Depends(get_ticker_index),
+):
+    """Run several agents over several tickers in one request.
+
+    Fundamentals for all tickers are loaded with a single query, then every
+    (agent, ticker) pair is analyzed concurrently, bounded by max_concurrency.
+    Unknown agents or tickers and analysis failures are reported per item
+    instead of failing the whole batch.
+
+    Args:
+        request: Batch request with agent names and tickers
+        db: Database instance (injected)
+        index: Ticker index (injected)
+
+    Returns:
+        All results in request order, or an NDJSON stream of results in
+        completion order when request.stream is true
+
+    Raises:
+        HTTPException: If the batch is too large
+    """
+    agent_names = list(dict.fromkeys(request.agent_names))
+    tickers = list(dict.fromkeys(request.tickers))
+
+    max_items = Config.get_batch_max_items()
+    if len(agent_names) * len(tickers) > max_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large: {len(agent_names) * len(tickers)} pairs (max {max_items})",
+        )
+
+    try:
+        known = {ticker for ticker in tickers if await index.exists(ticker)}
+        fundamentals = await db.get_fundamentals_many([t for t in tickers if t in known])
+    except DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error: {str(e)}"
+        )
+
+    semaphore = asyncio.Semaphore(request.max_concurrency or Config.get_batch_max_concurrency())
+
+    async def run_one(agent_name: str, ticker: str) -> BatchAnalysisItem:
+        if agent_name not in _agents:
+            return BatchAnalysisItem(
+                agent_name=agent_name, ticker=ticker, error=f"Agent {agent_name} not found"
+            )
+        if ticker not in known:
+            return BatchAnalysisItem(
+                agent_name=agent_name, ticker=ticker, error=f"Ticker {ticker} not found"
+            )
+        data = fundamentals.get(ticker)
+        if not data:
+            return BatchAnalysisItem(
+                agent_name=agent_name, ticker=ticker, error=f"No data available for {ticker}"
+            )
+        async with semaphore:
+            try:
+                # Copy so one agent cannot mutate the data seen by another
+                signal = await _agents[agent_name].analyze(ticker, dict(data))
+            except Exception as e:
+                logger.error(f"Batch analysis failed for {agent_name}/{ticker}: {e}")
+                return BatchAnalysisItem(
+                    agent_name=agent_name, ticker=ticker, error=f"Analysis failed: {str(e)}"
+                )
+        return BatchAnalysisItem(
+            agent_name=agent_name, ticker=ticker, signal=_to_signal_response(signal)
+        )
+
+    pairs = [(agent_name, ticker) for agent_name in agent_names for ticker in tickers]
+
+    if request.stream:
+
+        async def ndjson_stream():
+            tasks = [asyncio.create_task(run_one(*pair)) for pair in pairs]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    item = await next_done
+                    yield item.model_dump_json() + "\n"
+            finally:
+                # Client disconnected or stream finished - stop outstanding work
+                for task in tasks:
+                    task.cancel()
+
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+    results = await asyncio.gather(*(run_one(*pair) for pair in pairs))
+    failed = sum(1 for item in results if item.error is not None)
+    return BatchAnalysisResponse(results=results, succeeded=len(results) - failed, failed=failed)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _to_signal_response(signal) -> SignalResponse:
+    """Convert an agent Signal into its API response model."""
+    return SignalResponse(
+        direction=signal.direction,
+        confidence=signal.confidence,
+        reasoning=signal.reasoning,
+        timestamp=signal.timestamp,
+        metadata=signal.metadata,
+    )
+
+
 def register_agent_instance(name: str, agent):
     """Register an agent instance for API access.
 
@@ -0,0 +1,302 @@
+"""Offline LLM execution through the providers' batch APIs.
+
+With LLMConfig.batch set, chat() calls are not sent one by one. An
+LLMBatcher collects them for a short window, submits them as one batch job
+(OpenAI Batch API, Anthropic Message Batches, or the stub), polls until the
+job has ended and hands each caller its own result. Batch jobs cost about
+half as much as regular calls but can take minutes to hours, so this is for
+throughput-bound offline runs (e.g. every agent over the whole universe
+overnight), not for interactive use.
+
+Example:
+    backend = OpenAIBatchBackend(AsyncOpenAI())
+    batcher = LLMBatcher(backend, max_size=10000, window=2.0, poll_interval=30)
+    result = await batcher.submit({"model": "gpt-4o-mini", "messages": [...]})
+    result.text
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one request in a batch: text or an error message."""
+
+    text: Optional[str] = None
+    error: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+
+
+class BatchBackend(ABC):
+    """Submits request bodies as one provider batch job and collects results.
+
+    Bodies are the provider's own request parameters (model, messages,
+    max_tokens, ...); results are keyed by the custom_id given at submission.
+    """
+
+    @abstractmethod
+    async def submit(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """Start a batch job.
+
+        Args:
+            requests: (custom_id, request body) pairs
+
+        Returns:
+            Provider batch id
+        """
+
+    @abstractmethod
+    async def poll(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        """Results by custom_id once the job has ended, None while it is running.
+
+        Raises:
+            Exception: If the job failed as a whole
+        """
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API: JSONL file upload, /v1/batches, output file download."""
+
+    _RUNNING = ("validating", "in_progress", "finalizing", "cancelling")
+
+    def __init__(self, client: Any):
+        """Initialize backend.
+
+        Args:
+            client: AsyncOpenAI client
+        """
+        self.client = client
+
+    async def submit(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body,
+                }
+            )
+            for custom_id, body in requests
+        ]
+        upload = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status in self._RUNNING:
+            return None
+        if not batch.output_file_id and not batch.error_file_id:
+            raise RuntimeError(f"Batch {batch_id} {batch.status}: {batch.errors}")
+
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    results[entry["custom_id"]] = self._parse(entry)
+        return results
+
+    @staticmethod
+    def _parse(entry: Dict[str, Any]) -> BatchResult:
+        response = entry.get("response") or {}
+        body = response.get("body") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            error = entry.get("error") or body.get("error") or {}
+            return BatchResult(error=error.get("message") or f"HTTP {response.get('status_code')}")
+        usage = body.get("usage") or {}
+        return BatchResult(
+            text=body["choices"][0]["message"]["content"],
+            input_tokens=usage.get("prompt_tokens", 0),
+            output_tokens=usage.get("completion_tokens", 0),
+            cached_input_tokens=(usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+        )
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API."""
+
+    def __init__(self, client: Any):
+        """Initialize backend.
+
+        Args:
+            client: AsyncAnthropic client
+        """
+        self.client = client
+
+    async def submit(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        batch = await self.client.messages.batches.create(
+            requests=[{"custom_id": custom_id, "params": body} for custom_id, body in requests]
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        results = {}
+        async for entry in await self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                usage = result.message.usage
+                read = getattr(usage, "cache_read_input_tokens", None) or 0
+                written = getattr(usage, "cache_creation_input_tokens", None) or 0
+                results[entry.custom_id] = BatchResult(
+                    text=result.message.content[0].text,
+                    input_tokens=usage.input_tokens + read + written,
+                    output_tokens=usage.output_tokens,
+                    cached_input_tokens=read,
+                )
+            elif result.type == "errored":
+                results[entry.custom_id] = BatchResult(error=result.error.error.message)
+            else:  # canceled or expired
+                results[entry.custom_id] = BatchResult(error=f"Request {result.type}")
+        return results
+
+
+class StubBatchBackend(BatchBackend):
+    """Batch jobs on the in-process StubLLM (see stub_llm.py)."""
+
+    def __init__(self, stub: Any):
+        """Initialize backend.
+
+        Args:
+            stub: StubLLM instance
+        """
+        self.stub = stub
+
+    async def submit(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        return self.stub.create_batch(requests)
+
+    async def poll(self, batch_id: str) -> Optional[Dict[str, BatchResult]]:
+        responses = self.stub.retrieve_batch(batch_id)
+        if responses is None:
+            return None
+        return {
+            custom_id: (
+                BatchResult(error=str(response))
+                if isinstance(response, Exception)
+                else BatchResult(
+                    text=response.text,
+                    input_tokens=response.usage.input_tokens,
+                    output_tokens=response.usage.output_tokens,
+                    cached_input_tokens=response.usage.cached_input_tokens,
+                )
+            )
+            for custom_id, response in responses.items()
+        }
+
+
+class LLMBatcher:
+    """Groups concurrent requests into batch jobs and fans the results back out.
+
+    A job is submitted once `max_size` requests are waiting, or `window`
+    seconds after the first one arrived. Several jobs can be running at once.
+    """
+
+    def __init__(self, backend: BatchBackend, max_size: int, window: float, poll_interval: float):
+        """Initialize batcher.
+
+        Args:
+            backend: Provider batch backend
+            max_size: Requests per batch job
+            window: Seconds to collect requests before submitting
+            poll_interval: Seconds between job status checks
+        """
+        self.backend = backend
+        self.max_size = max_size
+        self.window = window
+        self.poll_interval = poll_interval
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._jobs: set = set()
+        self._ids = itertools.count()
+
+        self.batches_submitted = 0
+        self.requests_submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    async def submit(self, body: Dict[str, Any]) -> BatchResult:
+        """Queue one request body and wait for its result.
+
+        Returns:
+            The request's BatchResult (error set if it or the whole job failed)
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((f"req-{next(self._ids)}", body, future))
+        if len(self._pending) >= self.max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Submit everything queued now instead of waiting for the window."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if items:
+            job = asyncio.create_task(self._run(items))
+            self._jobs.add(job)
+            job.add_done_callback(self._jobs.discard)
+
+    async def _run(self, items: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+        """Submit one job, poll until it has ended and resolve its waiters."""
+        try:
+            requests = [(custom_id, body) for custom_id, body, _ in items]
+            batch_id = await self.backend.submit(requests)
+            self.batches_submitted += 1
+            self.requests_submitted += len(items)
+            logger.info(f"Submitted batch {batch_id} ({len(items)} requests)")
+            while True:
+                results = await self.backend.poll(batch_id)
+                if results is not None:
+                    break
+                await asyncio.sleep(self.poll_interval)
+        except Exception as e:
+            logger.error(f"Batch of {len(items)} requests failed: {e}")
+            results = {}
+            missing = BatchResult(error=f"Batch failed: {e}")
+        else:
+            missing = BatchResult(error=f"Missing from batch {batch_id} output")
+
+        for custom_id, _, future in items:
+            result = results.get(custom_id, missing)
+            if result.error is None:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            if not future.done():  # The caller may have given up
+                future.set_result(result)
+
+    def to_dict(self) -> Dict[str, int]:
+        """Plain-dict view for logging and JSON responses."""
+        return {
+            "queued": len(self._pending),
+            "batches_running": len(self._jobs),
+            "batches_submitted": self.batches_submitted,
+            "requests_submitted": self.requests_submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
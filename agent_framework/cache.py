@@ -0,0 +1,339 @@
+"""Async read-through caching for slow-changing query results.
+
+The Database uses a cache to avoid round trips for data that rarely changes
+(fundamentals, filing metadata, macro indicators), and LLMClient can cache
+responses to repeated prompts. Backends implement the AsyncCache interface:
+LRUCache is the in-process default, SQLiteCache persists entries on disk.
+
+Keys are tuples whose first element names the cached method, e.g.
+("get_fundamentals", "AAPL"). invalidate() drops every key that starts with
+the given parts, so ("get_fundamentals",) clears all cached fundamentals.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+CacheKey = Tuple[Hashable, ...]
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict view for logging and JSON responses."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class AsyncCache(ABC):
+    """Interface for async caches used by Database.
+
+    Subclasses implement storage (get/set/_delete_prefix/clear). get_or_load adds
+    single-flight loading on top: concurrent misses on the same key share one
+    loader call instead of each querying the database.
+    """
+
+    # Returned by get() on a miss (None is a valid cached value)
+    MISSING = object()
+
+    def __init__(self):
+        self.stats = CacheStats()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        # Bumped on every invalidation; loads started before a bump are not stored
+        self._generation = 0
+
+    @abstractmethod
+    async def get(self, key: CacheKey) -> Any:
+        """Return the cached value, or AsyncCache.MISSING."""
+
+    @abstractmethod
+    async def set(self, key: CacheKey, value: Any, ttl: float) -> None:
+        """Store a value for `ttl` seconds."""
+
+    @abstractmethod
+    async def _delete_prefix(self, prefix: CacheKey) -> int:
+        """Delete keys starting with `prefix`; return how many were removed."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove all entries."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+    async def invalidate(self, *prefix: Hashable) -> int:
+        """Drop all keys starting with `prefix` (all keys if empty).
+
+        Also detaches in-flight loads for those keys, so callers arriving after
+        the invalidation query fresh data instead of joining a stale load.
+
+        Returns:
+            Number of stored entries removed
+        """
+        self._generation += 1
+        self.stats.invalidations += 1
+        for key in [k for k in self._inflight if k[: len(prefix)] == prefix]:
+            del self._inflight[key]
+        return await self._delete_prefix(tuple(prefix))
+
+    async def get_or_load(
+        self, key: CacheKey, loader: Callable[[], Awaitable[Any]], ttl: float
+    ) -> Any:
+        """Return the cached value for `key`, calling `loader` on a miss.
+
+        Args:
+            key: Cache key (tuple, first element is the namespace)
+            loader: Coroutine function producing the value
+            ttl: Seconds to keep the loaded value
+
+        Raises:
+            Whatever `loader` raises; failed loads are not cached.
+        """
+        value = await self.get(key)
+        if value is not self.MISSING:
+            self.stats.hits += 1
+            return value
+        self.stats.misses += 1
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                # shield: one waiter being cancelled must not cancel the shared load
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # This caller was cancelled
+                # The loading caller was cancelled; load on our own below
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        if generation == self._generation:
+            await self.set(key, value, ttl)
+        future.set_result(value)
+        return value
+
+
+class LRUCache(AsyncCache):
+    """In-process cache with per-entry TTL and least-recently-used eviction.
+
+    Example:
+        cache = LRUCache(max_entries=1024)
+        value = await cache.get_or_load(("get_fundamentals", "AAPL"), load, ttl=300)
+        cache.stats.hit_rate
+    """
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        """Initialize cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            clock: Time source (injectable for tests)
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: CacheKey) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return self.MISSING
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return self.MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: CacheKey, value: Any, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def _delete_prefix(self, prefix: CacheKey) -> int:
+        if not prefix:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+        stale = [k for k in self._entries if k[: len(prefix)] == prefix]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    async def clear(self) -> None:
+        await self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(AsyncCache):
+    """On-disk cache in a SQLite file, with per-entry TTL and LRU eviction.
+
+    Entries survive restarts and are shared by processes using the same file.
+    Key parts and values must be JSON-serializable (e.g. LLM response text).
+    Expiry uses wall-clock time so it stays valid across processes.
+
+    Example:
+        cache = SQLiteCache(".llm_cache.sqlite3", max_entries=10000)
+        text = await cache.get_or_load(("llm_chat", digest), generate, ttl=86400)
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, clock: Callable[[], float] = time.time):
+        """Open (or create) the cache file.
+
+        Args:
+            path: SQLite database file
+            max_entries: Entries kept before the least recently used is evicted
+            clock: Time source (injectable for tests)
+        """
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self._clock = clock
+        # One connection, used from worker threads one call at a time
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (accessed_at)"
+        )
+
+    @staticmethod
+    def _encode(key: CacheKey) -> str:
+        return json.dumps(list(key))
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a blocking SQLite call in a worker thread."""
+
+        def locked():
+            with self._lock:
+                return fn(*args)
+
+        return await asyncio.to_thread(locked)
+
+    async def get(self, key: CacheKey) -> Any:
+        def lookup(encoded: str, now: float):
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (encoded,)
+            ).fetchone()
+            if row is None:
+                return self.MISSING
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (encoded,))
+                return self.MISSING
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, encoded)
+            )
+            return json.loads(row[0])
+
+        return await self._run(lookup, self._encode(key), self._clock())
+
+    async def set(self, key: CacheKey, value: Any, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        def store(encoded: str, payload: str, now: float) -> int:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?)",
+                (encoded, payload, now + ttl, now),
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+            excess -= self.max_entries
+            if excess <= 0:
+                return 0
+            # Expired entries go first, then the least recently used
+            self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+            excess = self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+            excess -= self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM cache_entries WHERE key IN (
+                        SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?
+                    )
+                    """,
+                    (excess,),
+                )
+            return max(excess, 0)
+
+        evicted = await self._run(store, self._encode(key), json.dumps(value), self._clock())
+        self.stats.evictions += evicted
+
+    async def _delete_prefix(self, prefix: CacheKey) -> int:
+        if not prefix:
+            return await self._run(lambda: self._conn.execute("DELETE FROM cache_entries").rowcount)
+        exact = self._encode(prefix)
+        # '["a", "b"]' is a prefix of '["a", "b", ...]' up to its closing bracket
+        start = exact[:-1] + ", "
+        return await self._run(
+            lambda: self._conn.execute(
+                "DELETE FROM cache_entries WHERE key = ? OR substr(key, 1, ?) = ?",
+                (exact, len(start), start),
+            ).rowcount
+        )
+
+    async def clear(self) -> None:
+        await self.invalidate()
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
@@ -6,7 +6,7 @@ This ensures easy deployment across different environments (dev, test, prod).
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 # Load .env file if it exists
 try:
@@ -132,6 +132,48 @@ class Config:
         """Get maximum inactive connection lifetime in seconds."""
         return float(os.getenv("DB_MAX_INACTIVE_CONNECTION_LIFETIME", "300.0"))
 
+    @staticmethod
+    def get_db_numeric_as_float() -> bool:
+        """Get whether NUMERIC columns are decoded as float instead of Decimal."""
+        return os.getenv("DB_NUMERIC_AS_FLOAT", "False").lower() in ("true", "1", "yes")
+
+    @staticmethod
+    def get_db_cache_enabled() -> bool:
+        """Get whether slow-changing query results are cached in-process."""
+        return os.getenv("DB_CACHE_ENABLED", "True").lower() in ("true", "1", "yes")
+
+    @staticmethod
+    def get_db_listen_for_changes() -> bool:
+        """Get whether Database LISTENs for change notifications to invalidate caches."""
+        return os.getenv("DB_LISTEN_FOR_CHANGES", "True").lower() in ("true", "1", "yes")
+
+    @staticmethod
+    def get_db_cache_max_entries() -> int:
+        """Get maximum cached query results before LRU eviction."""
+        return int(os.getenv("DB_CACHE_MAX_ENTRIES", "1024"))
+
+    @staticmethod
+    def get_db_cache_ttls() -> Dict[str, float]:
+        """Get cache TTL in seconds per Database method (0 disables caching it).
+
+        Override one method with DB_CACHE_TTL_<METHOD>, e.g. DB_CACHE_TTL_GET_FUNDAMENTALS=60.
+        """
+        defaults = {
+            "get_fundamentals": 3600.0,
+            "get_filing_metadata": 3600.0,
+            "get_macro_indicators": 900.0,
+            "list_macro_indicators": 3600.0,
+        }
+        return {
+            method: float(os.getenv(f"DB_CACHE_TTL_{method.upper()}", str(ttl)))
+            for method, ttl in defaults.items()
+        }
+
+    @staticmethod
+    def get_ticker_index_ttl() -> float:
+        """Get seconds before the in-process ticker index is refreshed (0 = never)."""
+        return float(os.getenv("TICKER_INDEX_TTL", "300.0"))
+
     # ========================================
     # API Configuration
     # ========================================
@@ -162,6 +204,16 @@ class Config:
             return ["*"]
         return [origin.strip() for origin in origins.split(",")]
 
+    @staticmethod
+    def get_batch_max_concurrency() -> int:
+        """Get default number of analyses run concurrently by /analyze/batch."""
+        return int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+
+    @staticmethod
+    def get_batch_max_items() -> int:
+        """Get maximum (agent, ticker) pairs accepted in one /analyze/batch request."""
+        return int(os.getenv("BATCH_MAX_ITEMS", "5000"))
+
     # ========================================
     # LLM Configuration
     # ========================================
@@ -190,6 +242,7 @@ class Config:
             "openai": "gpt-4",
             "anthropic": "claude-3-5-sonnet-20241022",
             "ollama": "llama3.2",
+            "stub": "stub",
         }
         env_var = f"{provider.upper()}_MODEL"
         return os.getenv(env_var, defaults.get(provider.lower(), ""))
@@ -217,6 +270,127 @@ class Config:
         """Get LLM max retries."""
         return int(os.getenv("LLM_MAX_RETRIES", "3"))
 
+    @staticmethod
+    def get_llm_requests_per_minute(provider: str) -> int:
+        """Get client-side requests/min limit per model for provider (0 = unlimited)."""
+        return int(os.getenv(f"{provider.upper()}_REQUESTS_PER_MINUTE", "0"))
+
+    @staticmethod
+    def get_llm_tokens_per_minute(provider: str) -> int:
+        """Get client-side tokens/min limit per model for provider (0 = unlimited)."""
+        return int(os.getenv(f"{provider.upper()}_TOKENS_PER_MINUTE", "0"))
+
+    @staticmethod
+    def get_llm_max_concurrency(provider: str) -> int:
+        """Get max in-flight calls per model for provider (0 = unlimited)."""
+        return int(os.getenv(f"{provider.upper()}_MAX_CONCURRENCY", "0"))
+
+    @staticmethod
+    def get_llm_breaker_failure_threshold() -> int:
+        """Get consecutive failures that open a provider's circuit breaker."""
+        return int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+
+    @staticmethod
+    def get_llm_breaker_reset_timeout() -> float:
+        """Get seconds an open circuit breaker waits before probing the provider."""
+        return float(os.getenv("LLM_BREAKER_RESET_TIMEOUT", "30"))
+
+    @staticmethod
+    def get_llm_hedge_percentile() -> float:
+        """Get latency percentile after which a hedge request is sent (0 = off)."""
+        return float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
+
+    @staticmethod
+    def get_llm_hedge_min_samples() -> int:
+        """Get latency samples needed per model before hedging starts."""
+        return int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+    @staticmethod
+    def get_llm_coalesce() -> bool:
+        """Get whether identical concurrent LLM calls share one provider call."""
+        return os.getenv("LLM_COALESCE", "True").lower() in ("true", "1", "yes")
+
+    @staticmethod
+    def get_llm_prompt_caching() -> bool:
+        """Get whether prompts mark their stable prefix for provider prompt caching."""
+        return os.getenv("LLM_PROMPT_CACHING", "True").lower() in ("true", "1", "yes")
+
+    @staticmethod
+    def get_llm_batch() -> bool:
+        """Get whether LLM calls go through the providers' batch APIs (offline runs)."""
+        return os.getenv("LLM_BATCH", "False").lower() in ("true", "1", "yes")
+
+    @staticmethod
+    def get_llm_batch_max_size() -> int:
+        """Get maximum requests per LLM batch job."""
+        return int(os.getenv("LLM_BATCH_MAX_SIZE", "10000"))
+
+    @staticmethod
+    def get_llm_batch_window() -> float:
+        """Get seconds to collect LLM calls before submitting a batch job."""
+        return float(os.getenv("LLM_BATCH_WINDOW", "2"))
+
+    @staticmethod
+    def get_llm_batch_poll_interval() -> float:
+        """Get seconds between LLM batch job status checks."""
+        return float(os.getenv("LLM_BATCH_POLL_INTERVAL", "30"))
+
+    @staticmethod
+    def get_llm_provider_override() -> Optional[str]:
+        """Get provider that replaces every LLMConfig's provider (e.g. 'stub'), if set."""
+        return os.getenv("LLM_PROVIDER_OVERRIDE") or None
+
+    @staticmethod
+    def get_stub_latency() -> str:
+        """Get stub LLM latency distribution (e.g. 'lognormal:0.8,0.5')."""
+        return os.getenv("STUB_LATENCY", "fixed:0")
+
+    @staticmethod
+    def get_stub_error_rate() -> float:
+        """Get fraction of stub LLM calls that fail with a 503."""
+        return float(os.getenv("STUB_ERROR_RATE", "0"))
+
+    @staticmethod
+    def get_stub_rate_limit_rate() -> float:
+        """Get fraction of stub LLM calls that fail with a 429."""
+        return float(os.getenv("STUB_RATE_LIMIT_RATE", "0"))
+
+    @staticmethod
+    def get_stub_output_tokens() -> int:
+        """Get approximate length of stub LLM responses in tokens."""
+        return int(os.getenv("STUB_OUTPUT_TOKENS", "60"))
+
+    @staticmethod
+    def get_stub_batch_latency() -> float:
+        """Get seconds until a stub LLM batch job has ended."""
+        return float(os.getenv("STUB_BATCH_LATENCY", "0"))
+
+    @staticmethod
+    def get_stub_seed() -> Optional[int]:
+        """Get seed for stub LLM latency and error draws (unset = random)."""
+        seed = os.getenv("STUB_SEED")
+        return int(seed) if seed else None
+
+    @staticmethod
+    def get_llm_cache() -> str:
+        """Get LLM response cache backend: 'off', 'memory' or 'sqlite'."""
+        return os.getenv("LLM_CACHE", "off").lower()
+
+    @staticmethod
+    def get_llm_cache_path() -> str:
+        """Get SQLite file for the 'sqlite' LLM response cache."""
+        return os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3")
+
+    @staticmethod
+    def get_llm_cache_ttl() -> float:
+        """Get seconds a cached LLM response stays valid."""
+        return float(os.getenv("LLM_CACHE_TTL", "86400"))
+
+    @staticmethod
+    def get_llm_cache_max_entries() -> int:
+        """Get maximum cached LLM responses before LRU eviction."""
+        return int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
     @staticmethod
     def get_ollama_url() -> str:
         """Get Ollama base URL."""
@@ -246,6 +420,21 @@ class Config:
         """Get RAG embedding model."""
         return os.getenv("RAG_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
+    @staticmethod
+    def get_rag_index() -> str:
+        """Get RAG search index ("exact" or "ivf")."""
+        return os.getenv("RAG_INDEX", "exact").lower()
+
+    @staticmethod
+    def get_rag_ivf_nlist() -> int:
+        """Get number of IVF index cells."""
+        return int(os.getenv("RAG_IVF_NLIST", "256"))
+
+    @staticmethod
+    def get_rag_ivf_nprobe() -> int:
+        """Get IVF index cells searched per query."""
+        return int(os.getenv("RAG_IVF_NPROBE", "8"))
+
     # ========================================
     # Logging Configuration
     # ========================================
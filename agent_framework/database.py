@@ -3,13 +3,33 @@
 Compatible with thesis-data-fabric production database schema.
 """
 
+import asyncio
+import inspect
+import json
 import logging
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import asyncpg
+import numpy as np
 
+from .cache import AsyncCache, LRUCache
+from .config import Config
 from .models import DatabaseConfig
 
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +54,55 @@ class QueryError(DatabaseError):
     pass
 
 
+# Called as listener(table, op, keys) for every committed change; keys is None
+# when unknown (large statements, or table "*" after the listener reconnects)
+ChangeListener = Callable[[str, str, Optional[List[str]]], Any]
+
+
+def _copy_result(value: Any) -> Any:
+    """Copy cached rows so callers mutating a result don't alter the cache."""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+@dataclass
+class BulkLoadResult:
+    """Outcome of a bulk COPY + upsert load."""
+
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of the load (rows / wall-clock second)."""
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+
+@dataclass
+class PriceMatrix:
+    """Aligned OHLCV history for several tickers as NumPy arrays.
+
+    Rows are trading dates (union over all tickers, ascending), columns follow
+    `tickers`. Missing prices are NaN; missing volume is 0.
+    """
+
+    dates: np.ndarray  # datetime64[D], shape (n_dates,)
+    tickers: List[str]
+    open: np.ndarray  # float64, shape (n_dates, n_tickers)
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray  # int64, shape (n_dates, n_tickers)
+
+    def column(self, ticker: str) -> int:
+        """Get the column index for a ticker."""
+        return self.tickers.index(ticker)
+
+
 class Database:
     """PostgreSQL database with connection pooling.
 
@@ -44,12 +113,43 @@ class Database:
     - Transaction support for atomic operations
     - Comprehensive error handling
     - Async operations with asyncpg
+    - Cross-process cache invalidation via LISTEN/NOTIFY
     """
 
-    def __init__(self, connection_string: str, config: Optional[DatabaseConfig] = None):
+    # NOTIFY channel written by the thesis_data.notify_change() triggers (schema.sql)
+    CHANGE_CHANNEL = "thesis_data_changes"
+
+    # Cached methods to drop when a table changes; keyed methods take the
+    # changed ticker / indicator name as their first argument
+    CACHE_DEPENDENCIES: Dict[str, List[Tuple[str, bool]]] = {
+        "edgar_filings": [("get_fundamentals", True), ("get_filing_metadata", True)],
+        "macro_indicators": [("get_macro_indicators", True), ("list_macro_indicators", False)],
+    }
+
+    def __init__(
+        self,
+        connection_string: str,
+        config: Optional[DatabaseConfig] = None,
+        cache: Optional[AsyncCache] = None,
+    ):
+        """Initialize database.
+
+        Args:
+            connection_string: PostgreSQL connection string
+            config: Pool and cache settings (defaults from environment)
+            cache: Query cache backend (defaults to an LRUCache when
+                config.cache_enabled, otherwise no caching)
+        """
         self.connection_string = connection_string
         self.config = config or DatabaseConfig(connection_string=connection_string)
+        if cache is None and self.config.cache_enabled:
+            cache = LRUCache(max_entries=self.config.cache_max_entries)
+        self.cache = cache
         self._pool: Optional[asyncpg.Pool] = None
+        self._listener: Optional[asyncpg.Connection] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._change_listeners: List[ChangeListener] = []
+        self._change_tasks: set = set()
 
     async def connect(self) -> None:
         """Create connection pool."""
@@ -64,6 +164,7 @@ class Database:
                 command_timeout=self.config.command_timeout,
                 max_queries=self.config.max_queries,
                 max_inactive_connection_lifetime=self.config.max_inactive_connection_lifetime,
+                init=self._init_connection,
             )
             logger.info(
                 f"Database connected (pool: {self.config.min_pool_size}-{self.config.max_pool_size})"
@@ -72,8 +173,30 @@ class Database:
             logger.error(f"Failed to connect to database: {e}")
             raise DBConnectionError(f"Could not connect to database: {e}") from e
 
+        if self.config.listen_for_changes:
+            try:
+                await self._start_listener()
+            except DBConnectionError as e:
+                # Caches still expire by TTL; keep retrying in the background
+                logger.warning(f"{e}; retrying in background")
+                self._listener_task = asyncio.create_task(self._reconnect_listener())
+
+    async def _init_connection(self, conn: asyncpg.Connection) -> None:
+        """Per-connection setup, run by the pool for every new connection."""
+        if self.config.numeric_as_float:
+            # Text format: parse the server's decimal string straight to float
+            await conn.set_type_codec(
+                "numeric", encoder=str, decoder=float, schema="pg_catalog", format="text"
+            )
+
     async def disconnect(self) -> None:
-        """Close connection pool."""
+        """Close connection pool and change listener."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            self._listener_task = None
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            await listener.close()
         if self._pool:
             await self._pool.close()
             self._pool = None
@@ -105,31 +228,212 @@ class Database:
             async with conn.transaction():
                 yield conn
 
+    # =========================================================================
+    # CHANGE NOTIFICATIONS - LISTEN on a dedicated connection
+    # =========================================================================
+
+    def add_change_listener(self, listener: ChangeListener) -> None:
+        """Call `listener(table, op, keys)` after every committed data change.
+
+        Notifications come from triggers, so they cover writes from any process
+        (other API workers, seed scripts, raw SQL). Listeners may be sync or
+        async; exceptions are logged, not raised.
+
+        Example:
+            db.add_change_listener(ticker_index.handle_change)
+        """
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: ChangeListener) -> None:
+        """Stop calling a listener registered with add_change_listener."""
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+
+    @property
+    def is_listening(self) -> bool:
+        """Whether the LISTEN connection is up."""
+        return self._listener is not None and not self._listener.is_closed()
+
+    async def _start_listener(self) -> None:
+        try:
+            conn = await asyncpg.connect(self.connection_string)
+            await conn.add_listener(self.CHANGE_CHANNEL, self._on_notification)
+        except (OSError, asyncpg.PostgresError) as e:
+            raise DBConnectionError(f"Could not start change listener: {e}") from e
+        conn.add_termination_listener(self._on_listener_lost)
+        self._listener = conn
+        logger.debug(f"Listening on {self.CHANGE_CHANNEL}")
+
+    def _on_listener_lost(self, conn: asyncpg.Connection) -> None:
+        if conn is not self._listener:
+            return  # Closed by disconnect()
+        self._listener = None
+        logger.warning("Change listener connection lost; reconnecting")
+        self._listener_task = asyncio.create_task(self._reconnect_listener())
+
+    async def _reconnect_listener(self) -> None:
+        delay = 1.0
+        while self._pool is not None:
+            try:
+                await self._start_listener()
+                break
+            except DBConnectionError as e:
+                logger.debug(f"{e}; retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+        else:
+            return
+        # Notifications sent while disconnected are lost: drop everything
+        await self._dispatch_change("*", "RESYNC", None)
+
+    def _on_notification(self, conn, pid: int, channel: str, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+            table, op, keys = change["table"], change["op"], change.get("keys")
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed change notification {payload!r}: {e}")
+            return
+        task = asyncio.create_task(self._dispatch_change(table, op, keys))
+        self._change_tasks.add(task)
+        task.add_done_callback(self._change_tasks.discard)
+
+    async def _dispatch_change(self, table: str, op: str, keys: Optional[List[str]]) -> None:
+        await self._invalidate_for_change(table, keys)
+        for listener in list(self._change_listeners):
+            try:
+                result = listener(table, op, keys)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Change listener {listener!r} failed: {e}")
+
+    async def _invalidate_for_change(self, table: str, keys: Optional[Iterable[str]]) -> None:
+        """Drop cached results that depend on `table` (all of them for "*")."""
+        if table == "*":
+            await self.invalidate_cache()
+            return
+        for method, keyed in self.CACHE_DEPENDENCIES.get(table, []):
+            if keyed and keys is not None:
+                for key in keys:
+                    await self.invalidate_cache(method, key)
+            else:
+                await self.invalidate_cache(method)
+
+    # =========================================================================
+    # QUERY CACHE
+    # =========================================================================
+
+    async def _cached(self, key: Tuple[Any, ...], loader) -> Any:
+        """Serve loader() through the query cache; key[0] is the method name."""
+        ttl = self.config.cache_ttls.get(key[0], 0)
+        if self.cache is None or ttl <= 0:
+            return await loader()
+        return _copy_result(await self.cache.get_or_load(key, loader, ttl))
+
+    async def invalidate_cache(self, *prefix: Any) -> None:
+        """Drop cached query results.
+
+        Writes through add_* methods invalidate immediately, and writes from
+        anywhere else arrive via LISTEN/NOTIFY (see add_change_listener). Call
+        this when listening is disabled and data was changed externally.
+
+        Args:
+            prefix: Key prefix, e.g. ("get_fundamentals", "AAPL") or
+                ("get_macro_indicators",); no arguments clears everything
+        """
+        if self.cache is not None:
+            await self.cache.invalidate(*prefix)
+
     # =========================================================================
     # QUERY METHODS - Updated for thesis-data-fabric schema
     # =========================================================================
 
     async def get_fundamentals(self, ticker: str) -> Optional[Dict[str, Any]]:
-        """Get fundamental data for ticker from the fundamentals view."""
+        """Get fundamental data for ticker (trigger-maintained fundamentals table).
+
+        Cached (see DatabaseConfig.cache_ttls); add_filing invalidates the ticker.
+        """
+
+        async def load() -> Optional[Dict[str, Any]]:
+            try:
+                async with self.acquire() as conn:
+                    row = await conn.fetchrow(
+                        """
+                        SELECT ticker, name, sector, market_cap, pe_ratio, pb_ratio,
+                               roe, profit_margin, revenue_growth, debt_to_equity,
+                               current_ratio, dividend_yield, updated_at
+                        FROM thesis_data.fundamentals_materialized
+                        WHERE ticker = $1
+                        """,
+                        ticker,
+                    )
+                    if not row:
+                        logger.debug(f"No fundamentals found for {ticker}")
+                        return None
+                    return dict(row)
+            except asyncpg.PostgresError as e:
+                logger.error(f"Failed to fetch fundamentals for {ticker}: {e}")
+                raise QueryError(f"Could not retrieve fundamentals for {ticker}") from e
+
+        return await self._cached(("get_fundamentals", ticker), load)
+
+    async def get_fundamentals_many(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get fundamental data for many tickers in a single query.
+
+        Args:
+            tickers: Ticker symbols to look up
+
+        Returns:
+            Dict keyed by ticker. Tickers without fundamentals are omitted.
+        """
+        if not tickers:
+            return {}
         try:
             async with self.acquire() as conn:
-                row = await conn.fetchrow(
+                rows = await conn.fetch(
                     """
                     SELECT ticker, name, sector, market_cap, pe_ratio, pb_ratio,
                            roe, profit_margin, revenue_growth, debt_to_equity,
                            current_ratio, dividend_yield, updated_at
-                    FROM thesis_data.fundamentals
-                    WHERE ticker = $1
+                    FROM thesis_data.fundamentals_materialized
+                    WHERE ticker = ANY($1::varchar[])
                     """,
-                    ticker,
+                    list(tickers),
                 )
-                if not row:
-                    logger.debug(f"No fundamentals found for {ticker}")
-                    return None
-                return dict(row)
+                return {row["ticker"]: dict(row) for row in rows}
+        except asyncpg.PostgresError as e:
+            logger.error(f"Failed to fetch fundamentals for {len(tickers)} tickers: {e}")
+            raise QueryError("Could not retrieve fundamentals") from e
+
+    async def refresh_fundamentals(self, tickers: Optional[List[str]] = None) -> int:
+        """Recompute materialized fundamentals from the latest 10-K filings.
+
+        Triggers on edgar_filings keep the table current, so this is only needed
+        after bulk maintenance (e.g., triggers disabled during a reload). Tickers
+        whose latest 10-K is unchanged are skipped.
+
+        Args:
+            tickers: Tickers to refresh (None = all)
+
+        Returns:
+            Number of tickers inserted, updated or removed
+        """
+        try:
+            async with self.acquire() as conn:
+                changed = await conn.fetchval(
+                    "SELECT thesis_data.refresh_fundamentals($1::text[])",
+                    list(tickers) if tickers is not None else None,
+                )
+                logger.info(f"Refreshed fundamentals ({changed} tickers changed)")
         except asyncpg.PostgresError as e:
-            logger.error(f"Failed to fetch fundamentals for {ticker}: {e}")
-            raise QueryError(f"Could not retrieve fundamentals for {ticker}") from e
+            logger.error(f"Failed to refresh fundamentals: {e}")
+            raise QueryError("Could not refresh fundamentals") from e
+        if tickers is None:
+            await self.invalidate_cache("get_fundamentals")
+        else:
+            for ticker in tickers:
+                await self.invalidate_cache("get_fundamentals", ticker)
+        return changed
 
     async def get_prices(self, ticker: str, days: int = 30) -> List[Dict[str, Any]]:
         """Get recent price history from thesis_data.prices."""
@@ -177,8 +481,233 @@ class Database:
             logger.error(f"Failed to fetch news for {ticker}: {e}")
             raise QueryError(f"Could not retrieve news for {ticker}") from e
 
+    async def get_prices_many(
+        self, tickers: List[str], days: int = 30
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get recent price history for many tickers in a single query.
+
+        Args:
+            tickers: Ticker symbols to look up
+            days: Most recent rows per ticker (same as get_prices)
+
+        Returns:
+            Dict keyed by ticker, each newest first. Every requested ticker is
+            present (empty list if it has no prices).
+        """
+        result: Dict[str, List[Dict[str, Any]]] = {ticker: [] for ticker in tickers}
+        if not tickers:
+            return result
+        try:
+            async with self.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT ticker, date, open, high, low, close, volume
+                    FROM (
+                        SELECT ticker, price_date AS date, open, high, low, close, volume,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY ticker ORDER BY price_date DESC
+                               ) AS rn
+                        FROM thesis_data.prices
+                        WHERE ticker = ANY($1::varchar[])
+                    ) ranked
+                    WHERE rn <= $2
+                    ORDER BY ticker, date DESC
+                    """,
+                    list(tickers),
+                    days,
+                )
+                for row in rows:
+                    record = dict(row)
+                    result[record.pop("ticker")].append(record)
+                return result
+        except asyncpg.PostgresError as e:
+            logger.error(f"Failed to fetch prices for {len(tickers)} tickers: {e}")
+            raise QueryError("Could not retrieve prices") from e
+
+    async def get_news_many(
+        self, tickers: List[str], limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get recent news for many tickers in a single query.
+
+        Args:
+            tickers: Ticker symbols to look up
+            limit: Most recent articles per ticker (same as get_news)
+
+        Returns:
+            Dict keyed by ticker, each newest first. Every requested ticker is
+            present (empty list if it has no news).
+        """
+        result: Dict[str, List[Dict[str, Any]]] = {ticker: [] for ticker in tickers}
+        if not tickers:
+            return result
+        try:
+            async with self.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT ticker, date, headline, summary, sentiment_score, sentiment, source
+                    FROM (
+                        SELECT
+                            ticker,
+                            published_at AS date,
+                            headline,
+                            summary,
+                            sentiment_score,
+                            sentiment_label AS sentiment,
+                            source,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY ticker ORDER BY published_at DESC
+                            ) AS rn
+                        FROM thesis_data.stock_news
+                        WHERE ticker = ANY($1::varchar[])
+                    ) ranked
+                    WHERE rn <= $2
+                    ORDER BY ticker, date DESC
+                    """,
+                    list(tickers),
+                    limit,
+                )
+                for row in rows:
+                    record = dict(row)
+                    result[record.pop("ticker")].append(record)
+                return result
+        except asyncpg.PostgresError as e:
+            logger.error(f"Failed to fetch news for {len(tickers)} tickers: {e}")
+            raise QueryError("Could not retrieve news") from e
+
+    async def get_price_matrix(
+        self,
+        tickers: List[str],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> PriceMatrix:
+        """Get aligned OHLCV arrays for many tickers (columnar, no per-row dicts).
+
+        Postgres aggregates each ticker's history into float8/int8 arrays, so
+        asyncpg decodes one record per ticker and values never become Decimal.
+
+        Args:
+            tickers: Ticker symbols (column order of the result)
+            start: First date, inclusive (None = earliest available)
+            end: Last date, inclusive (None = latest available)
+
+        Returns:
+            PriceMatrix with dates x tickers arrays
+        """
+        tickers = list(tickers)
+        try:
+            async with self.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT ticker,
+                           array_agg(price_date - DATE '1970-01-01' ORDER BY price_date) AS days,
+                           array_agg(open::float8 ORDER BY price_date) AS open,
+                           array_agg(high::float8 ORDER BY price_date) AS high,
+                           array_agg(low::float8 ORDER BY price_date) AS low,
+                           array_agg(close::float8 ORDER BY price_date) AS close,
+                           array_agg(COALESCE(volume, 0) ORDER BY price_date) AS volume
+                    FROM thesis_data.prices
+                    WHERE ticker = ANY($1::varchar[])
+                      AND ($2::date IS NULL OR price_date >= $2)
+                      AND ($3::date IS NULL OR price_date <= $3)
+                    GROUP BY ticker
+                    """,
+                    tickers,
+                    start,
+                    end,
+                )
+        except asyncpg.PostgresError as e:
+            logger.error(f"Failed to fetch price matrix for {len(tickers)} tickers: {e}")
+            raise QueryError("Could not retrieve price matrix") from e
+
+        per_ticker = {row["ticker"]: row for row in rows}
+        day_arrays = [np.asarray(row["days"], dtype=np.int64) for row in rows]
+        all_days = np.unique(np.concatenate(day_arrays)) if day_arrays else np.empty(0, np.int64)
+
+        shape = (len(all_days), len(tickers))
+        fields = {name: np.full(shape, np.nan) for name in ("open", "high", "low", "close")}
+        volume = np.zeros(shape, dtype=np.int64)
+
+        for col, ticker in enumerate(tickers):
+            row = per_ticker.get(ticker)
+            if row is None:
+                continue
+            idx = np.searchsorted(all_days, np.asarray(row["days"], dtype=np.int64))
+            for name, values in fields.items():
+                # None (NULL price) becomes NaN in a float64 array
+                values[idx, col] = np.asarray(row[name], dtype=np.float64)
+            volume[idx, col] = np.asarray(row["volume"], dtype=np.int64)
+
+        return PriceMatrix(
+            dates=all_days.astype("datetime64[D]"),
+            tickers=tickers,
+            volume=volume,
+            **fields,
+        )
+
+    async def get_ticker_snapshot(
+        self, ticker: str, days: int = 30, news_limit: int = 10
+    ) -> Dict[str, Any]:
+        """Get fundamentals, prices and news in one round trip on one connection.
+
+        Equivalent to calling get_fundamentals, get_prices and get_news, but the
+        three reads are combined into a single statement that returns JSON.
+        Values therefore arrive JSON-typed (numbers as float, dates as ISO strings).
+
+        Returns:
+            Dict with 'fundamentals' (or None), 'prices' and 'news' lists
+        """
+        try:
+            async with self.acquire() as conn:
+                row = await conn.fetchrow(
+                    """
+                    SELECT
+                        (SELECT row_to_json(f)
+                         FROM (
+                            SELECT ticker, name, sector, market_cap, pe_ratio, pb_ratio,
+                                   roe, profit_margin, revenue_growth, debt_to_equity,
+                                   current_ratio, dividend_yield, updated_at
+                            FROM thesis_data.fundamentals_materialized
+                            WHERE ticker = $1
+                         ) f) AS fundamentals,
+                        (SELECT COALESCE(json_agg(p ORDER BY p.date DESC), '[]'::json)
+                         FROM (
+                            SELECT price_date AS date, open, high, low, close, volume
+                            FROM thesis_data.prices
+                            WHERE ticker = $1
+                            ORDER BY price_date DESC
+                            LIMIT $2
+                         ) p) AS prices,
+                        (SELECT COALESCE(json_agg(n ORDER BY n.date DESC), '[]'::json)
+                         FROM (
+                            SELECT published_at AS date, headline, summary, sentiment_score,
+                                   sentiment_label AS sentiment, source
+                            FROM thesis_data.stock_news
+                            WHERE ticker = $1
+                            ORDER BY published_at DESC
+                            LIMIT $3
+                         ) n) AS news
+                    """,
+                    ticker,
+                    days,
+                    news_limit,
+                )
+                return {
+                    "fundamentals": (
+                        json.loads(row["fundamentals"]) if row["fundamentals"] else None
+                    ),
+                    "prices": json.loads(row["prices"]),
+                    "news": json.loads(row["news"]),
+                }
+        except asyncpg.PostgresError as e:
+            logger.error(f"Failed to fetch snapshot for {ticker}: {e}")
+            raise QueryError(f"Could not retrieve data for {ticker}") from e
+
     async def get_filing(self, ticker: str, filing_type: str = "10-K") -> Optional[str]:
-        """Get latest SEC filing content by concatenating chunks."""
+        """Get latest SEC filing content by concatenating chunks.
+
+        Holds the whole filing in memory; prefer iter_filing_chunks() for
+        large filings or RAG ingestion.
+        """
         try:
             async with self.acquire() as conn:
                 # Get the latest filing ID
@@ -214,28 +743,81 @@ class Database:
             logger.error(f"Failed to fetch filing for {ticker}: {e}")
             raise QueryError(f"Could not retrieve filing for {ticker}") from e
 
-    async def get_filing_metadata(
-        self, ticker: str, filing_type: str = "10-K"
-    ) -> Optional[Dict[str, Any]]:
-        """Get SEC filing metadata without content."""
+    async def iter_filing_chunks(
+        self, ticker: str, filing_type: str = "10-K", batch_size: int = 100
+    ) -> AsyncIterator[str]:
+        """Stream the latest SEC filing's text chunks in order.
+
+        Rows are read through a server-side cursor `batch_size` at a time, so
+        the filing is never fully materialized; concatenating the chunks gives
+        the same text as get_filing(). Yields nothing if there is no filing.
+
+        The connection stays checked out until the iteration finishes (or the
+        loop is exited), so consume it promptly.
+
+        Example:
+            await rag.add_document(db.iter_filing_chunks("AAPL"))
+        """
         try:
             async with self.acquire() as conn:
-                row = await conn.fetchrow(
-                    """
-                    SELECT filing_id, ticker, cik, company_name, filing_type,
-                           filing_date, filing_url, is_xbrl, sections, financial_data
-                    FROM thesis_data.edgar_filings
-                    WHERE ticker = $1 AND filing_type = $2
-                    ORDER BY filing_date DESC
-                    LIMIT 1
-                    """,
-                    ticker,
-                    filing_type,
-                )
-                return dict(row) if row else None
+                # Server-side cursors only exist inside a transaction
+                async with conn.transaction():
+                    filing_id = await conn.fetchval(
+                        """
+                        SELECT filing_id
+                        FROM thesis_data.edgar_filings
+                        WHERE ticker = $1 AND filing_type = $2
+                        ORDER BY filing_date DESC
+                        LIMIT 1
+                        """,
+                        ticker,
+                        filing_type,
+                    )
+                    if filing_id is None:
+                        logger.debug(f"No {filing_type} filing found for {ticker}")
+                        return
+                    cursor = conn.cursor(
+                        """
+                        SELECT chunk_text
+                        FROM thesis_data.edgar_filing_chunks
+                        WHERE filing_id = $1
+                        ORDER BY chunk_index
+                        """,
+                        filing_id,
+                        prefetch=batch_size,
+                    )
+                    async for row in cursor:
+                        yield row["chunk_text"]
         except asyncpg.PostgresError as e:
-            logger.error(f"Failed to fetch filing metadata for {ticker}: {e}")
-            raise QueryError(f"Could not retrieve filing metadata for {ticker}") from e
+            logger.error(f"Failed to stream filing for {ticker}: {e}")
+            raise QueryError(f"Could not retrieve filing for {ticker}") from e
+
+    async def get_filing_metadata(
+        self, ticker: str, filing_type: str = "10-K"
+    ) -> Optional[Dict[str, Any]]:
+        """Get SEC filing metadata without content (cached)."""
+
+        async def load() -> Optional[Dict[str, Any]]:
+            try:
+                async with self.acquire() as conn:
+                    row = await conn.fetchrow(
+                        """
+                        SELECT filing_id, ticker, cik, company_name, filing_type,
+                               filing_date, filing_url, is_xbrl, sections, financial_data
+                        FROM thesis_data.edgar_filings
+                        WHERE ticker = $1 AND filing_type = $2
+                        ORDER BY filing_date DESC
+                        LIMIT 1
+                        """,
+                        ticker,
+                        filing_type,
+                    )
+                    return dict(row) if row else None
+            except asyncpg.PostgresError as e:
+                logger.error(f"Failed to fetch filing metadata for {ticker}: {e}")
+                raise QueryError(f"Could not retrieve filing metadata for {ticker}") from e
+
+        return await self._cached(("get_filing_metadata", ticker, filing_type), load)
 
     async def get_macro_indicators(self, indicator: str, days: int = 365) -> List[Dict[str, Any]]:
         """Get macro economic indicator data from thesis_data.macro_indicators.
@@ -243,52 +825,58 @@ class Database:
         Args:
             indicator: One of 'cpi', 'unemployment', 'fed_funds', '10y_yield', 'gdp', 'inflation'
             days: Number of days of history
+
+        Cached; add_macro_indicator(s_bulk) invalidates the indicator.
         """
-        try:
-            async with self.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT date, value, units, indicator_name, series_id
-                    FROM thesis_data.macro_indicators
-                    WHERE indicator_name = $1
-                    ORDER BY date DESC
-                    LIMIT $2
-                    """,
-                    indicator,
-                    days,
-                )
-                return [dict(row) for row in rows]
-        except asyncpg.PostgresError as e:
-            logger.error(f"Failed to fetch macro indicator {indicator}: {e}")
-            raise QueryError(f"Could not retrieve macro indicator {indicator}") from e
+
+        async def load() -> List[Dict[str, Any]]:
+            try:
+                async with self.acquire() as conn:
+                    rows = await conn.fetch(
+                        """
+                        SELECT date, value, units, indicator_name, series_id
+                        FROM thesis_data.macro_indicators
+                        WHERE indicator_name = $1
+                        ORDER BY date DESC
+                        LIMIT $2
+                        """,
+                        indicator,
+                        days,
+                    )
+                    return [dict(row) for row in rows]
+            except asyncpg.PostgresError as e:
+                logger.error(f"Failed to fetch macro indicator {indicator}: {e}")
+                raise QueryError(f"Could not retrieve macro indicator {indicator}") from e
+
+        return await self._cached(("get_macro_indicators", indicator, days), load)
 
     async def list_macro_indicators(self) -> List[str]:
-        """List all available macro indicator names."""
-        try:
-            async with self.acquire() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT DISTINCT indicator_name
-                    FROM thesis_data.macro_indicators
-                    ORDER BY indicator_name
-                    """
-                )
-                return [row["indicator_name"] for row in rows]
-        except asyncpg.PostgresError as e:
-            logger.error(f"Failed to list macro indicators: {e}")
-            raise QueryError("Could not retrieve macro indicator list") from e
+        """List all available macro indicator names (cached)."""
+
+        async def load() -> List[str]:
+            try:
+                async with self.acquire() as conn:
+                    rows = await conn.fetch("""
+                        SELECT DISTINCT indicator_name
+                        FROM thesis_data.macro_indicators
+                        ORDER BY indicator_name
+                        """)
+                    return [row["indicator_name"] for row in rows]
+            except asyncpg.PostgresError as e:
+                logger.error(f"Failed to list macro indicators: {e}")
+                raise QueryError("Could not retrieve macro indicator list") from e
+
+        return await self._cached(("list_macro_indicators",), load)
 
     async def list_tickers(self) -> List[str]:
         """Get all available tickers from filings."""
         try:
             async with self.acquire() as conn:
-                rows = await conn.fetch(
-                    """
+                rows = await conn.fetch("""
                     SELECT DISTINCT ticker
                     FROM thesis_data.edgar_filings
                     ORDER BY ticker
-                    """
-                )
+                    """)
                 return [row["ticker"] for row in rows]
         except asyncpg.PostgresError as e:
             logger.error(f"Failed to list tickers: {e}")
@@ -326,6 +914,7 @@ class Database:
                     data.get("sections"),
                     data.get("financial_data"),
                 )
+                await self._invalidate_for_change("edgar_filings", [data["ticker"]])
                 logger.debug(f"Added filing {data['filing_id']} for {data['ticker']}")
                 return True
         except asyncpg.PostgresError as e:
@@ -440,11 +1029,232 @@ class Database:
                     data.get("month"),
                     data.get("quarter"),
                 )
+                await self._invalidate_for_change("macro_indicators", [data["indicator_name"]])
                 return True
         except asyncpg.PostgresError as e:
             logger.error(f"Failed to add macro indicator: {e}")
             raise QueryError("Could not insert macro indicator") from e
 
+    # =========================================================================
+    # BULK INSERT METHODS - COPY into a staging table, then one upsert
+    # =========================================================================
+
+    async def _bulk_upsert(
+        self,
+        table: str,
+        columns: Sequence[str],
+        records: List[Tuple[Any, ...]],
+        conflict: Sequence[str],
+        update: Sequence[str],
+        distinct_on: Optional[str] = None,
+    ) -> BulkLoadResult:
+        """COPY records into a temp staging table and upsert them in one statement.
+
+        Args:
+            table: Target table in thesis_data schema
+            columns: Column names matching each record tuple
+            records: Rows to load
+            conflict: Unique-constraint columns for ON CONFLICT
+            update: Columns overwritten when a row already exists
+            distinct_on: Expression used to drop duplicate keys within the batch
+                (defaults to the conflict columns; the last occurrence wins)
+
+        Returns:
+            BulkLoadResult with row count and throughput
+        """
+        started = time.perf_counter()
+        if not records:
+            return BulkLoadResult(table=table, rows=0, seconds=0.0)
+
+        stage = f"_stage_{table}"
+        column_list = ", ".join(columns)
+        key = distinct_on or ", ".join(conflict)
+        updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in update)
+
+        try:
+            async with self.acquire() as conn:
+                if self.config.numeric_as_float:
+                    # COPY needs binary codecs; the float codec is text-only
+                    await conn.reset_type_codec("numeric", schema="pg_catalog")
+                try:
+                    async with conn.transaction():
+                        await conn.execute(f"""
+                            CREATE TEMP TABLE {stage} ON COMMIT DROP AS
+                            SELECT {column_list} FROM thesis_data.{table} WITH NO DATA
+                            """)
+                        await conn.copy_records_to_table(
+                            stage, records=records, columns=list(columns)
+                        )
+                        # ON CONFLICT cannot touch the same row twice, so de-duplicate first.
+                        # ctid follows COPY order in the fresh staging table: last row wins.
+                        await conn.execute(f"""
+                            INSERT INTO thesis_data.{table} ({column_list})
+                            SELECT DISTINCT ON ({key}) {column_list}
+                            FROM {stage}
+                            ORDER BY {key}, ctid DESC
+                            ON CONFLICT ({", ".join(conflict)}) DO UPDATE SET {updates}
+                            """)
+                finally:
+                    if self.config.numeric_as_float:
+                        await self._init_connection(conn)
+        except asyncpg.PostgresError as e:
+            logger.error(f"Bulk load into {table} failed: {e}")
+            raise QueryError(f"Could not bulk insert into {table}") from e
+
+        result = BulkLoadResult(
+            table=table, rows=len(records), seconds=time.perf_counter() - started
+        )
+        logger.info(
+            f"Bulk loaded {result.rows} rows into {table} in {result.seconds:.3f}s "
+            f"({result.rows_per_second:,.0f} rows/s)"
+        )
+        return result
+
+    @staticmethod
+    def _rows_for(
+        ticker_or_rows: Union[str, Iterable[Dict[str, Any]]],
+        rows: Optional[Iterable[Dict[str, Any]]],
+    ) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """Normalize (ticker, rows) or rows-with-'ticker'-key into (ticker, row) pairs."""
+        if isinstance(ticker_or_rows, str):
+            return ((ticker_or_rows, row) for row in rows or [])
+        return ((row["ticker"], row) for row in ticker_or_rows)
+
+    async def add_prices_bulk(
+        self,
+        ticker_or_rows: Union[str, Iterable[Dict[str, Any]]],
+        prices: Optional[Iterable[Dict[str, Any]]] = None,
+    ) -> BulkLoadResult:
+        """Bulk insert price rows (same row format as add_price).
+
+        Args:
+            ticker_or_rows: Ticker for all rows in `prices`, or an iterable of
+                price dicts that each carry a 'ticker' key
+            prices: Price dicts when a ticker is given as first argument
+
+        Example:
+            await db.add_prices_bulk("AAPL", [{"date": d, "open": 1, ...}, ...])
+            await db.add_prices_bulk([{"ticker": "AAPL", "date": d, ...}, ...])
+        """
+        records = [
+            (
+                ticker,
+                row["date"],
+                row["open"],
+                row["high"],
+                row["low"],
+                row["close"],
+                row["volume"],
+                row.get("source", "mock"),
+            )
+            for ticker, row in self._rows_for(ticker_or_rows, prices)
+        ]
+        return await self._bulk_upsert(
+            "prices",
+            ["ticker", "price_date", "open", "high", "low", "close", "volume", "source"],
+            records,
+            conflict=["ticker", "price_date"],
+            update=["open", "high", "low", "close", "volume", "source"],
+        )
+
+    async def add_news_bulk(
+        self,
+        ticker_or_rows: Union[str, Iterable[Dict[str, Any]]],
+        articles: Optional[Iterable[Dict[str, Any]]] = None,
+    ) -> BulkLoadResult:
+        """Bulk insert news articles (same row format as add_news).
+
+        Args:
+            ticker_or_rows: Ticker for all rows in `articles`, or an iterable of
+                article dicts that each carry a 'ticker' key
+            articles: Article dicts when a ticker is given as first argument
+        """
+        records = [
+            (
+                row.get("article_id"),
+                ticker,
+                row["headline"],
+                row.get("summary"),
+                row.get("url"),
+                row["published_at"],
+                row.get("source"),
+                row.get("sentiment_score"),
+                row.get("sentiment_label"),
+                row.get("has_earnings_keyword", False),
+                row.get("has_acquisition_keyword", False),
+                row.get("has_regulatory_keyword", False),
+            )
+            for ticker, row in self._rows_for(ticker_or_rows, articles)
+        ]
+        return await self._bulk_upsert(
+            "stock_news",
+            [
+                "article_id",
+                "ticker",
+                "headline",
+                "summary",
+                "url",
+                "published_at",
+                "source",
+                "sentiment_score",
+                "sentiment_label",
+                "has_earnings_keyword",
+                "has_acquisition_keyword",
+                "has_regulatory_keyword",
+            ],
+            records,
+            conflict=["article_id"],
+            update=["headline", "sentiment_score", "sentiment_label"],
+            # NULL article_ids never conflict, so keep each of them
+            distinct_on="article_id, CASE WHEN article_id IS NULL THEN ctid END",
+        )
+
+    async def add_filing_chunks_bulk(
+        self, filing_id: str, chunks: Iterable[Union[str, Tuple[int, str]]]
+    ) -> BulkLoadResult:
+        """Bulk insert text chunks for one filing.
+
+        Args:
+            filing_id: Filing the chunks belong to
+            chunks: Chunk texts in order (index = position), or (chunk_index, text) pairs
+        """
+        records = [
+            (filing_id, *chunk) if isinstance(chunk, tuple) else (filing_id, idx, chunk)
+            for idx, chunk in enumerate(chunks)
+        ]
+        return await self._bulk_upsert(
+            "edgar_filing_chunks",
+            ["filing_id", "chunk_index", "chunk_text"],
+            records,
+            conflict=["filing_id", "chunk_index"],
+            update=["chunk_text"],
+        )
+
+    async def add_macro_indicators_bulk(self, rows: Iterable[Dict[str, Any]]) -> BulkLoadResult:
+        """Bulk insert macro indicator rows (same row format as add_macro_indicator)."""
+        records = [
+            (
+                row["indicator_name"],
+                row.get("series_id"),
+                row["date"],
+                row["value"],
+                row.get("units"),
+                row.get("year"),
+                row.get("month"),
+                row.get("quarter"),
+            )
+            for row in rows
+        ]
+        result = await self._bulk_upsert(
+            "macro_indicators",
+            ["indicator_name", "series_id", "date", "value", "units", "year", "month", "quarter"],
+            records,
+            conflict=["indicator_name", "date"],
+            update=["value"],
+        )
+        await self._invalidate_for_change("macro_indicators", {record[0] for record in records})
+        return result
+
     # =========================================================================
     # UTILITY METHODS
     # =========================================================================
@@ -496,3 +1306,121 @@ class Database:
         }
 
         return await self.add_filing(filing_data)
+
+
+class TickerIndex:
+    """In-process index of known tickers for O(1) existence checks.
+
+    Loads the ticker list once (e.g., at API startup) instead of running
+    SELECT DISTINCT over edgar_filings on every request. Once the TTL has
+    expired, the next lookup schedules a background refresh and keeps serving
+    the current snapshot. Register handle_change as a change listener to pick
+    up new tickers from any process without waiting for the TTL; after such an
+    explicit invalidation the next lookup waits for the reload, so a ticker
+    that was just added is never reported missing.
+
+    Example:
+        index = TickerIndex(db)
+        db.add_change_listener(index.handle_change)
+        await index.load()
+        if await index.exists("AAPL"):
+            ...
+    """
+
+    def __init__(self, db: Database, ttl: Optional[float] = None):
+        """Initialize ticker index.
+
+        Args:
+            db: Connected database used to load tickers
+            ttl: Seconds before the snapshot is refreshed (0 disables expiry)
+        """
+        self.db = db
+        self.ttl = Config.get_ticker_index_ttl() if ttl is None else ttl
+        self._tickers: FrozenSet[str] = frozenset()
+        self._sorted: List[str] = []
+        self._loaded_at: Optional[float] = None
+        self._invalidated = False
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def load(self) -> None:
+        """Load the ticker snapshot from the database (alias for refresh)."""
+        await self.refresh()
+
+    async def refresh(self) -> None:
+        """Reload tickers from the database.
+
+        Concurrent callers share one query instead of each scanning the table.
+        """
+        started = time.monotonic()
+        async with self._lock:
+            fresh = self._loaded_at is not None and self._loaded_at >= started
+            if fresh and not self._invalidated:
+                return  # Another caller refreshed while we waited
+            # Cleared before the query, so an invalidation that arrives while
+            # it runs triggers another refresh instead of being lost
+            self._invalidated = False
+            try:
+                tickers = await self.db.list_tickers()
+            except BaseException:
+                self._invalidated = True
+                raise
+            self._sorted = tickers
+            self._tickers = frozenset(tickers)
+            self._loaded_at = time.monotonic()
+            logger.debug(f"Ticker index loaded ({len(tickers)} tickers)")
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale so the next lookup triggers a refresh."""
+        self._invalidated = True
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the snapshot is older than the TTL."""
+        if self._loaded_at is None or self._invalidated:
+            return True
+        return self.ttl > 0 and time.monotonic() - self._loaded_at > self.ttl
+
+    async def _ensure_loaded(self) -> None:
+        """Load on first use or after invalidate(); refresh expired snapshots in the background."""
+        if self._loaded_at is None:
+            await self.refresh()
+        elif self._invalidated:
+            await self._refresh_or_keep()
+        elif self.is_stale and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_or_keep())
+
+    async def _refresh_or_keep(self) -> None:
+        try:
+            await self.refresh()
+        except DatabaseError as e:
+            # Keep serving the previous snapshot; retry on the next lookup
+            logger.warning(f"Ticker index refresh failed: {e}")
+
+    def handle_change(self, table: str, op: str, keys: Optional[List[str]]) -> None:
+        """Change listener for Database.add_change_listener.
+
+        Marks the snapshot stale when filings change, except for inserts that
+        only touch tickers already in the index.
+        """
+        if table not in ("edgar_filings", "*"):
+            return
+        if op == "INSERT" and keys is not None and all(k in self._tickers for k in keys):
+            return
+        self.invalidate()
+
+    async def exists(self, ticker: str) -> bool:
+        """Check whether a ticker is known."""
+        await self._ensure_loaded()
+        return ticker in self._tickers
+
+    async def list_tickers(self) -> List[str]:
+        """Get all known tickers, sorted (same result as Database.list_tickers)."""
+        await self._ensure_loaded()
+        return list(self._sorted)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._tickers
+
+    def __len__(self) -> int:
+        return len(self._tickers)
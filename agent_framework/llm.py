@@ -1,10 +1,70 @@
-"""LLM client with error handling, retries, and system prompts."""
+"""LLM client with error handling, retries, and system prompts.
+
+Uses the providers' native async SDK clients, so in-flight calls don't occupy
+executor threads. Clients are shared per provider and credentials (one HTTP
+connection pool each) across all LLMClient instances on an event loop.
+
+Responses can be cached (LLMConfig.use_cache, backend chosen by LLM_CACHE):
+identical prompts with identical model and sampling settings reuse the
+stored text instead of calling the provider again. Identical calls that are
+in flight at the same time are coalesced into one provider call.
+
+Calls to each provider model share a RateLimiter (requests/min, tokens/min,
+max in flight; see resilience.py), so bursts queue client-side instead of
+running into 429s. The SDKs' own retries are disabled; chat() retries with
+jittered backoff and honours Retry-After.
+
+Each provider endpoint has a CircuitBreaker. Once it opens, calls skip that
+provider and go to the next entry of LLMConfig.fallbacks right away.
+
+With LLMConfig.hedge_percentile set, a call still running after that
+percentile of the model's recent latency (llm_latency) gets a duplicate
+request; the first answer wins and the other is cancelled.
+
+Prompts are ordered stable-first (system prompt, then context, then the
+question) so providers can reuse a cached prefix. With
+LLMConfig.prompt_caching, Anthropic requests mark the system prompt and
+context as cacheable; OpenAI caches long prefixes automatically. Input tokens
+read from the cache vs processed in full are counted per model (token_usage).
+
+With LLMConfig.batch, calls are collected and sent through the provider's
+batch API instead (see batch.py): cheaper, but results take minutes to hours.
+"""
 
-import logging
 import asyncio
-from typing import List, Optional
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
+from .batch import (
+    AnthropicBatchBackend,
+    LLMBatcher,
+    OpenAIBatchBackend,
+    StubBatchBackend,
+)
+from .cache import AsyncCache, LRUCache, SQLiteCache
+from .compression import estimate_tokens
+from .config import Config
+from .metrics import LatencyTracker
 from .models import LLMConfig
+from .resilience import (
+    CircuitBreaker,
+    RateLimiter,
+    is_client_error,
+    is_provider_failure,
+    is_rate_limit,
+    retry_after,
+    retry_delay,
+)
+from .stub_llm import StubLLM
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,12 +89,236 @@ class RateLimitError(LLMError):
     pass
 
 
+# Event loop -> {(provider, base_url, api_key): SDK client}, shared by every
+# LLMClient whatever its model, temperature or persona. HTTP pools are bound
+# to the loop they were created on, hence one set per loop.
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Event loop -> {cache key: future of the in-flight identical call}
+_inflight_calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# Event loop -> {(provider, model): RateLimiter}
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, RateLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+# (provider, base_url) -> CircuitBreaker; plain state, so shared across loops
+_breakers: Dict[Tuple[str, Optional[str]], CircuitBreaker] = {}
+
+# Event loop -> {(provider, base_url, api_key): LLMBatcher} for LLMConfig.batch
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, LLMBatcher]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Providers with a batch API (others run batch-mode calls one by one)
+_BATCH_BACKENDS = {
+    "openai": OpenAIBatchBackend,
+    "anthropic": AnthropicBatchBackend,
+    "stub": StubBatchBackend,
+}
+
+
+@dataclass
+class LLMCallStats:
+    """Process-wide LLMClient.chat() counters."""
+
+    requests: int = 0  # chat() calls
+    coalesced: int = 0  # Calls that joined an identical in-flight call
+    provider_calls: int = 0  # Calls that reached the provider (cache misses included)
+    hedged: int = 0  # Calls that sent a hedge request
+    hedge_wins: int = 0  # Hedge requests that answered first
+
+    def to_dict(self) -> Dict[str, int]:
+        """Plain-dict view for logging and JSON responses."""
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "provider_calls": self.provider_calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+call_stats = LLMCallStats()
+
+
+@dataclass
+class TokenUsage:
+    """Provider-reported token counts for one provider/model."""
+
+    calls: int = 0
+    input_tokens: int = 0  # All prompt tokens, cached ones included
+    cached_input_tokens: int = 0  # Read from the provider's prompt cache
+    cache_write_tokens: int = 0  # Written to the prompt cache (Anthropic bills these extra)
+    output_tokens: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict view for logging and JSON responses."""
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "uncached_input_tokens": self.input_tokens - self.cached_input_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_input_ratio": (
+                round(self.cached_input_tokens / self.input_tokens, 3) if self.input_tokens else 0.0
+            ),
+        }
+
+
+# Provider-reported usage per "provider/model"
+token_usage: Dict[str, TokenUsage] = {}
+
+# Latency of provider calls per "provider/model"; drives hedging. Only primary
+# requests are measured (see _complete), so hedging can't skew its own threshold.
+llm_latency = LatencyTracker()
+
+# Set inside hedge request tasks
+_is_hedge_request: ContextVar[bool] = ContextVar("_is_hedge_request", default=False)
+
+# Separates context from the question in the user message; everything before
+# it is the cacheable prefix
+_QUESTION_SEPARATOR = "\n\nQuestion: "
+
+# Ollama's httpx pool defaults to 100 connections; match the OpenAI/Anthropic SDKs
+_OLLAMA_MAX_CONNECTIONS = 1000
+_OLLAMA_MAX_KEEPALIVE = 100
+
+
+# Set by capture_tokens(); chat() streams and forwards deltas here when present
+_token_sink: ContextVar[Optional[Callable[[str], Any]]] = ContextVar("llm_token_sink", default=None)
+
+
+@contextmanager
+def capture_tokens(sink: Callable[[str], Any]):
+    """Forward the tokens of every LLMClient.chat() call in this context to `sink`.
+
+    Lets callers stream an agent's LLM output without changing the agent:
+    chat() still returns the full text, but generates it with stream() and
+    calls sink(delta) as tokens arrive. Tasks created inside the block inherit
+    the sink.
+
+    Example:
+        queue = asyncio.Queue()
+        with capture_tokens(queue.put_nowait):
+            task = asyncio.create_task(agent.analyze(ticker, data))
+    """
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+
+# Process-wide response cache, built from Config on first use
+_response_cache: Optional[AsyncCache] = None
+
+
+def get_llm_cache() -> Optional[AsyncCache]:
+    """Return the shared LLM response cache configured by LLM_CACHE.
+
+    Returns:
+        LRUCache ('memory'), SQLiteCache ('sqlite'), or None ('off')
+
+    Raises:
+        LLMError: If LLM_CACHE names an unknown backend
+    """
+    global _response_cache
+    if _response_cache is None:
+        backend = Config.get_llm_cache()
+        if backend == "memory":
+            _response_cache = LRUCache(max_entries=Config.get_llm_cache_max_entries())
+        elif backend == "sqlite":
+            _response_cache = SQLiteCache(
+                Config.get_llm_cache_path(), max_entries=Config.get_llm_cache_max_entries()
+            )
+        elif backend != "off":
+            raise LLMError(f"Unknown LLM_CACHE backend: {backend} (use off, memory or sqlite)")
+    return _response_cache
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Per provider/model limiter state on the running loop (limits, in flight, waiting)."""
+    limiters = _limiters.get(asyncio.get_running_loop(), {})
+    return {
+        f"{provider}/{model}": limiter.to_dict() for (provider, model), limiter in limiters.items()
+    }
+
+
+def token_usage_stats() -> Dict[str, Dict[str, Any]]:
+    """Per provider/model token counts, split into cached and uncached input."""
+    return {key: usage.to_dict() for key, usage in token_usage.items()}
+
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """State of each provider endpoint's circuit breaker (closed, open, half_open)."""
+    return {
+        provider if base_url is None else f"{provider} ({base_url})": breaker.to_dict()
+        for (provider, base_url), breaker in _breakers.items()
+    }
+
+
+def batch_stats() -> Dict[str, Dict[str, int]]:
+    """Per provider endpoint batch-mode counters on the running loop."""
+    batchers = _batchers.get(asyncio.get_running_loop(), {})
+    return {
+        provider if base_url is None else f"{provider} ({base_url})": batcher.to_dict()
+        for (provider, base_url, _), batcher in batchers.items()
+    }
+
+
+def llm_client_stats() -> Dict[str, Dict[str, int]]:
+    """Shared SDK clients on the running loop and their open HTTP connections, per provider."""
+    stats: Dict[str, Dict[str, int]] = {}
+    for key, client in _shared_clients.get(asyncio.get_running_loop(), {}).items():
+        provider = stats.setdefault(key[0], {"clients": 0, "connections": 0, "idle": 0})
+        provider["clients"] += 1
+        connections = _open_connections(client)
+        provider["connections"] += len(connections)
+        provider["idle"] += sum(1 for connection in connections if connection.is_idle())
+    return stats
+
+
+def _open_connections(client: Any) -> List[Any]:
+    """Open connections in an SDK client's httpx pool (empty if it has none)."""
+    # OpenAI, Anthropic and Ollama clients all wrap an httpx.AsyncClient as _client
+    transport = getattr(getattr(client, "_client", None), "_transport", None)
+    pool = getattr(transport, "_pool", None)
+    return [c for c in getattr(pool, "connections", []) if not c.is_closed()]
+
+
+async def aclose_llm_clients() -> None:
+    """Close the shared SDK clients (and their connection pools) of the running loop.
+
+    Call on application shutdown; clients are recreated on next use.
+    """
+    clients = _shared_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        try:
+            result = client.close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Failed to close LLM client: {e}")
+
+
 class LLMClient:
     """Unified LLM client with error handling and system prompt support.
 
     Features:
-    - Supports OpenAI, Anthropic, Ollama
-    - Automatic retries with exponential backoff
+    - Supports OpenAI, Anthropic, Ollama (native async SDK clients)
+    - Shared HTTP connection pool per provider
+    - Shared per-model rate limits (requests/min, tokens/min, in flight)
+    - Automatic retries with jittered backoff, honouring Retry-After
+    - Fallback providers behind per-provider circuit breakers
+    - Optional response cache (in-memory or SQLite)
     - System prompts for agent personas
     - Comprehensive error handling
     - Timeout management
@@ -42,77 +326,215 @@ class LLMClient:
     Example:
         config = LLMConfig(provider='ollama', model='llama3.2')
         client = LLMClient(config)
-        response = client.chat("Analyze AAPL stock")
+        response = await client.chat("Analyze AAPL stock")
     """
 
-    def __init__(self, config: LLMConfig):
+    # Package name and install hint per provider
+    _SDK_PACKAGES = {"openai": "openai", "anthropic": "anthropic", "ollama": "ollama"}
+
+    def __init__(self, config: LLMConfig, cache: Optional[AsyncCache] = None):
         """Initialize LLM client.
 
         Args:
             config: LLM configuration including system_prompt for persona
+            cache: Response cache (default: the shared LLM_CACHE backend when
+                config.use_cache is set)
         """
         self.config = config
-        self._client = None
+        if cache is None and config.use_cache:
+            cache = get_llm_cache()
+        self.cache = cache
+        # Fallbacks keep the persona unless they define their own
+        self.fallbacks = [
+            LLMClient(
+                fallback.model_copy(
+                    update={"system_prompt": fallback.system_prompt or config.system_prompt}
+                ),
+                cache=cache,
+            )
+            for fallback in config.fallbacks
+        ]
+        self.hedge_client = self
+        if config.hedge_to is not None:
+            self.hedge_client = LLMClient(
+                config.hedge_to.model_copy(
+                    update={"system_prompt": config.hedge_to.system_prompt or config.system_prompt}
+                ),
+                cache=cache,
+            )
 
-    def _get_client(self):
-        """Lazy initialize provider-specific client.
+    def _import_sdk(self):
+        """Import the provider SDK module.
 
         Returns:
-            Provider client
+            SDK module
+
+        Raises:
+            LLMError: If provider is unknown or its package is not installed
+        """
+        package = self._SDK_PACKAGES.get(self.config.provider)
+        if package is None:
+            raise LLMError(f"Unknown provider: {self.config.provider}")
+        try:
+            return importlib.import_module(package)
+        except ImportError:
+            raise LLMError(
+                f"{package.capitalize()} package not installed. Install with: "
+                f"pip install 'ai-agent-framework[llm]' or pip install {package}"
+            )
+
+    async def _get_client(self):
+        """Get the shared async client for this provider and credentials.
+
+        Returns:
+            Provider async client
 
         Raises:
             LLMError: If provider initialization fails
         """
-        if self._client is not None:
-            return self._client
+        clients = _shared_clients.setdefault(asyncio.get_running_loop(), {})
+        key = (self.config.provider, self.config.base_url, self.config.api_key)
+        if self.config.provider == "ollama":
+            key += (self.config.timeout,)  # The ollama SDK only takes a timeout per client
+        client = clients.get(key)
+        if client is not None:
+            return client
+
+        if self.config.provider == "stub":
+            client = clients[key] = StubLLM(
+                latency=Config.get_stub_latency(),
+                error_rate=Config.get_stub_error_rate(),
+                rate_limit_rate=Config.get_stub_rate_limit_rate(),
+                output_tokens=Config.get_stub_output_tokens(),
+                batch_latency=Config.get_stub_batch_latency(),
+                seed=Config.get_stub_seed(),
+            )
+            logger.info(f"Initialized stub LLM (latency {client.latency})")
+            return client
+
+        # SDK imports are slow the first time; keep them off the event loop
+        sdk = await asyncio.to_thread(self._import_sdk)
+        client = clients.get(key)  # Another task may have created it meanwhile
+        if client is not None:
+            return client
 
         try:
             if self.config.provider == "openai":
-                try:
-                    import openai
-                except ImportError:
-                    raise LLMError(
-                        "OpenAI package not installed. Install with: pip install 'ai-agent-framework[llm]' or pip install openai"
-                    )
-                self._client = openai.OpenAI(
-                    api_key=self.config.api_key, timeout=self.config.timeout
+                client = sdk.AsyncOpenAI(
+                    api_key=self.config.api_key,
+                    base_url=self.config.base_url,
+                    timeout=self.config.timeout,
+                    max_retries=0,  # chat() retries, in step with the rate limiter
                 )
             elif self.config.provider == "anthropic":
-                try:
-                    import anthropic
-                except ImportError:
-                    raise LLMError(
-                        "Anthropic package not installed. Install with: pip install 'ai-agent-framework[llm]' or pip install anthropic"
-                    )
-                self._client = anthropic.Anthropic(
-                    api_key=self.config.api_key, timeout=self.config.timeout
+                client = sdk.AsyncAnthropic(
+                    api_key=self.config.api_key,
+                    base_url=self.config.base_url,
+                    timeout=self.config.timeout,
+                    max_retries=0,
                 )
-            elif self.config.provider == "ollama":
-                try:
-                    import ollama
-                except ImportError:
-                    raise LLMError(
-                        "Ollama package not installed. Install with: pip install 'ai-agent-framework[llm]' or pip install ollama"
-                    )
-                self._client = ollama.Client(host=self.config.base_url or "http://localhost:11434")
             else:
-                raise LLMError(f"Unknown provider: {self.config.provider}")
+                import httpx  # Installed with ollama
 
-            logger.info(f"Initialized {self.config.provider} client")
-            return self._client
-        except LLMError:
-            # Re-raise LLMError as-is with clear message
-            raise
+                client = sdk.AsyncClient(
+                    host=self.config.base_url or "http://localhost:11434",
+                    timeout=self.config.timeout,
+                    limits=httpx.Limits(
+                        max_connections=_OLLAMA_MAX_CONNECTIONS,
+                        max_keepalive_connections=_OLLAMA_MAX_KEEPALIVE,
+                    ),
+                )
         except Exception as e:
             logger.error(f"Failed to initialize {self.config.provider} client: {e}")
             raise LLMError(f"Could not initialize {self.config.provider}: {e}") from e
 
-    async def chat(self, message: str, context: Optional[str] = None) -> str:
+        clients[key] = client
+        logger.info(f"Initialized {self.config.provider} async client")
+        return client
+
+    async def _get_batcher(self) -> LLMBatcher:
+        """Get the batcher shared by all batch-mode clients of this provider endpoint."""
+        batchers = _batchers.setdefault(asyncio.get_running_loop(), {})
+        key = (self.config.provider, self.config.base_url, self.config.api_key)
+        if key not in batchers:
+            client = await self._get_client()
+            if key not in batchers:  # Another task may have created it meanwhile
+                batchers[key] = LLMBatcher(
+                    _BATCH_BACKENDS[self.config.provider](client),
+                    max_size=Config.get_llm_batch_max_size(),
+                    window=Config.get_llm_batch_window(),
+                    poll_interval=Config.get_llm_batch_poll_interval(),
+                )
+        return batchers[key]
+
+    def _get_limiter(self) -> RateLimiter:
+        """Get the rate limiter shared by all clients of this provider and model.
+
+        The first client to use a provider model sets its limits.
+        """
+        limiters = _limiters.setdefault(asyncio.get_running_loop(), {})
+        key = (self.config.provider, self.config.model)
+        limiter = limiters.get(key)
+        if limiter is None:
+            limiter = limiters[key] = RateLimiter(
+                requests_per_minute=self.config.requests_per_minute,
+                tokens_per_minute=self.config.tokens_per_minute,
+                max_concurrency=self.config.max_concurrency,
+            )
+        return limiter
+
+    def _get_breaker(self) -> CircuitBreaker:
+        """Get the circuit breaker shared by all clients of this provider endpoint."""
+        key = (self.config.provider, self.config.base_url)
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(
+                failure_threshold=Config.get_llm_breaker_failure_threshold(),
+                reset_timeout=Config.get_llm_breaker_reset_timeout(),
+            )
+        return breaker
+
+    def _token_budget(self, messages: List[dict]) -> int:
+        """Tokens a call may use: estimated prompt plus max_tokens.
+
+        Providers count max_tokens against the tokens/min limit up front too.
+        """
+        prompt = (self.config.system_prompt or "") + "".join(m["content"] for m in messages)
+        return estimate_tokens(prompt) + (self.config.max_tokens or 0)
+
+    def _record_usage(
+        self,
+        input_tokens: Optional[int],
+        output_tokens: Optional[int],
+        cached_input_tokens: Optional[int] = 0,
+        cache_write_tokens: Optional[int] = 0,
+    ) -> None:
+        """Add a response's provider-reported token counts to token_usage.
+
+        Args:
+            input_tokens: All prompt tokens, cached and cache-write ones included
+            output_tokens: Completion tokens
+            cached_input_tokens: Prompt tokens read from the provider's cache
+            cache_write_tokens: Prompt tokens written to the provider's cache
+        """
+        usage = token_usage.setdefault(self._latency_key(), TokenUsage())
+        usage.calls += 1
+        usage.input_tokens += input_tokens or 0
+        usage.output_tokens += output_tokens or 0
+        usage.cached_input_tokens += cached_input_tokens or 0
+        usage.cache_write_tokens += cache_write_tokens or 0
+
+    async def chat(self, message: str, context: Optional[str] = None, fresh: bool = False) -> str:
         """Send chat message with optional context and retries.
 
+        Identical calls already in flight (same prompt, model and sampling
+        settings) are not sent again; they wait for and share that result.
+
         Args:
             message: User message
             context: Additional context (e.g., from RAG)
+            fresh: Skip the response cache and coalescing, e.g. to draw a new
+                sample at temperature > 0
 
         Returns:
             LLM response text
@@ -121,59 +543,433 @@ class LLMClient:
             LLMError: If all retries fail
             RateLimitError: If rate limit exceeded
         """
-        # Initialize client in thread to avoid blocking the event loop
-        client = await asyncio.to_thread(self._get_client)
+        call_stats.requests += 1
+        coalesce = Config.get_llm_coalesce()
+        if fresh or (self.cache is None and not coalesce):
+            return await self._generate(message, context)
 
-        # Build messages with system prompt (persona) if provided
-        messages = []
+        generated = False
 
-        # Add context if provided
-        if context:
-            full_message = f"Context:\n{context}\n\nQuestion: {message}"
+        async def generate() -> str:
+            nonlocal generated
+            generated = True
+            return await self._generate(message, context)
+
+        key = self._cache_key(message, context)
+        if self.cache is None:
+            load = generate
         else:
-            full_message = message
 
-        messages.append({"role": "user", "content": full_message})
+            async def load() -> str:
+                return await self.cache.get_or_load(key, generate, Config.get_llm_cache_ttl())
+
+        text = await (self._single_flight(key, load) if coalesce else load())
+        sink = _token_sink.get()
+        if sink is not None and not generated:
+            sink(text)  # Cached or coalesced: deliver the whole response as one delta
+        return text
+
+    async def _single_flight(self, key: Tuple[str, str], load: Callable[[], Any]) -> str:
+        """Run `load` once for concurrent calls with the same key.
+
+        Raises:
+            Whatever `load` raises, to every waiting caller
+        """
+        inflight = _inflight_calls.setdefault(asyncio.get_running_loop(), {})
+        pending = inflight.get(key)
+        if pending is not None:
+            call_stats.coalesced += 1
+            try:
+                # shield: one waiter being cancelled must not cancel the shared call
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # This caller was cancelled
+                # The calling task was cancelled; call on our own below
+
+        future = asyncio.get_running_loop().create_future()
+        inflight[key] = future
+        try:
+            text = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            if inflight.get(key) is future:
+                del inflight[key]
+        future.set_result(text)
+        return text
+
+    def _cache_key(self, message: str, context: Optional[str]) -> Tuple[str, str]:
+        """Cache key: hash of everything that shapes the response."""
+        prompt = {
+            "provider": self.config.provider,
+            "model": self.config.model,
+            "system_prompt": self.config.system_prompt,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens,
+            "context": context,
+            "message": message,
+        }
+        digest = hashlib.sha256(json.dumps(prompt, sort_keys=True).encode()).hexdigest()
+        return ("llm_chat", digest)
+
+    async def _generate(self, message: str, context: Optional[str]) -> str:
+        """Call the provider (streaming to the capture_tokens sink if set).
+
+        Tries this client's provider, then each fallback in order, skipping
+        providers whose circuit breaker is open.
+        """
+        call_stats.provider_calls += 1
+        sink = _token_sink.get()
+        if self.config.batch and self.config.provider in _BATCH_BACKENDS:
+            text = await self._batched(message, context)
+            if sink is not None:
+                sink(text)
+            return text
+        if sink is not None:
+            parts = []
+            async for delta in self.stream(message, context):
+                parts.append(delta)
+                sink(delta)
+            return "".join(parts)
+
+        if self.config.hedge_percentile:
+            return await self._hedged(message, context)  # Not used when streaming
+        return await self._call_chain(message, context)
+
+    async def _batched(self, message: str, context: Optional[str]) -> str:
+        """Send the call as part of a provider batch job and wait for its result.
+
+        No retries or fallbacks: a batch job already runs for hours, and a
+        failed request is reported to the caller.
+
+        Raises:
+            APIError: If the request or its whole batch job failed
+        """
+        batcher = await self._get_batcher()
+        result = await batcher.submit(self._batch_body(self._build_messages(message, context)))
+        if result.error is not None:
+            raise APIError(f"Batch request failed: {result.error}")
+        self._record_usage(result.input_tokens, result.output_tokens, result.cached_input_tokens)
+        return result.text
+
+    def _batch_body(self, messages: List[dict]) -> Dict[str, Any]:
+        """Request parameters for one call in a batch job, in the provider's format."""
+        body = {
+            "model": self.config.model,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens,
+        }
+        if self.config.provider == "anthropic":
+            system, messages = self._anthropic_prompt(messages)
+            if system:
+                body["system"] = system
+        elif self.config.system_prompt:
+            messages = [{"role": "system", "content": self.config.system_prompt}] + messages
+        body["messages"] = messages
+        return body
+
+    async def _call_chain(self, message: str, context: Optional[str]) -> str:
+        """Try this client's provider, then each fallback whose breaker allows it."""
+        last_error = None
+        for client in [self] + self.fallbacks:
+            if not client._get_breaker().allow():
+                continue
+            try:
+                return await client._complete(message, context)
+            except LLMError as e:
+                last_error = e
+                if client is not self or self.fallbacks:
+                    logger.warning(f"{client.config.provider} failed, trying next provider: {e}")
+        raise self._unavailable(last_error)
+
+    def _latency_key(self) -> str:
+        return f"{self.config.provider}/{self.config.model}"
+
+    def _record_latency(self, started: float) -> None:
+        """Record a primary request's latency (hedges only win when fast, so they'd bias it)."""
+        if not _is_hedge_request.get():
+            llm_latency.record(self._latency_key(), time.perf_counter() - started)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a call gets a hedge request, or None if hedging is off.
+
+        The hedge_percentile of this model's recent latency; None until
+        LLM_HEDGE_MIN_SAMPLES calls have been measured.
+        """
+        if not self.config.hedge_percentile:
+            return None
+        if llm_latency.sample_count(self._latency_key()) < Config.get_llm_hedge_min_samples():
+            return None
+        return llm_latency.percentile(self._latency_key(), self.config.hedge_percentile)
+
+    async def _hedged(self, message: str, context: Optional[str]) -> str:
+        """Call the provider chain; if slow, race it against a hedge request."""
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._call_chain(message, context)
+
+        primary = asyncio.create_task(self._call_chain(message, context))
+        tasks = {primary}
+        hedge = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                call_stats.hedged += 1
+                hedge = asyncio.create_task(self._hedge_request(message, context))
+                tasks.add(hedge)
+
+            errors = {}
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            call_stats.hedge_wins += 1
+                        return task.result()
+                    errors[task] = task.exception()
+            # Both failed: report the primary's error
+            raise errors.get(primary) or errors[hedge]
+        finally:
+            for task in (primary, hedge):
+                if task is None:
+                    continue
+                if not task.done():
+                    task.cancel()  # The slower request is no longer needed
+                elif not task.cancelled():
+                    task.exception()  # Mark retrieved if it failed alongside the winner
+
+    async def _hedge_request(self, message: str, context: Optional[str]) -> str:
+        _is_hedge_request.set(True)  # Only affects this task's context
+        return await self.hedge_client._call_chain(message, context)
+
+    async def _complete(self, message: str, context: Optional[str]) -> str:
+        """Call this client's provider with retries (no fallbacks)."""
+        client = await self._get_client()
+        messages = self._build_messages(message, context)
+        limiter = self._get_limiter()
+        breaker = self._get_breaker()
+        tokens = self._token_budget(messages)
 
         # Retry logic with exponential backoff (async-safe)
         last_error = None
+        attempts = 0
         for attempt in range(self.config.max_retries):
+            attempts += 1
             try:
-                if self.config.provider == "openai":
-                    return await asyncio.to_thread(self._chat_openai, client, messages)
-                elif self.config.provider == "anthropic":
-                    return await asyncio.to_thread(self._chat_anthropic, client, messages)
-                elif self.config.provider == "ollama":
-                    return await asyncio.to_thread(self._chat_ollama, client, messages)
+                async with limiter.acquire(tokens):
+                    started = time.perf_counter()
+                    try:
+                        if self.config.provider == "openai":
+                            text = await self._chat_openai(client, messages)
+                        elif self.config.provider == "anthropic":
+                            text = await self._chat_anthropic(client, messages)
+                        elif self.config.provider == "stub":
+                            text = await self._chat_stub(client, messages)
+                        else:
+                            text = await self._chat_ollama(client, messages)
+                    except asyncio.CancelledError:
+                        # Lost to a hedge: it would have taken at least this
+                        # long. Without the sample only fast calls are seen and
+                        # the hedge delay keeps dropping.
+                        self._record_latency(started)
+                        raise
+                    self._record_latency(started)
+                breaker.record_success()
+                return text
 
             except Exception as e:
                 last_error = e
-                logger.warning(f"Attempt {attempt + 1}/{self.config.max_retries} failed: {e}")
-
-                # Don't retry on rate limits immediately
-                if "rate_limit" in str(e).lower():
-                    if attempt < self.config.max_retries - 1:
-                        wait_time = 2 ** (attempt + 2)  # 4, 8, 16 seconds
-                        logger.info(f"Rate limited, waiting {wait_time}s")
-                        await asyncio.sleep(wait_time)
-                    else:
-                        raise RateLimitError("Rate limit exceeded") from e
-                # Exponential backoff for other errors
-                elif attempt < self.config.max_retries - 1:
-                    wait_time = 2**attempt  # 1, 2, 4 seconds
-                    await asyncio.sleep(wait_time)
+                if is_client_error(e):
+                    # Bad key, model or parameters: retrying won't help, and the
+                    # provider is up, so the breaker is left alone
+                    logger.error(f"{self.config.provider} rejected the request: {e}")
+                    raise APIError(f"{self.config.provider} rejected the request: {e}") from e
+                if is_provider_failure(e):
+                    breaker.record_failure()
+                    if breaker.is_open:
+                        break  # Provider is down; don't retry into the outage
+                await self._wait_before_retry(attempt, e, limiter)
 
         # All retries failed
-        logger.error(f"All {self.config.max_retries} attempts failed")
-        raise APIError(
-            f"Failed after {self.config.max_retries} attempts: {last_error}"
-        ) from last_error
+        logger.error(f"{self.config.provider}: all attempts failed: {last_error}")
+        raise APIError(f"Failed after {attempts} attempts: {last_error}") from last_error
+
+    def _unavailable(self, last_error: Optional[LLMError]) -> LLMError:
+        """Error for when no provider in the chain produced a response."""
+        if last_error is not None:
+            return last_error
+        retry_in = min(c._get_breaker().retry_in() for c in [self] + self.fallbacks)
+        providers = ", ".join(c.config.provider for c in [self] + self.fallbacks)
+        return APIError(
+            f"No LLM provider available ({providers}): circuit open, retry in {retry_in:.0f}s"
+        )
+
+    async def stream(self, message: str, context: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream the response as text deltas while it is generated.
+
+        Same prompt, persona, retry and fallback behaviour as chat(), except
+        that a call is only retried (or moved to a fallback) if it fails
+        before the first delta was yielded.
+
+        Args:
+            message: User message
+            context: Additional context (e.g., from RAG)
+
+        Yields:
+            Response text fragments in order
+
+        Raises:
+            LLMError: If all retries fail or the stream breaks midway
+            RateLimitError: If rate limit exceeded
+
+        Example:
+            async for delta in client.stream("Analyze AAPL stock"):
+                print(delta, end="", flush=True)
+        """
+        last_error = None
+        for client in [self] + self.fallbacks:
+            if not client._get_breaker().allow():
+                continue
+            started = False
+            try:
+                async for delta in client._stream_provider(message, context):
+                    started = True
+                    yield delta
+                return
+            except LLMError as e:
+                if started:
+                    raise
+                last_error = e
+                if client is not self or self.fallbacks:
+                    logger.warning(f"{client.config.provider} failed, trying next provider: {e}")
+        raise self._unavailable(last_error)
+
+    async def _stream_provider(self, message: str, context: Optional[str]) -> AsyncIterator[str]:
+        """Stream from this client's provider with retries (no fallbacks)."""
+        client = await self._get_client()
+        messages = self._build_messages(message, context)
+        streams = {
+            "openai": self._stream_openai,
+            "anthropic": self._stream_anthropic,
+            "ollama": self._stream_ollama,
+            "stub": self._stream_stub,
+        }
+        limiter = self._get_limiter()
+        breaker = self._get_breaker()
+        tokens = self._token_budget(messages)
+
+        last_error = None
+        attempts = 0
+        for attempt in range(self.config.max_retries):
+            attempts += 1
+            started = False
+            try:
+                # The slot is held until the stream ends
+                async with limiter.acquire(tokens):
+                    async for delta in streams[self.config.provider](client, messages):
+                        if delta:
+                            started = True
+                            yield delta
+                breaker.record_success()
+                return
+            except Exception as e:
+                if is_provider_failure(e):
+                    breaker.record_failure()
+                if started:
+                    logger.error(f"Stream interrupted: {e}")
+                    raise APIError(f"Stream interrupted: {e}") from e
+                if is_client_error(e):
+                    logger.error(f"{self.config.provider} rejected the request: {e}")
+                    raise APIError(f"{self.config.provider} rejected the request: {e}") from e
+                last_error = e
+                if breaker.is_open:
+                    break
+                await self._wait_before_retry(attempt, e, limiter)
+
+        logger.error(f"{self.config.provider}: all attempts failed: {last_error}")
+        raise APIError(f"Failed after {attempts} attempts: {last_error}") from last_error
+
+    def _build_messages(self, message: str, context: Optional[str]) -> List[dict]:
+        """Build the user message, prefixed with context if provided.
 
-    def _chat_openai(self, client, messages: List[dict]) -> str:
+        Context goes first: it is often repeated across questions, so it
+        extends the system prompt's cacheable prefix.
+        """
+        if context:
+            full_message = f"Context:\n{context}{_QUESTION_SEPARATOR}{message}"
+        else:
+            full_message = message
+        return [{"role": "user", "content": full_message}]
+
+    def _anthropic_prompt(self, messages: List[dict]) -> Tuple[Any, List[dict]]:
+        """System and messages for Anthropic, with cache breakpoints if enabled.
+
+        The system prompt and the context part of the user message are marked
+        cache_control=ephemeral, so repeat calls read them from Anthropic's
+        prompt cache instead of processing them again. Anthropic ignores
+        breakpoints on prefixes below its minimum cacheable length.
+
+        Returns:
+            (system, messages) request arguments
+        """
+        system = self.config.system_prompt or ""
+        if not self.config.prompt_caching:
+            return system, messages
+
+        cacheable = {"type": "ephemeral"}
+        if system:
+            system = [{"type": "text", "text": system, "cache_control": cacheable}]
+        prompt = []
+        for message in messages:
+            content = message["content"]
+            split = content.rfind(_QUESTION_SEPARATOR)
+            if split <= 0:
+                prompt.append(message)
+                continue
+            blocks = [
+                {"type": "text", "text": content[:split], "cache_control": cacheable},
+                {"type": "text", "text": content[split:]},
+            ]
+            prompt.append({"role": message["role"], "content": blocks})
+        return system, prompt
+
+    async def _wait_before_retry(
+        self, attempt: int, error: Exception, limiter: RateLimiter
+    ) -> None:
+        """Back off before the next attempt.
+
+        A rate limit with Retry-After also pauses the shared limiter, so other
+        calls to the same model wait instead of hitting the limit too.
+
+        Raises:
+            RateLimitError: If rate limited on the last attempt
+        """
+        logger.warning(f"Attempt {attempt + 1}/{self.config.max_retries} failed: {error}")
+        last_attempt = attempt >= self.config.max_retries - 1
+
+        if is_rate_limit(error):
+            if last_attempt:
+                raise RateLimitError("Rate limit exceeded") from error
+            hint = retry_after(error)
+            if hint is not None:
+                limiter.pause(hint)
+            wait_time = retry_delay(error, attempt)
+            logger.info(f"Rate limited, waiting {wait_time:.1f}s")
+            await asyncio.sleep(wait_time)
+        elif not last_attempt:
+            await asyncio.sleep(retry_delay(error, attempt))
+
+    async def _chat_openai(self, client, messages: List[dict]) -> str:
         """OpenAI-specific chat implementation.
 
         Args:
-            client: OpenAI client
+            client: AsyncOpenAI client
             messages: Chat messages
 
         Returns:
@@ -183,38 +979,56 @@ class LLMClient:
         if self.config.system_prompt:
             messages = [{"role": "system", "content": self.config.system_prompt}] + messages
 
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=self.config.model,
             messages=messages,
             temperature=self.config.temperature,
             max_tokens=self.config.max_tokens,
+            timeout=self.config.timeout,  # Per request: clients are shared
         )
+        if response.usage is not None:
+            self._record_openai_usage(response.usage)
         return response.choices[0].message.content
 
-    def _chat_anthropic(self, client, messages: List[dict]) -> str:
+    def _record_openai_usage(self, usage) -> None:
+        """Record OpenAI usage; prompt_tokens includes the cached tokens."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        self._record_usage(usage.prompt_tokens, usage.completion_tokens, cached)
+
+    async def _chat_anthropic(self, client, messages: List[dict]) -> str:
         """Anthropic-specific chat implementation.
 
         Args:
-            client: Anthropic client
+            client: AsyncAnthropic client
             messages: Chat messages
 
         Returns:
             Response text
         """
-        response = client.messages.create(
+        system, messages = self._anthropic_prompt(messages)  # System prompt as persona
+        response = await client.messages.create(
             model=self.config.model,
-            system=self.config.system_prompt or "",  # System prompt as persona
+            system=system,
             messages=messages,
             temperature=self.config.temperature,
             max_tokens=self.config.max_tokens,
+            timeout=self.config.timeout,
         )
+        self._record_anthropic_usage(response.usage, response.usage.output_tokens)
         return response.content[0].text
 
-    def _chat_ollama(self, client, messages: List[dict]) -> str:
+    def _record_anthropic_usage(self, usage, output_tokens: Optional[int]) -> None:
+        """Record Anthropic usage, whose input_tokens excludes cache reads and writes."""
+        read = getattr(usage, "cache_read_input_tokens", None) or 0
+        written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        self._record_usage(usage.input_tokens + read + written, output_tokens, read, written)
+
+    async def _chat_ollama(self, client, messages: List[dict]) -> str:
         """Ollama-specific chat implementation.
 
         Args:
-            client: Ollama client
+            client: Ollama AsyncClient
             messages: Chat messages
 
         Returns:
@@ -233,8 +1047,96 @@ class LLMClient:
 
         # Call with options
         if options:
-            response = client.chat(model=self.config.model, messages=messages, options=options)
+            response = await client.chat(
+                model=self.config.model, messages=messages, options=options
+            )
         else:
-            response = client.chat(model=self.config.model, messages=messages)
+            response = await client.chat(model=self.config.model, messages=messages)
 
+        # Ollama reuses its KV cache for a repeated prefix but doesn't report it
+        self._record_usage(response.get("prompt_eval_count"), response.get("eval_count"))
         return response["message"]["content"]
+
+    async def _chat_stub(self, client: StubLLM, messages: List[dict]) -> str:
+        """Stub chat: deterministic answer after simulated latency (see stub_llm)."""
+        if self.config.system_prompt:
+            messages = [{"role": "system", "content": self.config.system_prompt}] + messages
+
+        response = await client.complete(self.config.model, messages, self.config.max_tokens)
+        usage = response.usage
+        self._record_usage(usage.input_tokens, usage.output_tokens, usage.cached_input_tokens)
+        return response.text
+
+    async def _stream_openai(self, client, messages: List[dict]) -> AsyncIterator[str]:
+        """OpenAI streaming: yields choices[0].delta.content of each chunk."""
+        if self.config.system_prompt:
+            messages = [{"role": "system", "content": self.config.system_prompt}] + messages
+
+        stream = await client.chat.completions.create(
+            model=self.config.model,
+            messages=messages,
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens,
+            timeout=self.config.timeout,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if getattr(chunk, "usage", None) is not None:  # Final chunk
+                self._record_openai_usage(chunk.usage)
+
+    async def _stream_anthropic(self, client, messages: List[dict]) -> AsyncIterator[str]:
+        """Anthropic streaming: yields the text of content_block_delta events."""
+        system, messages = self._anthropic_prompt(messages)
+        stream = await client.messages.create(
+            model=self.config.model,
+            system=system,
+            messages=messages,
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens,
+            timeout=self.config.timeout,
+            stream=True,
+        )
+        input_usage = None
+        async for event in stream:
+            if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                yield event.delta.text
+            elif event.type == "message_start":
+                input_usage = event.message.usage
+            elif event.type == "message_delta" and input_usage is not None:
+                self._record_anthropic_usage(input_usage, event.usage.output_tokens)
+
+    async def _stream_ollama(self, client, messages: List[dict]) -> AsyncIterator[str]:
+        """Ollama streaming: yields message.content of each partial response."""
+        if self.config.system_prompt:
+            messages = [{"role": "system", "content": self.config.system_prompt}] + messages
+
+        options = {}
+        if self.config.temperature is not None:
+            options["temperature"] = self.config.temperature
+        if self.config.max_tokens is not None:
+            options["num_predict"] = self.config.max_tokens
+
+        stream = await client.chat(
+            model=self.config.model, messages=messages, options=options or None, stream=True
+        )
+        async for part in stream:
+            if part["message"]["content"]:
+                yield part["message"]["content"]
+            if part.get("done"):
+                self._record_usage(part.get("prompt_eval_count"), part.get("eval_count"))
+
+    async def _stream_stub(self, client: StubLLM, messages: List[dict]) -> AsyncIterator[str]:
+        """Stub streaming: yields the stub answer word by word."""
+        if self.config.system_prompt:
+            messages = [{"role": "system", "content": self.config.system_prompt}] + messages
+
+        def record(usage):
+            self._record_usage(usage.input_tokens, usage.output_tokens, usage.cached_input_tokens)
+
+        async for word in client.stream(
+            self.config.model, messages, self.config.max_tokens, on_usage=record
+        ):
+            yield word
@@ -0,0 +1,113 @@
+"""Lightweight in-process latency tracking.
+
+Keeps a bounded window of recent samples per key and reports percentiles.
+Used by the API to expose per-endpoint latency without external tooling.
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+class LatencyTracker:
+    """Rolling latency percentiles per key (e.g., per endpoint).
+
+    Only the most recent `window` samples per key are kept, so memory stays
+    bounded and percentiles reflect current behaviour.
+
+    Example:
+        tracker = LatencyTracker()
+        tracker.record("GET /tickers/{ticker}", 0.012)
+        tracker.percentile("GET /tickers/{ticker}", 99)  # seconds
+        tracker.summary()  # milliseconds, per key
+    """
+
+    PERCENTILES = (50, 90, 95, 99)
+    # Default histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+    HISTOGRAM_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+    def __init__(self, window: int = 1024):
+        """Initialize tracker.
+
+        Args:
+            window: Number of recent samples kept per key
+        """
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        """Record one latency sample in seconds."""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def sample_count(self, key: str) -> int:
+        """Number of samples currently in the window for `key`."""
+        with self._lock:
+            samples = self._samples.get(key)
+            return len(samples) if samples else 0
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """Get the q-th percentile (0-100) in seconds, or None without samples."""
+        with self._lock:
+            samples = self._samples.get(key)
+            if not samples:
+                return None
+            values = np.fromiter(samples, dtype=np.float64, count=len(samples))
+        return float(np.percentile(values, q))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Get count, mean, max and percentiles (in milliseconds) for every key."""
+        with self._lock:
+            snapshot = {
+                key: (np.fromiter(samples, dtype=np.float64, count=len(samples)), self._counts[key])
+                for key, samples in self._samples.items()
+                if samples
+            }
+
+        result = {}
+        for key, (values, count) in snapshot.items():
+            ms = values * 1000.0
+            stats = {"count": count, "window": len(ms)}
+            stats["mean_ms"] = round(float(ms.mean()), 3)
+            stats["max_ms"] = round(float(ms.max()), 3)
+            for q, value in zip(self.PERCENTILES, np.percentile(ms, self.PERCENTILES)):
+                stats[f"p{q}_ms"] = round(float(value), 3)
+            result[key] = stats
+        return result
+
+    def histogram(
+        self, key: str, bounds_ms: Sequence[float] = HISTOGRAM_BOUNDS_MS
+    ) -> List[Dict[str, Union[float, str]]]:
+        """Count the windowed samples of `key` per latency bucket.
+
+        Args:
+            key: Tracked key
+            bounds_ms: Ascending bucket upper bounds in milliseconds
+
+        Returns:
+            [{"le_ms": bound, "count": n}, ...] plus a final {"le_ms": "+Inf"}
+            bucket; empty without samples
+        """
+        with self._lock:
+            samples = self._samples.get(key)
+            if not samples:
+                return []
+            values = np.fromiter(samples, dtype=np.float64, count=len(samples)) * 1000.0
+        edges = np.asarray(bounds_ms, dtype=np.float64)
+        counts = np.bincount(np.searchsorted(edges, values), minlength=len(edges) + 1)
+        labels = [float(bound) for bound in edges] + ["+Inf"]
+        return [{"le_ms": label, "count": int(count)} for label, count in zip(labels, counts)]
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
@@ -1,7 +1,7 @@
 """Core data models using Pydantic for runtime validation and immutability."""
 
 from datetime import datetime
-from typing import Any, Dict, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -42,6 +42,21 @@ class LLMConfig(BaseModel):
             max_tokens=2000   # More detailed responses
         )
 
+    Example - Fall back to other providers when this one is down:
+        config = LLMConfig(
+            provider='openai',
+            fallbacks=[
+                LLMConfig(provider='anthropic'),
+                LLMConfig(provider='ollama', model='llama3.2'),
+            ]
+        )
+
+    Example - Nightly run through the batch API (see batch.py):
+        config = LLMConfig(provider='openai', batch=True)
+
+    Example - Load test without a real model (see stub_llm.py):
+        config = LLMConfig(provider='stub')
+
     Example - Full customization:
         config = LLMConfig(
             provider='anthropic',
@@ -52,15 +67,30 @@ class LLMConfig(BaseModel):
         )
     """
 
-    provider: Literal["openai", "anthropic", "ollama"]
+    provider: Literal["openai", "anthropic", "ollama", "stub"]
     model: Optional[str] = None  # Will use Config default if None
     api_key: Optional[str] = None
-    base_url: Optional[str] = None  # For Ollama
+    base_url: Optional[str] = None  # Ollama host, or an OpenAI/Anthropic-compatible endpoint
     temperature: Optional[float] = Field(default=None, ge=0.0, le=2.0)
     max_tokens: Optional[int] = Field(default=None, gt=0)
     system_prompt: Optional[str] = None  # Agent persona
     max_retries: Optional[int] = Field(default=None, ge=0, le=10)
     timeout: Optional[int] = Field(default=None, gt=0)
+    # Reuse responses to identical prompts (LLM_CACHE picks the backend)
+    use_cache: Optional[bool] = None
+    # Client-side limits shared by all agents using this provider model (0 = unlimited)
+    requests_per_minute: Optional[int] = Field(default=None, ge=0)
+    tokens_per_minute: Optional[int] = Field(default=None, ge=0)
+    max_concurrency: Optional[int] = Field(default=None, ge=0)
+    # Tried in order when this provider fails or its circuit breaker is open
+    fallbacks: List["LLMConfig"] = Field(default_factory=list)
+    # Send a duplicate request when a call runs past this latency percentile (0 = off)
+    hedge_percentile: Optional[float] = Field(default=None, ge=0.0, lt=100.0)
+    hedge_to: Optional["LLMConfig"] = None  # Provider for hedge requests (default: same)
+    # Mark the system prompt and context as cacheable (Anthropic; OpenAI caches automatically)
+    prompt_caching: Optional[bool] = None
+    # Send calls through the provider's batch API: ~50% cheaper, results in minutes to hours
+    batch: Optional[bool] = None
 
     def __init__(self, **data):
         """Initialize with Config defaults if values not provided.
@@ -69,7 +99,13 @@ class LLMConfig(BaseModel):
         1. Accept all defaults: LLMConfig(provider='openai')
         2. Override specific values: LLMConfig(provider='openai', temperature=0.9)
         3. Fully customize: LLMConfig(provider='openai', model='gpt-4', temperature=0.5, max_tokens=2000)
+
+        LLM_PROVIDER_OVERRIDE (e.g. 'stub' for load tests) replaces the
+        provider, model, endpoint and key of every config.
         """
+        override = Config.get_llm_provider_override()
+        if override:
+            data = {**data, "provider": override, "model": None, "base_url": None, "api_key": None}
         super().__init__(**data)
         # Apply Config defaults only for values not explicitly provided
         if self.model is None:
@@ -82,6 +118,26 @@ class LLMConfig(BaseModel):
             object.__setattr__(self, "max_retries", Config.get_llm_max_retries())
         if self.timeout is None:
             object.__setattr__(self, "timeout", Config.get_llm_timeout(self.provider))
+        if self.requests_per_minute is None:
+            object.__setattr__(
+                self, "requests_per_minute", Config.get_llm_requests_per_minute(self.provider)
+            )
+        if self.tokens_per_minute is None:
+            object.__setattr__(
+                self, "tokens_per_minute", Config.get_llm_tokens_per_minute(self.provider)
+            )
+        if self.max_concurrency is None:
+            object.__setattr__(
+                self, "max_concurrency", Config.get_llm_max_concurrency(self.provider)
+            )
+        if self.hedge_percentile is None:
+            object.__setattr__(self, "hedge_percentile", Config.get_llm_hedge_percentile())
+        if self.batch is None:
+            object.__setattr__(self, "batch", Config.get_llm_batch())
+        if self.prompt_caching is None:
+            object.__setattr__(self, "prompt_caching", Config.get_llm_prompt_caching())
+        if self.use_cache is None:
+            object.__setattr__(self, "use_cache", Config.get_llm_cache() != "off")
         if self.base_url is None and self.provider == "ollama":
             object.__setattr__(self, "base_url", Config.get_ollama_url())
 
@@ -92,7 +148,7 @@ class LLMConfig(BaseModel):
     @classmethod
     def create_custom(
         cls,
-        provider: Literal["openai", "anthropic", "ollama"],
+        provider: Literal["openai", "anthropic", "ollama", "stub"],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         model: Optional[str] = None,
@@ -105,7 +161,7 @@ class LLMConfig(BaseModel):
         temperature and max_tokens while keeping other defaults.
 
         Args:
-            provider: LLM provider ('openai', 'anthropic', 'ollama')
+            provider: LLM provider ('openai', 'anthropic', 'ollama', 'stub')
             temperature: Temperature for response randomness (0.0-2.0)
                         Lower = more focused, Higher = more creative
             max_tokens: Maximum tokens in response
@@ -152,6 +208,9 @@ class RAGConfig(BaseModel):
     chunk_overlap: int = Field(default_factory=Config.get_rag_chunk_overlap, ge=0)
     top_k: int = Field(default_factory=Config.get_rag_top_k, gt=0)
     embedding_model: str = Field(default_factory=Config.get_rag_embedding_model)
+    index: Literal["exact", "ivf"] = Field(default_factory=Config.get_rag_index)
+    ivf_nlist: int = Field(default_factory=Config.get_rag_ivf_nlist, gt=0)
+    ivf_nprobe: int = Field(default_factory=Config.get_rag_ivf_nprobe, gt=0)
 
     model_config = {
         "frozen": True,
@@ -195,6 +254,14 @@ class DatabaseConfig(BaseModel):
     max_inactive_connection_lifetime: float = Field(
         default_factory=Config.get_db_max_inactive_connection_lifetime, gt=0
     )
+    # Decode NUMERIC as float (faster math, no Decimal) instead of decimal.Decimal
+    numeric_as_float: bool = Field(default_factory=Config.get_db_numeric_as_float)
+    # Read-through cache for fundamentals, filing metadata and macro indicators
+    cache_enabled: bool = Field(default_factory=Config.get_db_cache_enabled)
+    cache_max_entries: int = Field(default_factory=Config.get_db_cache_max_entries, ge=0)
+    cache_ttls: Dict[str, float] = Field(default_factory=Config.get_db_cache_ttls)
+    # Dedicated LISTEN connection so writes from any process invalidate caches
+    listen_for_changes: bool = Field(default_factory=Config.get_db_listen_for_changes)
 
     model_config = {
         "frozen": True,
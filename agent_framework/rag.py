@@ -2,18 +2,36 @@
 
 WARNING: This implementation loads all documents into memory. For production:
 - Use a vector database (pgvector, Pinecone, Weaviate)
-- Implement pagination for large documents
 - Add document metadata tracking
-- Consider streaming for processing large files
+
+Large documents can be streamed: add_document() also accepts an async iterable
+of text pieces (e.g., Database.iter_filing_chunks) and chunks/embeds it
+incrementally.
+
+Embeddings are L2-normalized when added, so a query's cosine similarities are
+one matrix-vector product, and the top-k are selected with argpartition
+instead of sorting every score.
+
+Embeddings live in a preallocated float32 buffer that doubles its capacity
+when full, so adding a document copies only its own rows (not the whole
+matrix, as np.vstack did). Chunk texts are kept as one UTF-8 byte buffer plus
+an offsets array rather than a list of Python strings.
+
+Search goes through a VectorIndex (see vector_index.py): exact by default, or
+an approximate IVF index for large collections (RAGConfig(index="ivf")). An
+index that needs training is trained in a worker thread, so adding documents
+doesn't stall the event loop.
 """
 
 import logging
 import asyncio
-from typing import List
+import copy
+from typing import AsyncIterable, AsyncIterator, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 
 from .models import RAGConfig
+from .vector_index import ExactIndex, IVFIndex, VectorIndex, _normalize
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,13 +44,131 @@ class RAGError(Exception):
     pass
 
 
+class EmbeddingBuffer:
+    """Growable 2-D float32 array with amortized O(1) row appends.
+
+    Rows are written into preallocated spare capacity; when it runs out the
+    capacity doubles, so each row is copied O(1) times on average however
+    many documents are added.
+
+    Example:
+        buffer = EmbeddingBuffer()
+        buffer.append(np.ones((3, 384)))
+        buffer.view.shape   # (3, 384)
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        """Initialize buffer.
+
+        Args:
+            initial_capacity: Rows allocated by the first append (at least)
+        """
+        self.initial_capacity = initial_capacity
+        self._data: Optional[np.ndarray] = None
+        self._size = 0
+
+    def append(self, rows: np.ndarray) -> None:
+        """Copy rows (n x dim) onto the end, growing the buffer if needed.
+
+        Raises:
+            ValueError: If the row width differs from the rows already stored
+        """
+        rows = np.asarray(rows, dtype=np.float32)
+        needed = self._size + len(rows)
+        if self._data is None:
+            self._data = np.empty(
+                (max(needed, self.initial_capacity), rows.shape[1]), dtype=np.float32
+            )
+        elif rows.shape[1] != self._data.shape[1]:
+            raise ValueError(
+                f"Embedding dimension {rows.shape[1]} does not match {self._data.shape[1]}"
+            )
+        elif needed > len(self._data):
+            grown = np.empty((max(needed, 2 * len(self._data)), self._data.shape[1]), np.float32)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+        self._data[self._size : needed] = rows
+        self._size = needed
+
+    @property
+    def view(self) -> Optional[np.ndarray]:
+        """The stored rows, without copying (None while empty).
+
+        The view is invalidated by the next append that grows the buffer.
+        """
+        return self._data[: self._size] if self._size else None
+
+    @property
+    def capacity(self) -> int:
+        """Rows that fit before the next reallocation."""
+        return 0 if self._data is None else len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated, including spare capacity."""
+        return 0 if self._data is None else self._data.nbytes
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class ChunkStore:
+    """Compact, append-only sequence of chunk texts.
+
+    All chunks are concatenated into one UTF-8 bytearray, with an int64 array
+    of end offsets; a chunk is decoded when it is read. This avoids one Python
+    str object (about 50 bytes of overhead plus a list pointer) per chunk.
+    Supports len(), indexing (including NumPy integers) and iteration.
+    """
+
+    def __init__(self):
+        self._data = bytearray()
+        self._ends = np.zeros(0, dtype=np.int64)
+        self._size = 0
+
+    def extend(self, chunks: List[str]) -> None:
+        """Append chunk texts, doubling the offsets array when it is full."""
+        encoded = [chunk.encode("utf-8") for chunk in chunks]
+        needed = self._size + len(encoded)
+        if needed > len(self._ends):
+            grown = np.empty(max(needed, 2 * len(self._ends), 1024), dtype=np.int64)
+            grown[: self._size] = self._ends[: self._size]
+            self._ends = grown
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        self._ends[self._size : needed] = len(self._data) + np.cumsum(lengths)
+        self._data += b"".join(encoded)
+        self._size = needed
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> str:
+        index = int(index)
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("chunk index out of range")
+        start = self._ends[index - 1] if index else 0
+        return self._data[start : self._ends[index]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(self._size))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the texts and offsets."""
+        return len(self._data) + self._ends.nbytes
+
+
 class RAGSystem:
     """Simple RAG system for analyzing documents (e.g., SEC filings).
 
     Features:
     - Chunk documents into manageable pieces
     - Use sentence-transformers for embeddings (no API needed)
-    - Retrieve top-k relevant chunks for queries
+    - Retrieve top-k relevant chunks for queries (exact, or approximate
+      with an IVF index for large collections)
+    - Stream large documents without holding them as one string
 
     Limitations:
     - All documents stored in memory (not scalable beyond a few documents)
@@ -47,20 +183,29 @@ class RAGSystem:
     Example:
         config = RAGConfig(chunk_size=300, top_k=3)
         rag = RAGSystem(config)
-        rag.add_document(sec_filing_text)
-        context = rag.query("What are the risk factors?")
+        await rag.add_document(sec_filing_text)
+        await rag.add_document(db.iter_filing_chunks("AAPL"))  # Streamed
+        context = await rag.query("What are the risk factors?")
+
+        big = RAGSystem(RAGConfig(index="ivf", ivf_nlist=256, ivf_nprobe=8))
     """
 
-    def __init__(self, config: RAGConfig):
+    # Chunks embedded per model call when streaming a document
+    STREAM_EMBED_BATCH = 64
+
+    def __init__(self, config: RAGConfig, index: Optional[VectorIndex] = None):
         """Initialize RAG system.
 
         Args:
             config: RAG configuration
+            index: Search index (default: built from config.index)
         """
         self.config = config
         self._model = None
-        self.documents: List[str] = []
-        self.embeddings: np.ndarray = None
+        self.documents = ChunkStore()
+        self._embeddings = EmbeddingBuffer()  # L2-normalized, float32
+        self.index = index if index is not None else self._build_index(config)
+        self._training = False
 
         # Warn if configuration might cause memory issues
         if config.chunk_size > 1000:
@@ -69,6 +214,12 @@ class RAGSystem:
                 "Consider using 300-500 for better results."
             )
 
+    @staticmethod
+    def _build_index(config: RAGConfig) -> VectorIndex:
+        if config.index == "ivf":
+            return IVFIndex(nlist=config.ivf_nlist, nprobe=config.ivf_nprobe)
+        return ExactIndex()
+
     def _get_model(self):
         """Lazy load embedding model.
 
@@ -119,11 +270,80 @@ class RAGSystem:
         logger.debug(f"Split text into {len(chunks)} chunks")
         return chunks
 
-    async def add_document(self, text: str) -> int:
+    async def _stream_chunks(self, pieces: AsyncIterable[str]) -> AsyncIterator[str]:
+        """Chunk streamed text like chunk_text() would chunk the joined text.
+
+        (A document shorter than one chunk comes back whitespace-normalized.)
+
+        Pieces are concatenated as-is, so a word split across two pieces is
+        kept whole. Only one chunk's worth of words is buffered at a time.
+        """
+        chunk_size = self.config.chunk_size
+        step = chunk_size - self.config.chunk_overlap
+        words: List[str] = []
+        carry = ""  # Trailing partial word of the previous piece
+
+        async for piece in pieces:
+            text = carry + piece
+            carry = ""
+            parts = text.split()
+            if parts and not text[-1].isspace():
+                carry = parts.pop()
+            words.extend(parts)
+            while len(words) >= chunk_size:
+                yield " ".join(words[:chunk_size])
+                del words[:step]
+
+        if carry:
+            words.append(carry)
+        while words:
+            yield " ".join(words[:chunk_size])
+            del words[:step]
+
+    async def _embed(self, chunks: List[str]) -> np.ndarray:
+        """Embed chunks (offloaded to a thread to avoid blocking the loop)."""
+        model = await asyncio.to_thread(self._get_model)
+        return await asyncio.to_thread(model.encode, chunks, show_progress_bar=False)
+
+    @property
+    def embeddings(self) -> Optional[np.ndarray]:
+        """Normalized chunk embeddings (a view into the buffer; None while empty)."""
+        return self._embeddings.view
+
+    def _store(self, chunks: List[str], embeddings: np.ndarray) -> None:
+        start = len(self._embeddings)
+        self._embeddings.append(_normalize(embeddings))
+        self.documents.extend(chunks)
+        self.index.add(self.embeddings, start)
+
+    async def _train_index(self) -> None:
+        """Train the index in a worker thread once it asks for it.
+
+        A copy is trained on the rows stored so far while the current index
+        keeps serving searches; rows stored meanwhile are added to the copy
+        before it replaces the index.
+        """
+        if self._training or not self.index.needs_training(len(self._embeddings)):
+            return
+        self._training = True
+        buffer, index = self._embeddings, copy.deepcopy(self.index)
+        trained = len(buffer)
+        try:
+            await asyncio.to_thread(index.train, self.embeddings)
+        finally:
+            self._training = False
+        if self._embeddings is buffer:  # Not cleared meanwhile
+            index.add(self.embeddings, trained)
+            self.index = index
+
+    async def add_document(self, text: Union[str, AsyncIterable[str]]) -> int:
         """Add document to RAG system.
 
         Args:
-            text: Document text (e.g., SEC filing)
+            text: Document text (e.g., SEC filing), or an async iterable of text
+                pieces to concatenate, such as Database.iter_filing_chunks().
+                Streamed documents are chunked and embedded incrementally and
+                only added if the whole stream succeeds.
 
         Returns:
             Number of chunks added
@@ -131,32 +351,22 @@ class RAGSystem:
         Raises:
             RAGError: If embedding generation fails
         """
+        if not isinstance(text, str):
+            return await self._add_stream(text)
+
         if not text or not text.strip():
             logger.warning("Attempted to add empty document")
             return 0
 
-        # Warn if storing many documents
-        if len(self.documents) > 100:
-            logger.warning(
-                f"RAG system has {len(self.documents)} chunks. "
-                "Consider using a vector database for better performance."
-            )
+        self._warn_if_large()
 
         try:
             chunks = self.chunk_text(text)
             if not chunks:
                 return 0
 
-            self.documents.extend(chunks)
-
-            # Generate embeddings (offload encoding to thread to avoid blocking loop)
-            model = await asyncio.to_thread(self._get_model)
-            new_embeddings = await asyncio.to_thread(model.encode, chunks, show_progress_bar=False)
-
-            if self.embeddings is None:
-                self.embeddings = new_embeddings
-            else:
-                self.embeddings = np.vstack([self.embeddings, new_embeddings])
+            self._store(chunks, await self._embed(chunks))
+            await self._train_index()
 
             logger.info(f"Added document with {len(chunks)} chunks")
             return len(chunks)
@@ -165,6 +375,41 @@ class RAGSystem:
             logger.error(f"Failed to add document: {e}")
             raise RAGError("Could not process document") from e
 
+    async def _add_stream(self, pieces: AsyncIterable[str]) -> int:
+        self._warn_if_large()
+        chunks: List[str] = []
+        embeddings: List[np.ndarray] = []
+        batch: List[str] = []
+        try:
+            async for chunk in self._stream_chunks(pieces):
+                batch.append(chunk)
+                if len(batch) >= self.STREAM_EMBED_BATCH:
+                    embeddings.append(await self._embed(batch))
+                    chunks.extend(batch)
+                    batch = []
+            if batch:
+                embeddings.append(await self._embed(batch))
+                chunks.extend(batch)
+        except Exception as e:
+            logger.error(f"Failed to add streamed document: {e}")
+            raise RAGError("Could not process document") from e
+
+        if not chunks:
+            logger.warning("Attempted to add empty document")
+            return 0
+
+        self._store(chunks, np.vstack(embeddings))
+        await self._train_index()
+        logger.info(f"Added streamed document with {len(chunks)} chunks")
+        return len(chunks)
+
+    def _warn_if_large(self) -> None:
+        if len(self.documents) > 100:
+            logger.warning(
+                f"RAG system has {len(self.documents)} chunks. "
+                "Consider using a vector database for better performance."
+            )
+
     async def query(self, question: str, return_scores: bool = False) -> str:
         """Query documents and return relevant context.
 
@@ -189,21 +434,13 @@ class RAGSystem:
                 await asyncio.to_thread(model.encode, [question], show_progress_bar=False)
             )[0]
 
-            # Calculate cosine similarity
-            similarities = np.dot(self.embeddings, query_embedding) / (
-                np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding)
-            )
-
-            # Get top-k indices
-            top_k = min(self.config.top_k, len(self.documents))
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
+            top_indices, scores = self._search(query_embedding, self.config.top_k)
 
             # Return concatenated chunks
             context_chunks = []
-            for idx in top_indices:
+            for idx, score in zip(top_indices, scores):
                 chunk = self.documents[idx]
                 if return_scores:
-                    score = similarities[idx]
                     context_chunks.append(f"[Score: {score:.3f}] {chunk}")
                 else:
                     context_chunks.append(chunk)
@@ -216,10 +453,19 @@ class RAGSystem:
             logger.error(f"Query failed: {e}")
             raise RAGError("Could not process query") from e
 
+    def _search(self, query_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the k chunks most similar to an (unnormalized) query embedding.
+
+        Returns:
+            (chunk indices, cosine similarities), best first
+        """
+        return self.index.search(self.embeddings, _normalize(query_embedding), k)
+
     def clear(self):
         """Clear all documents and embeddings."""
-        self.documents = []
-        self.embeddings = None
+        self.documents = ChunkStore()
+        self._embeddings = EmbeddingBuffer()
+        self.index.reset()
         logger.info("Cleared RAG system")
 
     def get_stats(self) -> dict:
@@ -231,6 +477,9 @@ class RAGSystem:
         return {
             "num_chunks": len(self.documents),
             "embedding_shape": self.embeddings.shape if self.embeddings is not None else None,
+            "embedding_bytes": self._embeddings.nbytes,
+            "text_bytes": self.documents.nbytes,
+            "index": self.index.to_dict(),
             "chunk_size": self.config.chunk_size,
             "top_k": self.config.top_k,
         }
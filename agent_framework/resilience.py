@@ -0,0 +1,368 @@
+"""Client-side rate limiting, retry timing and circuit breaking for LLM providers.
+
+Providers enforce requests-per-minute and tokens-per-minute budgets and
+answer 429 once they are exceeded. RateLimiter keeps callers inside those
+budgets up front: calls wait their turn in FIFO order instead of failing,
+and a 429's Retry-After pauses every caller sharing the limiter, not just
+the one that hit it.
+
+CircuitBreaker stops sending calls to a provider that keeps failing, so
+callers move on to a fallback right away instead of retrying into an outage.
+
+Example:
+    limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=90000,
+                          max_concurrency=20)
+    async with limiter.acquire(tokens=1200):
+        response = await client.chat.completions.create(...)
+"""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+
+class TokenBucket:
+    """Budget of `per_minute` units that refills continuously.
+
+    Starts full, so a burst of up to one minute's budget goes through at once.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        """Initialize bucket.
+
+        Args:
+            per_minute: Units added per minute (also the bucket capacity)
+            clock: Time source (injectable for tests)
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now).
+
+        Requests larger than the capacity are treated as a full bucket, so
+        they wait for one minute's budget instead of forever.
+        """
+        self._refill()
+        missing = min(amount, self.capacity) - self._level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        """Spend `amount` units (call after wait_time() returned 0)."""
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Shared request/token budget and concurrency cap for one provider model.
+
+    acquire() first takes an in-flight slot (max_concurrency), then waits
+    until both budgets allow the call. Waiters are served in arrival order, so
+    a large request is not starved by a stream of small ones. Limits of 0
+    mean unlimited.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize limiter.
+
+        Args:
+            requests_per_minute: Request budget (0 = unlimited)
+            tokens_per_minute: Prompt + completion token budget (0 = unlimited)
+            max_concurrency: Calls in flight at once (0 = unlimited)
+            clock: Time source (injectable for tests)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self._clock = clock
+        self._requests = TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        # asyncio.Lock wakes waiters in FIFO order: the head of the queue
+        # holds it while sleeping until the budget allows its call
+        self._queue = asyncio.Lock()
+        self._paused_until = 0.0
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttled = 0  # Calls that had to wait for a slot or budget
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Wait for a slot and budget, then hold the slot for the block.
+
+        Args:
+            tokens: Tokens the call may use (prompt estimate + max_tokens)
+        """
+        started = self._clock()
+        self.waiting += 1
+        try:
+            throttled = self._slots is not None and self._slots.locked()
+            if self._slots is not None:
+                await self._slots.acquire()
+            try:
+                throttled = await self._wait_for_budget(tokens) or throttled
+            except BaseException:
+                if self._slots is not None:
+                    self._slots.release()
+                raise
+        finally:
+            self.waiting -= 1
+
+        if throttled:
+            self.throttled += 1
+            self.wait_seconds += self._clock() - started
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+    async def _wait_for_budget(self, tokens: int) -> bool:
+        """Wait in line until the budgets allow a call; return whether we waited."""
+        if self._requests is None and self._tokens is None and not self._paused_until:
+            return False
+        waited = self._queue.locked()
+        async with self._queue:
+            while True:
+                wait = self._paused_until - self._clock()
+                if self._requests is not None:
+                    wait = max(wait, self._requests.wait_time(1))
+                if self._tokens is not None:
+                    wait = max(wait, self._tokens.wait_time(tokens))
+                if wait <= 0:
+                    break
+                waited = True
+                await asyncio.sleep(wait)
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(tokens)
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (e.g. after a 429 Retry-After)."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict view for logging and JSON responses."""
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+class CircuitBreaker:
+    """Fail fast on a provider after repeated failures, then probe for recovery.
+
+    closed: calls go through; `failure_threshold` consecutive failures open it.
+    open: calls are refused until `reset_timeout` seconds have passed.
+    half_open: one probe call is let through per `reset_timeout`; success
+        closes the breaker, failure opens it again.
+
+    Example:
+        if breaker.allow():
+            try:
+                result = await call()
+                breaker.record_success()
+            except Exception:
+                breaker.record_failure()
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds before an open breaker lets a probe through
+            clock: Time source (injectable for tests)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+
+        self.failures = 0
+        self.rejected = 0  # Calls refused while open
+        self.times_opened = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being refused (open or probing)."""
+        return self.state != self.CLOSED
+
+    def allow(self) -> bool:
+        """Whether a call may go through now.
+
+        Returns True for the probe call once an open breaker's timeout has
+        passed; other callers keep being refused until the probe succeeds.
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._opened_at = self._clock()  # Next probe only after another timeout
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful call; closes the breaker."""
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """Record a failed call; opens the breaker at the threshold or on a failed probe."""
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+            self.times_opened += 1
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets the next probe through (0 if closed)."""
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(self.reset_timeout - (self._clock() - self._opened_at), 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict view for logging and JSON responses."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in": round(self.retry_in(), 1),
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+def is_rate_limit(error: Exception) -> bool:
+    """Whether a provider error is a rate limit (HTTP 429)."""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return "rate_limit" in str(error).lower() or "rate limit" in str(error).lower()
+
+
+# SDK transport errors, matched by class name so no SDK has to be imported:
+# openai/anthropic APIConnectionError and APITimeoutError, httpx TransportError
+_TRANSPORT_ERRORS = frozenset(
+    {"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"}
+)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    return status if isinstance(status, int) and status > 0 else None
+
+
+def is_client_error(error: Exception) -> bool:
+    """Whether the provider rejected the request itself (HTTP 4xx other than 408/429).
+
+    Bad parameters, invalid API keys and unknown models fail the same way on
+    every retry and say nothing about the provider's health.
+    """
+    status = _status_code(error)
+    return status is not None and 400 <= status < 500 and status not in (408, 429)
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """Whether an error means the provider is unhealthy: 5xx, timeout or transport error.
+
+    Only these count toward a CircuitBreaker; rate limits, rejected requests
+    and errors parsing a response do not.
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500 or status == 408
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSPORT_ERRORS for cls in type(error).__mro__)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, from the error's response headers.
+
+    Understands retry-after-ms (OpenAI) and Retry-After as seconds or an
+    HTTP date.
+
+    Returns:
+        Seconds to wait, or None if the error carries no hint
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000.0, 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying after `error` on attempt `attempt` (0-based).
+
+    Honours Retry-After when the provider sent one (plus up to 25% so that
+    callers told the same time don't all return at once). Otherwise backs
+    off exponentially with jitter: ~4/8/16s for rate limits, ~1/2/4s for
+    other errors, each somewhere between half and all of that.
+    """
+    hint = retry_after(error)
+    if hint is not None:
+        return hint * random.uniform(1.0, 1.25)
+    delay = 2 ** (attempt + 2) if is_rate_limit(error) else 2**attempt
+    return delay / 2 + random.uniform(0, delay / 2)
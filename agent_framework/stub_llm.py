@@ -0,0 +1,301 @@
+"""Deterministic in-process LLM for load tests ("stub" provider).
+
+LLMConfig(provider="stub") sends calls here instead of a real model: no
+network, no SDK, no API key. Responses are derived from a hash of the prompt,
+so the same prompt always gets the same answer, in the
+DIRECTION|CONFIDENCE|REASONING format parse_llm_signal() expects. Latency is
+drawn from a configurable distribution and errors can be injected at a given
+rate, so the whole pipeline (API, compression, RAG agents) can be load-tested
+offline with realistic timing and failure handling.
+
+Like a provider prompt cache, a system prompt seen before is reported as
+cached input tokens. Batch jobs (create_batch/retrieve_batch) end
+STUB_BATCH_LATENCY seconds after submission, like a provider batch API.
+
+Configure with STUB_LATENCY, STUB_ERROR_RATE, STUB_RATE_LIMIT_RATE,
+STUB_OUTPUT_TOKENS, STUB_BATCH_LATENCY and STUB_SEED (see Config).
+
+Example:
+    stub = StubLLM(latency="lognormal:0.8,0.5", error_rate=0.02, seed=7)
+    response = await stub.complete("stub", [{"role": "user", "content": "Analyze AAPL"}])
+    response.text   # e.g. "bullish|73|Stub analysis 3f9a2c1e: ..."
+    stub.stats.to_dict()
+"""
+
+import asyncio
+import hashlib
+import itertools
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from .compression import estimate_tokens
+
+_DIRECTIONS = ("bullish", "bearish", "neutral")
+_FILLER = (
+    "Fundamentals and recent price action were weighed against sector peers; "
+    "valuation, growth, profitability and balance sheet strength all factor in."
+)
+
+
+class StubLLMError(Exception):
+    """Injected provider error; carries an HTTP status like the real SDK errors."""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        # Mimic an HTTP response so retry_after() finds the header
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+@dataclass
+class StubUsage:
+    """Token counts for one stub response."""
+
+    input_tokens: int
+    output_tokens: int
+    cached_input_tokens: int = 0
+
+
+@dataclass
+class StubResponse:
+    """A stub completion."""
+
+    text: str
+    usage: StubUsage
+
+
+@dataclass
+class StubStats:
+    """Running totals for a StubLLM."""
+
+    calls: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    latency_seconds: float = 0.0
+    by_model: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, object]:
+        """Plain-dict view for logging and JSON responses."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_seconds": round(self.latency_seconds, 3),
+            "by_model": dict(self.by_model),
+        }
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Build a latency sampler from a spec string.
+
+    Formats (seconds):
+        fixed:0.5            always 0.5
+        uniform:0.2,1.0      uniform between 0.2 and 1.0
+        normal:0.8,0.2       normal(mean, std), floored at 0
+        lognormal:0.8,0.5    lognormal with median 0.8 and shape 0.5 (long tail)
+        exponential:0.8      exponential with mean 0.8
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    kind, _, args = spec.partition(":")
+    try:
+        params = [float(x) for x in args.split(",")] if args else []
+    except ValueError:
+        raise ValueError(f"Invalid stub latency spec: {spec!r}")
+
+    samplers = {
+        ("fixed", 1): lambda rng: params[0],
+        ("uniform", 2): lambda rng: rng.uniform(params[0], params[1]),
+        ("normal", 2): lambda rng: max(rng.gauss(params[0], params[1]), 0.0),
+        ("lognormal", 2): lambda rng: params[0] * rng.lognormvariate(0.0, params[1]),
+        ("exponential", 1): lambda rng: rng.expovariate(1.0 / params[0]) if params[0] else 0.0,
+    }
+    sampler = samplers.get((kind.strip().lower(), len(params)))
+    if sampler is None:
+        raise ValueError(f"Invalid stub latency spec: {spec!r}")
+    return sampler
+
+
+class StubLLM:
+    """Fake LLM backend with deterministic answers and simulated latency/errors."""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        output_tokens: int = 60,
+        batch_latency: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """Initialize stub.
+
+        Args:
+            latency: Latency distribution spec (see parse_latency)
+            error_rate: Fraction of calls failing with a 503
+            rate_limit_rate: Fraction of calls failing with a 429 (Retry-After: 1)
+            output_tokens: Approximate response length in tokens
+            batch_latency: Seconds until a batch job has ended
+            seed: Seed for latency and error draws (None = random)
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.output_tokens = output_tokens
+        self.batch_latency = batch_latency
+        self._sample_latency = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self._cached_prefixes: Set[str] = set()
+        self._batches: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._batch_ids = itertools.count()
+        self.stats = StubStats()
+
+    def respond(self, messages: List[dict]) -> str:
+        """The deterministic answer for `messages` (same prompt, same answer)."""
+        prompt = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        digest = hashlib.sha256(prompt.encode()).digest()
+        direction = _DIRECTIONS[digest[0] % 3]
+        confidence = 50 + digest[1] % 46  # 50-95
+        reasoning = f"Stub analysis {digest[:4].hex()}: {_FILLER}"
+        while estimate_tokens(reasoning) < self.output_tokens:
+            reasoning += " " + _FILLER
+        return f"{direction}|{confidence}|{reasoning}"
+
+    def _draw(self, model: str) -> float:
+        """Count the call, maybe inject an error, and return its latency."""
+        self.stats.calls += 1
+        self.stats.by_model[model] = self.stats.by_model.get(model, 0) + 1
+        roll = self._rng.random()
+        latency = self._sample_latency(self._rng)
+        self.stats.latency_seconds += latency
+        if roll < self.rate_limit_rate:
+            self.stats.errors += 1
+            raise StubLLMError("Stub rate limit exceeded", status_code=429, retry_after=1)
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.stats.errors += 1
+            raise StubLLMError("Stub provider unavailable", status_code=503)
+        return latency
+
+    def _usage(self, messages: List[dict], text: str) -> StubUsage:
+        """Token counts; a repeated system prompt counts as cached input."""
+        cached = 0
+        system = "".join(m["content"] for m in messages if m["role"] == "system")
+        if system in self._cached_prefixes:
+            cached = estimate_tokens(system)
+        elif system:
+            self._cached_prefixes.add(system)
+        usage = StubUsage(
+            input_tokens=estimate_tokens("".join(m["content"] for m in messages)),
+            output_tokens=estimate_tokens(text),
+            cached_input_tokens=cached,
+        )
+        self.stats.input_tokens += usage.input_tokens
+        self.stats.cached_input_tokens += usage.cached_input_tokens
+        self.stats.output_tokens += usage.output_tokens
+        return usage
+
+    async def complete(
+        self, model: str, messages: List[dict], max_tokens: Optional[int] = None
+    ) -> StubResponse:
+        """Return the answer after a simulated latency.
+
+        Raises:
+            StubLLMError: For injected errors (after half the drawn latency)
+        """
+        try:
+            latency = self._draw(model)
+        except StubLLMError:
+            await asyncio.sleep(self._sample_latency(self._rng) / 2)
+            raise
+        await asyncio.sleep(latency)
+        text = self._truncate(self.respond(messages), max_tokens)
+        return StubResponse(text=text, usage=self._usage(messages, text))
+
+    async def stream(
+        self,
+        model: str,
+        messages: List[dict],
+        max_tokens: Optional[int] = None,
+        on_usage: Optional[Callable[[StubUsage], None]] = None,
+    ) -> AsyncIterator[str]:
+        """Yield the answer word by word, spread over a simulated latency.
+
+        Args:
+            model: Model name (only counted)
+            messages: Chat messages
+            max_tokens: Response length cap
+            on_usage: Called with the token counts after the last word
+
+        Raises:
+            StubLLMError: For injected errors (before the first word)
+        """
+        try:
+            latency = self._draw(model)
+        except StubLLMError:
+            await asyncio.sleep(self._sample_latency(self._rng) / 2)
+            raise
+        text = self._truncate(self.respond(messages), max_tokens)
+        words = re.findall(r"\S+\s*", text)
+        for word in words:
+            await asyncio.sleep(latency / len(words))
+            yield word
+        usage = self._usage(messages, text)
+        if on_usage is not None:
+            on_usage(usage)
+
+    def create_batch(self, requests: List[Tuple[str, Dict[str, Any]]]) -> str:
+        """Start a batch job; errors are injected per request at the configured rates.
+
+        Args:
+            requests: (custom_id, body) pairs; body has model, messages, max_tokens
+
+        Returns:
+            Batch id for retrieve_batch()
+        """
+        results: Dict[str, Union[StubResponse, StubLLMError]] = {}
+        for custom_id, body in requests:
+            try:
+                self._draw(body["model"])
+            except StubLLMError as e:
+                results[custom_id] = e
+                continue
+            text = self._truncate(self.respond(body["messages"]), body.get("max_tokens"))
+            results[custom_id] = StubResponse(text=text, usage=self._usage(body["messages"], text))
+        batch_id = f"stub-batch-{next(self._batch_ids)}"
+        self._batches[batch_id] = (time.monotonic() + self.batch_latency, results)
+        return batch_id
+
+    def retrieve_batch(
+        self, batch_id: str
+    ) -> Optional[Dict[str, Union[StubResponse, StubLLMError]]]:
+        """Results by custom_id once the job has ended, None while it is running.
+
+        Results are handed out once; the job is forgotten afterwards.
+
+        Raises:
+            KeyError: If the batch id is unknown
+        """
+        ready_at, _ = self._batches[batch_id]
+        if time.monotonic() < ready_at:
+            return None
+        return self._batches.pop(batch_id)[1]
+
+    def close(self) -> None:
+        """Nothing to release; present so aclose_llm_clients() can treat it like an SDK client."""
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: Optional[int]) -> str:
+        """Cut to roughly max_tokens (4 characters per token), like a real model."""
+        if max_tokens and estimate_tokens(text) > max_tokens:
+            return text[: max_tokens * 4]
+        return text
@@ -0,0 +1,239 @@
+"""Nearest-neighbour indexes for RAGSystem.
+
+An index finds the stored chunk embeddings most similar to a query. It does
+not own the vectors: RAGSystem keeps them (L2-normalized, float32) in its
+embedding buffer and passes the current matrix in, so similarity is a dot
+product.
+
+- ExactIndex (default): scores every chunk. Always returns the true top-k;
+  latency grows linearly with the number of chunks.
+- IVFIndex: inverted-file approximate search in pure NumPy. Chunks are
+  grouped around `nlist` k-means centroids; a query only scores the chunks of
+  its `nprobe` nearest centroids. Raising nprobe trades latency for recall.
+
+Select one with RAGConfig(index="exact" | "ivf"), or pass any VectorIndex
+subclass to RAGSystem(config, index=...).
+
+Example:
+    index = IVFIndex(nlist=256, nprobe=8)
+    index.add(embeddings, start=0)
+    ids, scores = index.search(embeddings, query, k=5)
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32, so cosine similarity becomes a dot product."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0  # Leave all-zero vectors at zero instead of NaN
+    return embeddings / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first.
+
+    argpartition finds them in O(N); only those k are then sorted.
+    """
+    if k < len(scores):
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+class VectorIndex(ABC):
+    """Search structure over the rows of an externally stored embedding matrix."""
+
+    @abstractmethod
+    def add(self, embeddings: np.ndarray, start: int) -> None:
+        """Index newly stored rows.
+
+        Args:
+            embeddings: All stored embeddings (normalized)
+            start: First row not yet indexed
+        """
+
+    @abstractmethod
+    def search(
+        self, embeddings: np.ndarray, query: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the k rows most similar to a normalized query.
+
+        Returns:
+            (row indices, cosine similarities), best first
+        """
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget all indexed rows."""
+
+    def needs_training(self, count: int) -> bool:
+        """Whether train() should run now that `count` rows are stored."""
+        return False
+
+    def train(self, embeddings: np.ndarray) -> None:
+        """Fit the index to all stored rows (RAGSystem runs this in a worker thread)."""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict view for logging and JSON responses."""
+        return {"type": type(self).__name__}
+
+
+class ExactIndex(VectorIndex):
+    """Brute force: one matrix-vector product over every row, then top-k."""
+
+    def add(self, embeddings: np.ndarray, start: int) -> None:
+        pass  # Nothing to maintain
+
+    def search(
+        self, embeddings: np.ndarray, query: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        similarities = embeddings @ query
+        top_indices = _top_k(similarities, k)
+        return top_indices, similarities[top_indices]
+
+    def reset(self) -> None:
+        pass
+
+
+class IVFIndex(VectorIndex):
+    """Inverted-file index: k-means cells, search only the nearest `nprobe` cells.
+
+    Until it is trained, searches are exact and add() does nothing. Once
+    `nlist * MIN_POINTS_PER_LIST` rows are stored, needs_training() turns true
+    and RAGSystem trains the centroids off the event loop (spherical k-means on
+    a sample of at most `nlist * MAX_POINTS_PER_LIST` rows, then every row is
+    assigned to its nearest centroid); later rows are assigned as they are
+    added. Call train() again if the stored documents have changed a lot since.
+
+    A query scores the `nlist` centroids, then the rows of the `nprobe`
+    best cells: roughly nprobe / nlist of the collection. It can return fewer
+    than k rows if those cells hold fewer.
+    """
+
+    MIN_POINTS_PER_LIST = 39
+    MAX_POINTS_PER_LIST = 64
+    # Rows scored against the centroids at once when assigning
+    ASSIGN_BLOCK = 8192
+
+    def __init__(self, nlist: int = 256, nprobe: int = 8, niter: int = 10, seed: int = 0):
+        """Initialize index.
+
+        Args:
+            nlist: Number of cells (k-means centroids)
+            nprobe: Cells searched per query (higher = better recall, slower)
+            niter: k-means iterations when training
+            seed: Seed for the training sample and initial centroids
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.niter = niter
+        self.seed = seed
+        self.reset()
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def reset(self) -> None:
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = np.zeros(self.nlist, dtype=np.int64)
+
+    def add(self, embeddings: np.ndarray, start: int) -> None:
+        if self.is_trained:
+            self._add_to_lists(np.arange(start, len(embeddings)), self._assign(embeddings[start:]))
+
+    def needs_training(self, count: int) -> bool:
+        return not self.is_trained and count >= self.nlist * self.MIN_POINTS_PER_LIST
+
+    def train(self, embeddings: np.ndarray) -> None:
+        """(Re)compute centroids from a sample of `embeddings` and reassign every row.
+
+        Raises:
+            ValueError: If there are fewer rows than lists
+        """
+        if len(embeddings) < self.nlist:
+            raise ValueError(f"IVF training needs at least {self.nlist} embeddings")
+        started = time.perf_counter()
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(embeddings), self.nlist * self.MAX_POINTS_PER_LIST)
+        sample = embeddings[np.sort(rng.choice(len(embeddings), sample_size, replace=False))]
+        self.centroids = self._kmeans(sample, rng)
+        self._lists = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+        self._list_sizes = np.zeros(self.nlist, dtype=np.int64)
+        self._add_to_lists(np.arange(len(embeddings)), self._assign(embeddings))
+        logger.info(
+            f"Trained IVF index ({self.nlist} lists) on {sample_size} of "
+            f"{len(embeddings)} chunks in {time.perf_counter() - started:.2f}s"
+        )
+
+    def search(
+        self, embeddings: np.ndarray, query: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.is_trained:
+            return ExactIndex().search(embeddings, query, k)
+        probes = _top_k(self.centroids @ query, self.nprobe)
+        ids = np.concatenate([self._lists[p][: self._list_sizes[p]] for p in probes])
+        similarities = embeddings[ids] @ query
+        top = _top_k(similarities, k)
+        return ids[top], similarities[top]
+
+    def _kmeans(self, sample: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Spherical k-means: centroids are re-normalized means of their rows."""
+        centroids = sample[rng.choice(len(sample), self.nlist, replace=False)]
+        for _ in range(self.niter):
+            assignments = self._assign(sample, centroids)
+            counts = np.bincount(assignments, minlength=self.nlist)
+            nonempty = np.flatnonzero(counts)
+            starts = (np.cumsum(counts) - counts)[nonempty]
+            sums = np.zeros_like(centroids)
+            sums[nonempty] = np.add.reduceat(
+                sample[np.argsort(assignments, kind="stable")], starts, axis=0
+            )
+            empty = counts == 0
+            if empty.any():  # Re-seed empty cells with random rows
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+            centroids = _normalize(sums)
+        return centroids
+
+    def _assign(self, vectors: np.ndarray, centroids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Nearest centroid per row, in blocks to bound the score matrix."""
+        centroids = self.centroids if centroids is None else centroids
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for i in range(0, len(vectors), self.ASSIGN_BLOCK):
+            block = vectors[i : i + self.ASSIGN_BLOCK]
+            assignments[i : i + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assignments
+
+    def _add_to_lists(self, ids: np.ndarray, assignments: np.ndarray) -> None:
+        """Append ids to their cells' id arrays, doubling an array when full."""
+        counts = np.bincount(assignments, minlength=self.nlist)
+        groups = np.split(ids[np.argsort(assignments, kind="stable")], np.cumsum(counts)[:-1])
+        for cell in np.flatnonzero(counts):
+            size = self._list_sizes[cell]
+            needed = size + counts[cell]
+            if needed > len(self._lists[cell]):
+                grown = np.empty(max(needed, 2 * len(self._lists[cell])), dtype=np.int64)
+                grown[:size] = self._lists[cell][:size]
+                self._lists[cell] = grown
+            self._lists[cell][size:needed] = groups[cell]
+            self._list_sizes[cell] = needed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": type(self).__name__,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "trained": self.is_trained,
+            "indexed": int(self._list_sizes.sum()),
+        }
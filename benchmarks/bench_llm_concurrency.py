@@ -0,0 +1,105 @@
+"""Benchmark: LLM call throughput at high concurrency against a local stub server.
+
+Compares the previous approach (sync SDK client wrapped in asyncio.to_thread,
+capped by the default executor's ~32 threads) with LLMClient's native async
+clients sharing one connection pool.
+
+Usage:
+    python benchmarks/bench_llm_concurrency.py
+    python benchmarks/bench_llm_concurrency.py --requests 500 --latency 0.2 --provider all
+"""
+
+import argparse
+import asyncio
+import time
+
+from stub_llm_server import run_stub_server
+
+from agent_framework import LatencyTracker, LLMClient, LLMConfig, aclose_llm_clients
+
+
+def _config(provider: str, base_url: str) -> LLMConfig:
+    if provider == "openai":
+        return LLMConfig(provider="openai", base_url=f"{base_url}/v1", api_key="stub")
+    if provider == "anthropic":
+        return LLMConfig(provider="anthropic", base_url=base_url, api_key="stub")
+    return LLMConfig(provider="ollama", base_url=base_url)
+
+
+def _sync_call(provider: str, base_url: str):
+    """Build a blocking call equivalent to the old to_thread code path."""
+    config = _config(provider, base_url)
+    messages = [{"role": "user", "content": "Analyze AAPL"}]
+    if provider == "openai":
+        import openai
+
+        client = openai.OpenAI(api_key="stub", base_url=config.base_url)
+        return lambda: client.chat.completions.create(
+            model=config.model, messages=messages, max_tokens=config.max_tokens
+        )
+    if provider == "anthropic":
+        import anthropic
+
+        client = anthropic.Anthropic(api_key="stub", base_url=config.base_url)
+        return lambda: client.messages.create(
+            model=config.model, messages=messages, max_tokens=config.max_tokens
+        )
+    import ollama
+
+    client = ollama.Client(host=config.base_url)
+    return lambda: client.chat(model=config.model, messages=messages)
+
+
+async def _run(name: str, call, requests: int, tracker: LatencyTracker) -> float:
+    async def timed():
+        started = time.perf_counter()
+        await call()
+        tracker.record(name, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(requests)))
+    return time.perf_counter() - started
+
+
+async def bench(provider: str, base_url: str, requests: int) -> None:
+    tracker = LatencyTracker(window=requests)
+    sync_call = _sync_call(provider, base_url)
+    client = LLMClient(_config(provider, base_url))
+
+    # Warm up connections / imports for both paths
+    await asyncio.gather(*(asyncio.to_thread(sync_call) for _ in range(8)))
+    await asyncio.gather(*(client.chat("Analyze AAPL") for _ in range(8)))
+
+    modes = {
+        "to_thread (sync SDK)": lambda: asyncio.to_thread(sync_call),
+        "native async": lambda: client.chat("Analyze AAPL"),
+    }
+    print(f"\n{provider}: {requests} concurrent requests")
+    print(f"{'mode':<22} {'total s':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, call in modes.items():
+        elapsed = await _run(name, call, requests, tracker)
+        stats = tracker.summary()[name]
+        print(
+            f"{name:<22} {elapsed:>8.2f} {requests / elapsed:>8.0f} "
+            f"{stats['p50_ms']:>8.0f} {stats['p99_ms']:>8.0f}"
+        )
+    await aclose_llm_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="Concurrent requests")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub seconds per response")
+    parser.add_argument(
+        "--provider", choices=["openai", "anthropic", "ollama", "all"], default="openai"
+    )
+    args = parser.parse_args()
+
+    providers = ["openai", "anthropic", "ollama"] if args.provider == "all" else [args.provider]
+    with run_stub_server(latency=args.latency) as base_url:
+        for provider in providers:
+            asyncio.run(bench(provider, base_url, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark: NUMERIC decoded as Decimal (default) vs float (numeric_as_float).
+
+Part 1 needs nothing but Python: it measures parsing the server's decimal text
+into Decimal vs float, and the arithmetic agents typically do on the result.
+
+Part 2 runs get_prices / get_fundamentals against a seeded database twice,
+once per DatabaseConfig.numeric_as_float setting. It is skipped if the
+database is unreachable.
+
+Usage:
+    python benchmarks/bench_numeric_codec.py
+    python benchmarks/bench_numeric_codec.py --rows 200000 --iterations 200
+    DATABASE_URL=postgresql://... python benchmarks/bench_numeric_codec.py
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from agent_framework import Config, Database, DatabaseConfig, DBConnectionError
+
+
+def _timeit(fn, repeat: int = 5) -> float:
+    """Best-of-N wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_decode_and_math(rows: int) -> None:
+    """Compare Decimal and float for decode + typical agent arithmetic."""
+    texts = [f"{random.uniform(10, 500):.2f}" for _ in range(rows)]
+    decimals = [Decimal(t) for t in texts]
+    floats = [float(t) for t in texts]
+
+    def returns(values):
+        return [b / a - 1 for a, b in zip(values, values[1:])]
+
+    results = {
+        "decode": (
+            _timeit(lambda: [Decimal(t) for t in texts]),
+            _timeit(lambda: [float(t) for t in texts]),
+        ),
+        "sum/mean": (
+            _timeit(lambda: sum(decimals) / len(decimals)),
+            _timeit(lambda: sum(floats) / len(floats)),
+        ),
+        "returns": (_timeit(lambda: returns(decimals)), _timeit(lambda: returns(floats))),
+    }
+
+    print(f"\nDecode + arithmetic on {rows:,} NUMERIC values (best of 5)")
+    print(f"{'operation':<12} {'Decimal ms':>12} {'float ms':>10} {'speedup':>8}")
+    for name, (dec_s, flt_s) in results.items():
+        print(f"{name:<12} {dec_s * 1000:>12.2f} {flt_s * 1000:>10.2f} {dec_s / flt_s:>7.1f}x")
+
+
+async def _time_queries(db: Database, ticker: str, days: int, iterations: int) -> dict:
+    timings = {"get_prices": [], "get_fundamentals": []}
+    for _ in range(iterations):
+        started = time.perf_counter()
+        prices = await db.get_prices(ticker, days=days)
+        # What a momentum agent would do with the rows
+        closes = [row["close"] for row in prices]
+        _ = sum(closes) / len(closes) if closes else 0
+        timings["get_prices"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        data = await db.get_fundamentals(ticker)
+        if data and data["pe_ratio"] is not None and data["roe"] is not None:
+            _ = data["pe_ratio"] * data["roe"] / 100
+        timings["get_fundamentals"].append(time.perf_counter() - started)
+    return {name: statistics.median(values) for name, values in timings.items()}
+
+
+async def bench_database(days: int, iterations: int) -> None:
+    """Compare both codec settings on real queries."""
+    connection_string = Config.get_database_url()
+    results = {}
+    for as_float in (False, True):
+        config = DatabaseConfig(connection_string=connection_string, numeric_as_float=as_float)
+        db = Database(connection_string, config)
+        try:
+            await db.connect()
+        except DBConnectionError as e:
+            print(f"\nSkipping database benchmark: {e}")
+            return
+        try:
+            tickers = await db.list_tickers()
+            if not tickers:
+                print("\nSkipping database benchmark: no data (run seed_data.py)")
+                return
+            await _time_queries(db, tickers[0], days, 5)  # Warm up statement cache
+            results[as_float] = await _time_queries(db, tickers[0], days, iterations)
+        finally:
+            await db.disconnect()
+
+    print(f"\nDatabase queries (median of {iterations}, days={days})")
+    print(f"{'query':<18} {'Decimal ms':>12} {'float ms':>10} {'speedup':>8}")
+    for name in results[False]:
+        dec_s, flt_s = results[False][name], results[True][name]
+        print(f"{name:<18} {dec_s * 1000:>12.3f} {flt_s * 1000:>10.3f} {dec_s / flt_s:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Values for the decode benchmark")
+    parser.add_argument("--days", type=int, default=90, help="Price rows per get_prices call")
+    parser.add_argument("--iterations", type=int, default=100, help="Database query repetitions")
+    args = parser.parse_args()
+
+    bench_decode_and_math(args.rows)
+    asyncio.run(bench_database(args.days, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
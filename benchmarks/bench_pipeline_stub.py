@@ -0,0 +1,200 @@
+"""Benchmark: the analysis pipeline end to end with the in-process stub LLM.
+
+Every LLM call goes to provider='stub' (agent_framework/stub_llm.py), so the
+run needs no network, model or API key, yet calls still take realistic time
+(--latency) and fail at a realistic rate (--error-rate). Measures:
+
+1. SemanticCompressor compressing fundamentals concurrently
+2. POST /analyze/batch with LLM agents (skipped if the database is unreachable)
+3. A RAG agent: add a filing, retrieve, ask the LLM (skipped without
+   sentence-transformers)
+
+Usage:
+    python benchmarks/bench_pipeline_stub.py
+    python benchmarks/bench_pipeline_stub.py --latency lognormal:0.8,0.5 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import time
+
+from agent_framework import (
+    Agent,
+    AgentConfig,
+    Config,
+    Database,
+    DBConnectionError,
+    LLMConfig,
+    RAGConfig,
+    SemanticCompressor,
+    Signal,
+    TickerIndex,
+    parse_llm_signal,
+)
+from agent_framework.llm import LLMClient, call_stats, llm_latency
+
+_FILING = (
+    "Revenue grew 12% year over year driven by services. Gross margin expanded to 44%. "
+    "The company repurchased $20B of shares and raised its dividend. Supply constraints "
+    "in the second quarter weighed on hardware sales. Management guided to mid single "
+    "digit growth next year, citing foreign exchange headwinds and regulatory risk. "
+) * 20
+
+
+class StubLLMAgent(Agent):
+    """Asks the LLM for a DIRECTION|CONFIDENCE|REASONING signal."""
+
+    async def analyze(self, ticker: str, data: dict) -> Signal:
+        response = await self.llm.chat(
+            f"Analyze {ticker}: P/E {data.get('pe_ratio')}, ROE {data.get('roe')}. "
+            "Respond as DIRECTION|CONFIDENCE|REASONING."
+        )
+        return parse_llm_signal(response)
+
+
+class StubRAGAgent(Agent):
+    """Retrieves filing excerpts and asks the LLM about them."""
+
+    async def analyze(self, ticker: str, data: dict) -> Signal:
+        context = await self.rag.query(f"What are the main risks for {ticker}?")
+        response = await self.llm.chat(f"Assess {ticker}'s risks.", context=context)
+        return parse_llm_signal(response)
+
+
+def _report(name: str, count: int, elapsed: float) -> None:
+    print(f"{name:<28} {count:>6} {elapsed:>8.2f} {count / elapsed:>8.1f}")
+
+
+async def bench_compression(calls: int, concurrency: int) -> None:
+    """Compress `calls` fundamentals dicts through the stub LLM."""
+    compressor = SemanticCompressor(provider="stub")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        # Distinct data per call, so identical prompts aren't coalesced
+        data = {"ticker": f"T{i}", "pe_ratio": 10 + i % 30, "roe": 5 + i % 40}
+        async with semaphore:
+            try:
+                await compressor.compress_fundamentals(data, "value investing")
+            except Exception:
+                pass  # Injected errors; counted in the stub stats
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    _report("SemanticCompressor", calls, time.perf_counter() - started)
+
+
+async def bench_api(agents: int, rounds: int, concurrency: int) -> None:
+    """Run /analyze/batch with `agents` LLM agents over every seeded ticker."""
+    import httpx
+
+    from agent_framework.api import app, clear_agents, register_agent_instance
+
+    db = Database(Config.get_database_url())
+    try:
+        await db.connect()
+    except DBConnectionError as e:
+        print(f"{'/analyze/batch':<28} skipped: {e}")
+        return
+    try:
+        tickers = await db.list_tickers()
+        if not tickers:
+            print(f"{'/analyze/batch':<28} skipped: no data (run seed_data.py)")
+            return
+        app.state.db = db
+        app.state.ticker_index = TickerIndex(db)
+        names = [f"stub_agent_{i}" for i in range(agents)]
+        for name in names:
+            config = AgentConfig(
+                name=name,
+                description="Stub LLM agent",
+                llm=LLMConfig(provider="stub", system_prompt=f"You are analyst {name}."),
+            )
+            register_agent_instance(name, StubLLMAgent(config))
+
+        request = {"agent_names": names, "tickers": tickers, "max_concurrency": concurrency}
+        transport = httpx.ASGITransport(app=app)
+        failed = 0
+        started = time.perf_counter()
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for _ in range(rounds):
+                response = await client.post("/analyze/batch", json=request, timeout=None)
+                failed += response.json()["failed"]
+        elapsed = time.perf_counter() - started
+        _report("/analyze/batch", rounds * agents * len(tickers), elapsed)
+        if failed:
+            print(f"{'':<28} {failed} analyses failed")
+    finally:
+        clear_agents()
+        app.state.__dict__.pop("db", None)
+        app.state.__dict__.pop("ticker_index", None)
+        await db.disconnect()
+
+
+async def bench_rag(queries: int, concurrency: int) -> None:
+    """Add a filing once, then run `queries` RAG analyses."""
+    if importlib.util.find_spec("sentence_transformers") is None:
+        print(f"{'RAG agent':<28} skipped: sentence-transformers not installed")
+        return
+    agent = StubRAGAgent(
+        AgentConfig(
+            name="stub_rag",
+            description="Stub RAG agent",
+            llm=LLMConfig(provider="stub"),
+            rag=RAGConfig(chunk_size=300, chunk_overlap=50, top_k=3),
+        )
+    )
+    await agent.rag.add_document(_FILING)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            try:
+                await agent.analyze(f"T{i}", {})
+            except Exception:
+                pass
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(queries)))
+    _report("RAG agent", queries, time.perf_counter() - started)
+
+
+async def bench(args: argparse.Namespace) -> None:
+    print(f"stub latency {args.latency}, error rate {args.error_rate}")
+    print(f"{'stage':<28} {'calls':>6} {'total s':>8} {'per s':>8}")
+    await bench_compression(args.calls, args.concurrency)
+    await bench_api(args.agents, args.rounds, args.concurrency)
+    await bench_rag(args.calls, args.concurrency)
+
+    stub = await LLMClient(LLMConfig(provider="stub"))._get_client()
+    print(f"\nLLM calls: {call_stats.to_dict()}")
+    print(f"Stub: {stub.stats.to_dict()}")
+    for key, stats in llm_latency.summary().items():
+        print(
+            f"{key} latency: p50 {stats['p50_ms']:.0f} ms, "
+            f"p99 {stats['p99_ms']:.0f} ms, max {stats['max_ms']:.0f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", default="lognormal:0.2,0.5", help="Stub latency spec")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Stub 503 rate")
+    parser.add_argument("--calls", type=int, default=500, help="Compression and RAG calls")
+    parser.add_argument("--agents", type=int, default=10, help="LLM agents in the batch")
+    parser.add_argument("--rounds", type=int, default=5, help="/analyze/batch requests")
+    parser.add_argument("--concurrency", type=int, default=64, help="Calls in flight")
+    parser.add_argument("--seed", type=int, default=42, help="Stub seed")
+    args = parser.parse_args()
+
+    # Read by LLMClient when it creates the stub
+    os.environ.update(
+        STUB_LATENCY=args.latency, STUB_ERROR_RATE=str(args.error_rate), STUB_SEED=str(args.seed)
+    )
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
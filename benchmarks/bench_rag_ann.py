@@ -0,0 +1,113 @@
+"""Benchmark: RAG search recall@k vs latency, IVF index against exact search.
+
+For each collection size, stores the embeddings once in an exact and an
+IVF-indexed RAGSystem, then sweeps nprobe (cells searched per query). recall@k
+is the fraction of the exact top-k that the IVF search also returns; latency
+is the median per query. Build time includes training the IVF centroids.
+
+By default the embeddings are synthetic: 384-dimensional points around
+random cluster centres (--clusters, --noise), with queries drawn near stored
+points. Uniform random vectors have no neighbourhood structure, so they are
+the worst case for any ANN index; real sentence embeddings are clustered.
+Pass --embeddings file.npy to use real ones (queries are held-out rows).
+
+Usage:
+    python benchmarks/bench_rag_ann.py
+    python benchmarks/bench_rag_ann.py --sizes 100000,1000000 --nlist 1024 --nprobe 4,16,64
+    python benchmarks/bench_rag_ann.py --embeddings filings.npy --top-k 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from agent_framework import IVFIndex, RAGConfig, RAGSystem
+
+DIM = 384
+BLOCK = 50_000  # Chunks added per _store() call
+
+
+def _synthetic(size: int, queries: int, args, rng: np.random.Generator):
+    centers = rng.standard_normal((args.clusters, DIM), dtype=np.float32)
+
+    def points(n: int) -> np.ndarray:
+        rows = centers[rng.integers(0, args.clusters, n)]
+        return rows + args.noise * rng.standard_normal((n, DIM), dtype=np.float32)
+
+    return (points(n) for n in _blocks(size)), points(queries)
+
+
+def _from_file(size: int, queries: int, args, rng: np.random.Generator):
+    data = np.load(args.embeddings, mmap_mode="r")
+    if size + queries > len(data):
+        raise SystemExit(f"{args.embeddings} has {len(data)} rows, need {size + queries}")
+    order = rng.permutation(len(data))[: size + queries]
+    stored, held_out = order[:size], order[size:]
+    starts = np.cumsum([0] + list(_blocks(size)))
+    return (data[np.sort(stored[a:b])] for a, b in zip(starts, starts[1:])), data[held_out]
+
+
+def _blocks(size: int):
+    return [min(BLOCK, size - start) for start in range(0, size, BLOCK)]
+
+
+def _timed_search(rag: RAGSystem, queries: np.ndarray, k: int):
+    results, times = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(rag._search(query, k)[0])
+        times.append(time.perf_counter() - started)
+    return results, float(np.median(times)) * 1000
+
+
+def bench(size: int, args, rng: np.random.Generator) -> None:
+    load = _from_file if args.embeddings else _synthetic
+    blocks, queries = load(size, args.queries, args, rng)
+    exact = RAGSystem(RAGConfig(top_k=args.top_k))
+    ivf = RAGSystem(RAGConfig(top_k=args.top_k), index=IVFIndex(nlist=args.nlist))
+
+    build_ivf = 0.0
+    for vectors in blocks:
+        chunks = ["chunk"] * len(vectors)
+        exact._store(chunks, vectors)
+        started = time.perf_counter()
+        ivf._store(chunks, vectors)
+        build_ivf += time.perf_counter() - started
+    started = time.perf_counter()  # _store() leaves training to add_document()
+    ivf.index.train(ivf.embeddings)
+    build_ivf += time.perf_counter() - started
+
+    truth, exact_ms = _timed_search(exact, queries, args.top_k)
+    print(f"\n{size:,} chunks, nlist={args.nlist}, IVF build {build_ivf:.1f}s")
+    print(f"{'index':<14} {'recall@' + str(args.top_k):>10} {'p50 ms':>8} {'speedup':>8}")
+    print(f"{'exact':<14} {1.0:>10.3f} {exact_ms:>8.2f} {1.0:>7.1f}x")
+    for nprobe in (int(n) for n in args.nprobe.split(",")):
+        ivf.index.nprobe = nprobe
+        found, ivf_ms = _timed_search(ivf, queries, args.top_k)
+        recall = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(truth, found)])
+        label = f"ivf nprobe={nprobe}"
+        print(f"{label:<14} {recall:>10.3f} {ivf_ms:>8.2f} {exact_ms / ivf_ms:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000", help="Chunk counts")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per size")
+    parser.add_argument("--top-k", type=int, default=3, help="Chunks returned per query")
+    parser.add_argument("--nlist", type=int, default=256, help="IVF cells")
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32", help="Cells searched, to sweep")
+    parser.add_argument("--clusters", type=int, default=2000, help="Synthetic topic count")
+    parser.add_argument("--noise", type=float, default=0.7, help="Synthetic spread per topic")
+    parser.add_argument("--embeddings", help=".npy file of real embeddings (rows x dim)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    source = args.embeddings or f"synthetic dim={DIM}, {args.clusters} clusters, noise {args.noise}"
+    print(f"{source}, median of {args.queries} queries")
+    for size in (int(s) for s in args.sizes.split(",")):
+        bench(size, args, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark: RAG ingestion of many filings, np.vstack vs the growable buffer.
+
+Adds --filings documents of --chunks chunks each. The previous storage
+stacked the whole embedding matrix onto each new document (np.vstack) and
+kept chunk texts in a Python list; the current one appends into a
+capacity-doubling float32 buffer and a compact UTF-8 chunk store. Uses
+random 384-dimensional embeddings, so no embedding model is needed;
+embedding time is not included.
+
+Usage:
+    python benchmarks/bench_rag_ingest.py
+    python benchmarks/bench_rag_ingest.py --filings 2000 --chunks 50
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from agent_framework import RAGConfig, RAGSystem
+from agent_framework.rag import _normalize
+
+DIM = 384
+_TEXT = "Revenue grew 12% year over year driven by services and margin expansion. " * 20
+
+
+def _old_ingest(filings, chunks):
+    """The storage RAGSystem._store used before the growable buffer."""
+    documents, embeddings = [], None
+    for texts, vectors in zip(filings, chunks):
+        documents.extend(texts)
+        vectors = _normalize(vectors)
+        embeddings = vectors if embeddings is None else np.vstack([embeddings, vectors])
+    return documents, embeddings
+
+
+def _new_ingest(filings, chunks):
+    rag = RAGSystem(RAGConfig())
+    for texts, vectors in zip(filings, chunks):
+        rag._store(texts, vectors)
+    return rag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filings", type=int, default=1000, help="Documents to add")
+    parser.add_argument("--chunks", type=int, default=100, help="Chunks per document")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = [
+        rng.standard_normal((args.chunks, DIM), dtype=np.float32) for _ in range(args.filings)
+    ]
+    texts = [
+        [f"{f}-{c} {_TEXT}" for c in range(args.chunks)] for f in range(args.filings)
+    ]
+    print(f"{args.filings} filings x {args.chunks} chunks, dim={DIM}")
+
+    started = time.perf_counter()
+    documents, embeddings = _old_ingest(texts, vectors)
+    old_s = time.perf_counter() - started
+    old_text = sys.getsizeof(documents) + sum(sys.getsizeof(t) for t in documents)
+
+    started = time.perf_counter()
+    rag = _new_ingest(texts, vectors)
+    new_s = time.perf_counter() - started
+    assert np.array_equal(embeddings, rag.embeddings)
+    assert documents[-1] == rag.documents[-1]
+
+    print(f"{'':<22} {'np.vstack':>12} {'buffer':>12}")
+    print(f"{'ingest seconds':<22} {old_s:>12.2f} {new_s:>12.2f}  ({old_s / new_s:.1f}x)")
+    print(f"{'chunk text MB':<22} {old_text / 1e6:>12.1f} {rag.documents.nbytes / 1e6:>12.1f}")
+    print(
+        f"{'embedding MB':<22} {embeddings.nbytes / 1e6:>12.1f} "
+        f"{rag._embeddings.nbytes / 1e6:>12.1f}  (incl. spare capacity)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark: RAGSystem.query search latency at 10k, 100k and 1M chunks.
+
+Compares the previous search (cosine similarity recomputing every chunk's
+norm, then a full argsort) with the current one (embeddings normalized at
+insert time, one matrix-vector product, argpartition top-k). Uses random
+384-dimensional embeddings (the size of all-MiniLM-L6-v2), so no embedding
+model is needed; question encoding is not included.
+
+Usage:
+    python benchmarks/bench_rag_query.py
+    python benchmarks/bench_rag_query.py --sizes 10000,100000 --queries 200 --top-k 5
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from agent_framework import RAGConfig, RAGSystem
+
+DIM = 384
+BLOCK = 50_000  # Chunks added per _store() call
+
+
+def _old_search(embeddings: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    """The search RAGSystem.query used before normalizing at insert time."""
+    similarities = np.dot(embeddings, query) / (
+        np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query)
+    )
+    return np.argsort(similarities)[-k:][::-1]
+
+
+def _median_ms(fn, queries: np.ndarray) -> float:
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        times.append(time.perf_counter() - started)
+    return float(np.median(times)) * 1000
+
+
+def bench(size: int, queries: int, top_k: int, rng: np.random.Generator) -> None:
+    rag = RAGSystem(RAGConfig(top_k=top_k))
+    for start in range(0, size, BLOCK):
+        count = min(BLOCK, size - start)
+        vectors = rng.standard_normal((count, DIM), dtype=np.float32)
+        rag._store([f"chunk {i}" for i in range(start, start + count)], vectors)
+    query_vectors = rng.standard_normal((queries, DIM), dtype=np.float32)
+
+    mismatches = sum(
+        not np.array_equal(_old_search(rag.embeddings, q, top_k), rag._search(q, top_k)[0])
+        for q in query_vectors[:10]
+    )
+    old_ms = _median_ms(lambda q: _old_search(rag.embeddings, q, top_k), query_vectors)
+    new_ms = _median_ms(lambda q: rag._search(q, top_k), query_vectors)
+    note = f"  ({mismatches}/10 top-k differ)" if mismatches else ""
+    print(f"{size:>10,} {old_ms:>12.2f} {new_ms:>12.2f} {old_ms / new_ms:>8.1f}x{note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Chunk counts")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per size")
+    parser.add_argument("--top-k", type=int, default=3, help="Chunks returned per query")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"dim={DIM}, top_k={args.top_k}, median of {args.queries} queries")
+    print(f"{'chunks':>10} {'argsort ms':>12} {'argpart ms':>12} {'speedup':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        bench(size, args.queries, args.top_k, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Local stub of the OpenAI, Anthropic and Ollama chat APIs for benchmarks.
+
+Every endpoint waits `latency` seconds (simulating model time) and returns a
+fixed answer, so benchmarks measure client-side overhead and concurrency
+rather than a real model. With "stream": true the answer is sent word by word,
+spread evenly over the same `latency`.
+
+Usage (standalone):
+    python benchmarks/stub_llm_server.py --port 8765 --latency 0.2
+
+Usage (from a benchmark):
+    with run_stub_server(latency=0.2) as base_url:
+        LLMConfig(provider="openai", base_url=f"{base_url}/v1", api_key="stub")
+        LLMConfig(provider="anthropic", base_url=base_url, api_key="stub")
+        LLMConfig(provider="ollama", base_url=base_url)
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import re
+import socket
+import time
+import urllib.request
+from contextlib import contextmanager
+
+ANSWER = "BULLISH\nConfidence: 70%\nReasoning: Stub response."
+TOKENS = re.findall(r"\S+\s*", ANSWER)
+
+
+def create_app(latency: float):
+    """Build the FastAPI stub app."""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import StreamingResponse
+
+    app = FastAPI()
+
+    async def tokens():
+        for token in TOKENS:
+            await asyncio.sleep(latency / len(TOKENS))
+            yield token
+
+    def sse(data: dict, event: str = None) -> str:
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {json.dumps(data)}\n\n"
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        if body.get("stream"):
+
+            async def events():
+                async for token in tokens():
+                    chunk = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [
+                            {"index": 0, "delta": {"content": token}, "finish_reason": None}
+                        ],
+                    }
+                    yield sse(chunk)
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": ANSWER},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+
+    @app.post("/v1/messages")
+    async def anthropic_messages(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        if body.get("stream"):
+
+            async def events():
+                message = {
+                    "id": "msg_stub",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": model,
+                    "content": [],
+                    "stop_reason": None,
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 10, "output_tokens": 0},
+                }
+                yield sse({"type": "message_start", "message": message}, "message_start")
+                block = {"type": "text", "text": ""}
+                start = {"type": "content_block_start", "index": 0, "content_block": block}
+                yield sse(start, "content_block_start")
+                async for token in tokens():
+                    delta = {
+                        "type": "content_block_delta",
+                        "index": 0,
+                        "delta": {"type": "text_delta", "text": token},
+                    }
+                    yield sse(delta, "content_block_delta")
+                yield sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+                end = {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": len(TOKENS)},
+                }
+                yield sse(end, "message_delta")
+                yield sse({"type": "message_stop"}, "message_stop")
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency)
+        return {
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [{"type": "text", "text": ANSWER}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 10, "output_tokens": 10},
+        }
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        if body.get("stream", True):  # Ollama streams unless told otherwise
+
+            async def lines():
+                async for token in tokens():
+                    part = {
+                        "model": model,
+                        "created_at": "2024-01-01T00:00:00Z",
+                        "message": {"role": "assistant", "content": token},
+                        "done": False,
+                    }
+                    yield json.dumps(part) + "\n"
+                final = {
+                    "model": model,
+                    "created_at": "2024-01-01T00:00:00Z",
+                    "message": {"role": "assistant", "content": ""},
+                    "done": True,
+                }
+                yield json.dumps(final) + "\n"
+
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        await asyncio.sleep(latency)
+        return {
+            "model": model,
+            "created_at": "2024-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": ANSWER},
+            "done": True,
+        }
+
+    return app
+
+
+def serve(port: int, latency: float) -> None:
+    """Run the stub server (blocking)."""
+    import uvicorn
+
+    uvicorn.run(create_app(latency), host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def run_stub_server(latency: float = 0.2, port: int = 0):
+    """Run the stub server in a child process; yields its base URL."""
+    port = port or _free_port()
+    process = multiprocessing.Process(target=serve, args=(port, latency), daemon=True)
+    process.start()
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"{base_url}/health", timeout=0.5)
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("Stub LLM server did not start")
+        yield base_url
+    finally:
+        process.terminate()
+        process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per response")
+    args = parser.parse_args()
+    serve(args.port, args.latency)
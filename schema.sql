@@ -6,6 +6,10 @@ CREATE SCHEMA IF NOT EXISTS thesis_data;
 
 -- Drop existing objects (in correct order for dependencies)
 DROP VIEW IF EXISTS thesis_data.fundamentals CASCADE;
+DROP TABLE IF EXISTS thesis_data.fundamentals_materialized CASCADE;
+DROP FUNCTION IF EXISTS thesis_data.refresh_fundamentals(TEXT[]) CASCADE;
+DROP FUNCTION IF EXISTS thesis_data.sync_fundamentals() CASCADE;
+DROP FUNCTION IF EXISTS thesis_data.notify_change() CASCADE;
 DROP TABLE IF EXISTS thesis_data.edgar_filing_chunks CASCADE;
 DROP TABLE IF EXISTS thesis_data.edgar_filings CASCADE;
 DROP TABLE IF EXISTS thesis_data.stock_news CASCADE;
@@ -139,6 +143,257 @@ WHERE ef.filing_type = '10-K'
         AND ef2.filing_type = '10-K'
   );
 
+-- =============================================================================
+-- MATERIALIZED FUNDAMENTALS
+-- Same columns as the fundamentals view, stored once per ticker so reads are a
+-- primary-key lookup instead of a correlated MAX(filing_date) + JSONB casts.
+-- Kept current by triggers on edgar_filings; refresh_fundamentals() recomputes
+-- only tickers whose latest 10-K (or its contents) changed.
+-- =============================================================================
+CREATE TABLE thesis_data.fundamentals_materialized (
+    ticker VARCHAR(10) PRIMARY KEY,
+    name VARCHAR(255),
+    sector VARCHAR(100),
+    market_cap BIGINT,
+    pe_ratio NUMERIC(10, 2),
+    pb_ratio NUMERIC(10, 2),
+    roe NUMERIC(10, 2),
+    profit_margin NUMERIC(10, 2),
+    revenue_growth NUMERIC(10, 2),
+    debt_to_equity NUMERIC(10, 2),
+    current_ratio NUMERIC(10, 2),
+    dividend_yield NUMERIC(10, 2),
+    updated_at DATE,
+    source_filing_id VARCHAR(100) NOT NULL,
+    source_version TEXT NOT NULL,       -- md5 of the source filing row
+    refreshed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Recompute fundamentals for the given tickers (NULL = all tickers).
+-- Returns number of tickers inserted, updated or removed.
+CREATE FUNCTION thesis_data.refresh_fundamentals(p_tickers TEXT[] DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    changed INTEGER;
+    removed INTEGER;
+BEGIN
+    WITH latest AS (
+        SELECT DISTINCT ON (ef.ticker)
+            ef.ticker,
+            ef.company_name,
+            ef.financial_data,
+            ef.filing_date,
+            ef.filing_id,
+            md5(ef.filing_id || '|' || COALESCE(ef.company_name, '') || '|'
+                || ef.filing_date::TEXT || '|' || COALESCE(ef.financial_data::TEXT, '')) AS version
+        FROM thesis_data.edgar_filings ef
+        WHERE ef.filing_type = '10-K'
+          AND (p_tickers IS NULL OR ef.ticker = ANY(p_tickers))
+        ORDER BY ef.ticker, ef.filing_date DESC, ef.id DESC
+    )
+    INSERT INTO thesis_data.fundamentals_materialized (
+        ticker, name, sector, market_cap, pe_ratio, pb_ratio, roe, profit_margin,
+        revenue_growth, debt_to_equity, current_ratio, dividend_yield, updated_at,
+        source_filing_id, source_version, refreshed_at
+    )
+    SELECT
+        l.ticker,
+        l.company_name,
+        (l.financial_data->>'sector')::VARCHAR(100),
+        (l.financial_data->>'market_cap')::BIGINT,
+        (l.financial_data->>'pe_ratio')::NUMERIC(10,2),
+        (l.financial_data->>'pb_ratio')::NUMERIC(10,2),
+        (l.financial_data->>'roe')::NUMERIC(10,2),
+        (l.financial_data->>'profit_margin')::NUMERIC(10,2),
+        (l.financial_data->>'revenue_growth')::NUMERIC(10,2),
+        (l.financial_data->>'debt_to_equity')::NUMERIC(10,2),
+        (l.financial_data->>'current_ratio')::NUMERIC(10,2),
+        (l.financial_data->>'dividend_yield')::NUMERIC(10,2),
+        l.filing_date,
+        l.filing_id,
+        l.version,
+        NOW()
+    FROM latest l
+    LEFT JOIN thesis_data.fundamentals_materialized cur ON cur.ticker = l.ticker
+    WHERE cur.ticker IS NULL OR cur.source_version <> l.version
+    ON CONFLICT (ticker) DO UPDATE SET
+        name = EXCLUDED.name,
+        sector = EXCLUDED.sector,
+        market_cap = EXCLUDED.market_cap,
+        pe_ratio = EXCLUDED.pe_ratio,
+        pb_ratio = EXCLUDED.pb_ratio,
+        roe = EXCLUDED.roe,
+        profit_margin = EXCLUDED.profit_margin,
+        revenue_growth = EXCLUDED.revenue_growth,
+        debt_to_equity = EXCLUDED.debt_to_equity,
+        current_ratio = EXCLUDED.current_ratio,
+        dividend_yield = EXCLUDED.dividend_yield,
+        updated_at = EXCLUDED.updated_at,
+        source_filing_id = EXCLUDED.source_filing_id,
+        source_version = EXCLUDED.source_version,
+        refreshed_at = EXCLUDED.refreshed_at;
+    GET DIAGNOSTICS changed = ROW_COUNT;
+
+    -- Tickers that no longer have any 10-K
+    DELETE FROM thesis_data.fundamentals_materialized fm
+    WHERE (p_tickers IS NULL OR fm.ticker = ANY(p_tickers))
+      AND NOT EXISTS (
+          SELECT 1 FROM thesis_data.edgar_filings ef
+          WHERE ef.ticker = fm.ticker AND ef.filing_type = '10-K'
+      );
+    GET DIAGNOSTICS removed = ROW_COUNT;
+
+    RETURN changed + removed;
+END;
+$$;
+
+-- Statement-level sync: one refresh per statement for all touched tickers
+CREATE FUNCTION thesis_data.sync_fundamentals()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    touched TEXT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT ticker) INTO touched
+        FROM new_rows WHERE filing_type = '10-K';
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(DISTINCT ticker) INTO touched FROM (
+            SELECT ticker FROM new_rows WHERE filing_type = '10-K'
+            UNION
+            SELECT ticker FROM old_rows WHERE filing_type = '10-K'
+        ) t;
+    ELSE
+        SELECT array_agg(DISTINCT ticker) INTO touched
+        FROM old_rows WHERE filing_type = '10-K';
+    END IF;
+
+    IF touched IS NOT NULL THEN
+        PERFORM thesis_data.refresh_fundamentals(touched);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_filings_sync_fundamentals_ins
+    AFTER INSERT ON thesis_data.edgar_filings
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.sync_fundamentals();
+
+CREATE TRIGGER trg_filings_sync_fundamentals_upd
+    AFTER UPDATE ON thesis_data.edgar_filings
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.sync_fundamentals();
+
+CREATE TRIGGER trg_filings_sync_fundamentals_del
+    AFTER DELETE ON thesis_data.edgar_filings
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.sync_fundamentals();
+
+-- =============================================================================
+-- CHANGE NOTIFICATIONS
+-- Each write statement sends one NOTIFY on channel 'thesis_data_changes' with
+-- {"table", "op", "keys"} (keys = distinct tickers / indicator names touched).
+-- API workers LISTEN on it to invalidate their in-process caches. Payloads are
+-- capped at 8000 bytes, so very large statements send "keys": null, which
+-- means "anything in this table may have changed".
+-- =============================================================================
+CREATE FUNCTION thesis_data.notify_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    key_column TEXT := TG_ARGV[0];
+    changed TEXT[];
+    payload TEXT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        EXECUTE format('SELECT array_agg(DISTINCT %I::TEXT) FROM new_rows', key_column)
+        INTO changed;
+    ELSIF TG_OP = 'UPDATE' THEN
+        EXECUTE format(
+            'SELECT array_agg(k) FROM (SELECT %1$I::TEXT AS k FROM new_rows'
+            ' UNION SELECT %1$I::TEXT FROM old_rows) t',
+            key_column
+        ) INTO changed;
+    ELSE
+        EXECUTE format('SELECT array_agg(DISTINCT %I::TEXT) FROM old_rows', key_column)
+        INTO changed;
+    END IF;
+
+    IF changed IS NULL THEN
+        RETURN NULL;  -- Statement touched no rows
+    END IF;
+
+    payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'keys', changed)::TEXT;
+    IF octet_length(payload) > 7900 THEN
+        payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'keys', NULL)::TEXT;
+    END IF;
+    PERFORM pg_notify('thesis_data_changes', payload);
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_filings_notify_ins
+    AFTER INSERT ON thesis_data.edgar_filings
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('ticker');
+
+CREATE TRIGGER trg_filings_notify_upd
+    AFTER UPDATE ON thesis_data.edgar_filings
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('ticker');
+
+CREATE TRIGGER trg_filings_notify_del
+    AFTER DELETE ON thesis_data.edgar_filings
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('ticker');
+
+CREATE TRIGGER trg_prices_notify_ins
+    AFTER INSERT ON thesis_data.prices
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('ticker');
+
+CREATE TRIGGER trg_prices_notify_upd
+    AFTER UPDATE ON thesis_data.prices
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('ticker');
+
+CREATE TRIGGER trg_prices_notify_del
+    AFTER DELETE ON thesis_data.prices
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('ticker');
+
+CREATE TRIGGER trg_news_notify_ins
+    AFTER INSERT ON thesis_data.stock_news
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('ticker');
+
+CREATE TRIGGER trg_news_notify_upd
+    AFTER UPDATE ON thesis_data.stock_news
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('ticker');
+
+CREATE TRIGGER trg_news_notify_del
+    AFTER DELETE ON thesis_data.stock_news
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('ticker');
+
+CREATE TRIGGER trg_macro_notify_ins
+    AFTER INSERT ON thesis_data.macro_indicators
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('indicator_name');
+
+CREATE TRIGGER trg_macro_notify_upd
+    AFTER UPDATE ON thesis_data.macro_indicators
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('indicator_name');
+
+CREATE TRIGGER trg_macro_notify_del
+    AFTER DELETE ON thesis_data.macro_indicators
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION thesis_data.notify_change('indicator_name');
+
 -- =============================================================================
 -- HELPER COMMENTS
 -- =============================================================================
@@ -147,4 +402,5 @@ COMMENT ON TABLE thesis_data.stock_news IS 'Company news with sentiment analysis
 COMMENT ON TABLE thesis_data.edgar_filings IS 'SEC filings metadata from EDGAR';
 COMMENT ON TABLE thesis_data.edgar_filing_chunks IS 'Filing text chunks for LLM processing';
 COMMENT ON TABLE thesis_data.macro_indicators IS 'Economic indicators from FRED';
-COMMENT ON VIEW thesis_data.fundamentals IS 'Derived fundamental metrics from latest 10-K filings';
\ No newline at end of file
+COMMENT ON VIEW thesis_data.fundamentals IS 'Derived fundamental metrics from latest 10-K filings';
+COMMENT ON TABLE thesis_data.fundamentals_materialized IS 'Stored copy of the fundamentals view, one row per ticker, trigger-maintained';
\ No newline at end of file
@@ -214,8 +214,7 @@ through dividends and buybacks. Strong liquidity position with $1.4 trillion in
 
         # Insert chunked content
         chunks = chunk_text(data["content"])
-        for idx, chunk in enumerate(chunks):
-            await db.add_filing_chunk(filing_id, idx, chunk)
+        await db.add_filing_chunks_bulk(filing_id, chunks)
 
         print(f"  ✓ Added 10-K for {data['ticker']} ({len(chunks)} chunks)")
 
@@ -231,15 +230,14 @@ async def seed_prices(db: Database):
 
     for ticker, base_price in base_prices.items():
         price = base_price
-        count = 0
+        rows = []
 
         for i in range(90):
             date = datetime.now() - timedelta(days=90 - i)
             change = random.uniform(-0.03, 0.035)
             price *= 1 + change
 
-            await db.add_price(
-                ticker,
+            rows.append(
                 {
                     "date": date.date(),
                     "open": round(price * 0.99, 2),
@@ -248,11 +246,11 @@ async def seed_prices(db: Database):
                     "close": round(price, 2),
                     "volume": random.randint(50000000, 150000000),
                     "source": "mock",
-                },
+                }
             )
-            count += 1
 
-        print(f"  ✓ Added {count} price records for {ticker}")
+        result = await db.add_prices_bulk(ticker, rows)
+        print(f"  ✓ Added {result.rows} price records for {ticker}")
 
 
 # =============================================================================
@@ -335,12 +333,12 @@ async def seed_news(db: Database):
 
     base_date = datetime.now()
     for ticker, articles in news_data.items():
+        rows = []
         for i, article in enumerate(articles):
             article_id = f"{ticker}-{base_date.strftime('%Y%m%d')}-{uuid.uuid4().hex[:8]}"
             published_at = base_date - timedelta(days=i * 2, hours=random.randint(0, 12))
 
-            await db.add_news(
-                ticker,
+            rows.append(
                 {
                     "article_id": article_id,
                     "headline": article["headline"],
@@ -355,9 +353,10 @@ async def seed_news(db: Database):
                     "has_acquisition_keyword": "acquisition" in article["headline"].lower()
                     or "buyback" in article["headline"].lower(),
                     "has_regulatory_keyword": False,
-                },
+                }
             )
 
+        await db.add_news_bulk(ticker, rows)
         print(f"  ✓ Added {len(articles)} news items for {ticker}")
 
 
@@ -415,7 +414,7 @@ async def seed_macro_indicators(db: Database):
 
     for ind in indicators:
         value = ind["base"]
-        count = 0
+        rows = []
 
         # Generate 12 months of data (monthly for most, could be daily for rates)
         for i in range(365):
@@ -429,7 +428,7 @@ async def seed_macro_indicators(db: Database):
             change = random.uniform(-ind["volatility"], ind["volatility"])
             value *= 1 + change
 
-            await db.add_macro_indicator(
+            rows.append(
                 {
                     "indicator_name": ind["name"],
                     "series_id": ind["series_id"],
@@ -441,9 +440,9 @@ async def seed_macro_indicators(db: Database):
                     "quarter": (date.month - 1) // 3 + 1,
                 }
             )
-            count += 1
 
-        print(f"  ✓ Added {count} records for {ind['name']}")
+        result = await db.add_macro_indicators_bulk(rows)
+        print(f"  ✓ Added {result.rows} records for {ind['name']}")
 
 
 # =============================================================================
@@ -178,6 +178,7 @@ def verify_schema():
         expected = [
             "edgar_filing_chunks",
             "edgar_filings",
+            "fundamentals_materialized",
             "macro_indicators",
             "prices",
             "stock_news",
@@ -150,6 +150,73 @@ class TestDatabase:
         data = await test_db.get_fundamentals("NONEXISTENT")
         assert data is None
 
+    @pytest.mark.asyncio
+    async def test_materialized_fundamentals_match_view(self, test_db):
+        """Test trigger-maintained fundamentals agree with the source view."""
+        assert await test_db.refresh_fundamentals() == 0  # Triggers kept it current
+
+        async with test_db.acquire() as conn:
+            drift = await conn.fetch(
+                """
+                SELECT ticker, pe_ratio, roe, market_cap
+                FROM thesis_data.fundamentals_materialized
+                EXCEPT
+                SELECT ticker, pe_ratio, roe, market_cap FROM thesis_data.fundamentals
+                """
+            )
+        assert drift == []
+
+        async with test_db.acquire() as conn:
+            view_tickers = await conn.fetchval(
+                "SELECT COUNT(DISTINCT ticker) FROM thesis_data.fundamentals"
+            )
+            stored = await conn.fetchval(
+                "SELECT COUNT(*) FROM thesis_data.fundamentals_materialized"
+            )
+        assert stored == view_tickers
+
+    @pytest.mark.asyncio
+    async def test_get_fundamentals_many(self, test_db):
+        """Test multi-ticker fundamentals retrieval."""
+        tickers = await test_db.list_tickers()
+
+        data = await test_db.get_fundamentals_many(tickers + ["NONEXISTENT"])
+        assert isinstance(data, dict)
+        assert "NONEXISTENT" not in data
+        for ticker, row in data.items():
+            assert row["ticker"] == ticker
+
+    @pytest.mark.asyncio
+    async def test_get_prices_and_news_many(self, test_db):
+        """Test multi-ticker prices/news match the single-ticker methods."""
+        tickers = (await test_db.list_tickers())[:2]
+
+        prices = await test_db.get_prices_many(tickers + ["NONEXISTENT"], days=5)
+        news = await test_db.get_news_many(tickers, limit=2)
+        assert prices["NONEXISTENT"] == []
+        for ticker in tickers:
+            assert prices[ticker] == await test_db.get_prices(ticker, days=5)
+            assert news[ticker] == await test_db.get_news(ticker, limit=2)
+
+    @pytest.mark.asyncio
+    async def test_get_price_matrix(self, test_db):
+        """Test columnar price loader aligns dates and uses float64/int64."""
+        import numpy as np
+
+        tickers = (await test_db.list_tickers())[:2] + ["NONEXISTENT"]
+        matrix = await test_db.get_price_matrix(tickers)
+
+        assert matrix.tickers == tickers
+        assert matrix.close.shape == (len(matrix.dates), len(tickers))
+        assert matrix.close.dtype == np.float64
+        assert matrix.volume.dtype == np.int64
+        assert np.all(np.diff(matrix.dates.astype(np.int64)) > 0)
+        assert np.isnan(matrix.close[:, matrix.column("NONEXISTENT")]).all()
+
+        latest = (await test_db.get_prices(tickers[0], days=1))[0]
+        row = np.searchsorted(matrix.dates, np.datetime64(latest["date"]))
+        assert matrix.close[row, 0] == pytest.approx(float(latest["close"]))
+
     @pytest.mark.asyncio
     async def test_get_prices(self, test_db):
         """Test price history retrieval."""
@@ -177,6 +244,137 @@ class TestDatabase:
             filing = await test_db.get_filing(tickers[0])
             assert filing is None or isinstance(filing, str)
 
+    @pytest.mark.asyncio
+    async def test_iter_filing_chunks(self, test_db):
+        """Test streamed filing chunks concatenate to get_filing()."""
+        tickers = await test_db.list_tickers()
+        if tickers:
+            filing = await test_db.get_filing(tickers[0])
+            chunks = [c async for c in test_db.iter_filing_chunks(tickers[0], batch_size=2)]
+            assert "".join(chunks) == (filing or "")
+
+        assert [c async for c in test_db.iter_filing_chunks("NONEXISTENT")] == []
+
+    @pytest.mark.asyncio
+    async def test_numeric_as_float(self):
+        """Test opt-in NUMERIC -> float codec (reads and bulk writes)."""
+        from datetime import date
+
+        connection_string = Config.get_test_database_url()
+        config = DatabaseConfig(connection_string=connection_string, numeric_as_float=True)
+        db = Database(connection_string, config)
+        await db.connect()
+        try:
+            tickers = await db.list_tickers()
+            if tickers:
+                prices = await db.get_prices(tickers[0], days=1)
+                assert all(isinstance(p["close"], float) for p in prices)
+
+            row = {
+                "date": date(2020, 1, 2),
+                "open": 1,
+                "high": 2,
+                "low": 1,
+                "close": 1.25,
+                "volume": 1,
+            }
+            await db.add_prices_bulk("FLOATTEST", [row])
+            assert (await db.get_prices("FLOATTEST"))[0]["close"] == 1.25
+        finally:
+            async with db.acquire() as conn:
+                await conn.execute("DELETE FROM thesis_data.prices WHERE ticker = 'FLOATTEST'")
+            await db.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_add_prices_bulk(self, test_db):
+        """Test COPY-based bulk price upsert (last duplicate wins)."""
+        from datetime import date
+
+        rows = [
+            {"date": date(2020, 1, 2), "open": 1, "high": 2, "low": 1, "close": 1.5, "volume": 10},
+            {"date": date(2020, 1, 3), "open": 1, "high": 2, "low": 1, "close": 1.6, "volume": 10},
+            {"date": date(2020, 1, 3), "open": 1, "high": 2, "low": 1, "close": 1.7, "volume": 10},
+        ]
+        try:
+            result = await test_db.add_prices_bulk("BULKTEST", rows)
+            assert result.rows == 3
+            assert result.rows_per_second > 0
+
+            prices = await test_db.get_prices("BULKTEST", days=10)
+            assert len(prices) == 2
+            assert float(prices[0]["close"]) == 1.7
+        finally:
+            async with test_db.acquire() as conn:
+                await conn.execute("DELETE FROM thesis_data.prices WHERE ticker = 'BULKTEST'")
+
+    @pytest.mark.asyncio
+    async def test_fundamentals_cache_invalidated_by_add_filing(self, test_db):
+        """Test cached fundamentals are served until a new filing invalidates them."""
+        import json
+        from datetime import date
+
+        filing = {
+            "filing_id": "CACHETEST-10K-1",
+            "ticker": "CACHETEST",
+            "filing_type": "10-K",
+            "filing_date": date(2020, 1, 1),
+            "financial_data": json.dumps({"pe_ratio": 10}),
+        }
+        try:
+            await test_db.add_filing(filing)
+            first = await test_db.get_fundamentals("CACHETEST")
+            first["pe_ratio"] = -1  # Mutating a result must not touch the cache
+            assert float((await test_db.get_fundamentals("CACHETEST"))["pe_ratio"]) == 10
+            assert test_db.cache.stats.hits >= 1
+
+            await test_db.add_filing({**filing, "financial_data": json.dumps({"pe_ratio": 12})})
+            assert float((await test_db.get_fundamentals("CACHETEST"))["pe_ratio"]) == 12
+        finally:
+            async with test_db.acquire() as conn:
+                await conn.execute(
+                    "DELETE FROM thesis_data.edgar_filings WHERE ticker = 'CACHETEST'"
+                )
+            await test_db.invalidate_cache()
+
+    @pytest.mark.asyncio
+    async def test_change_notifications_invalidate_other_instances(self, test_db):
+        """Test a write from another connection invalidates this instance's cache."""
+        import asyncio
+        import json
+        from datetime import date
+
+        assert test_db.is_listening
+        changes = []
+        test_db.add_change_listener(lambda table, op, keys: changes.append((table, op, keys)))
+
+        other = Database(Config.get_test_database_url())
+        await other.connect()
+        try:
+            await test_db.get_fundamentals("NOTIFYTEST")  # Caches the miss (None)
+            await other.add_filing(
+                {
+                    "filing_id": "NOTIFYTEST-10K-1",
+                    "ticker": "NOTIFYTEST",
+                    "filing_type": "10-K",
+                    "filing_date": date(2020, 1, 1),
+                    "financial_data": json.dumps({"pe_ratio": 7}),
+                }
+            )
+            for _ in range(100):
+                if ("edgar_filings", "INSERT", ["NOTIFYTEST"]) in changes:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert ("edgar_filings", "INSERT", ["NOTIFYTEST"]) in changes
+            data = await test_db.get_fundamentals("NOTIFYTEST")
+            assert data is not None and float(data["pe_ratio"]) == 7
+        finally:
+            async with other.acquire() as conn:
+                await conn.execute(
+                    "DELETE FROM thesis_data.edgar_filings WHERE ticker = 'NOTIFYTEST'"
+                )
+            await other.disconnect()
+
     @pytest.mark.asyncio
     async def test_transaction_support(self, test_db):
         """Test transaction context manager."""
@@ -186,6 +384,914 @@ class TestDatabase:
             assert result == 1
 
 
+class _CountingTickerSource:
+    """Stand-in for Database.list_tickers that counts queries."""
+
+    def __init__(self, tickers):
+        self.tickers = tickers
+        self.calls = 0
+
+    async def list_tickers(self):
+        self.calls += 1
+        return list(self.tickers)
+
+
+class TestTickerIndex:
+    """Test in-process ticker index."""
+
+    @pytest.mark.asyncio
+    async def test_lookups_do_not_query(self):
+        """Existence checks are served from the loaded snapshot."""
+        from agent_framework import TickerIndex
+
+        source = _CountingTickerSource(["AAPL", "MSFT"])
+        index = TickerIndex(source, ttl=0)
+        await index.load()
+
+        assert await index.exists("AAPL")
+        assert not await index.exists("NONEXISTENT")
+        assert await index.list_tickers() == ["AAPL", "MSFT"]
+        assert len(index) == 2
+        assert source.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_lazy_load_and_invalidate(self):
+        """Index loads on first use and reloads after invalidate()."""
+        from agent_framework import TickerIndex
+
+        source = _CountingTickerSource(["AAPL"])
+        index = TickerIndex(source, ttl=0)
+        assert await index.exists("AAPL")
+        assert source.calls == 1
+
+        source.tickers.append("TSLA")
+        index.invalidate()
+        assert index.is_stale
+        assert await index.exists("TSLA")  # Waits for the reload
+        assert source.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_during_refresh_is_not_lost(self):
+        """A change that arrives while the ticker query runs forces another reload."""
+        import asyncio
+
+        from agent_framework import TickerIndex
+
+        class SlowSource(_CountingTickerSource):
+            def __init__(self, tickers):
+                super().__init__(tickers)
+                self.started = asyncio.Event()
+                self.release = asyncio.Event()
+
+            async def list_tickers(self):
+                snapshot = await super().list_tickers()
+                self.started.set()
+                await self.release.wait()
+                return snapshot
+
+        source = SlowSource(["AAPL"])
+        index = TickerIndex(source, ttl=0)
+        loading = asyncio.create_task(index.load())
+        await source.started.wait()
+        source.tickers.append("TSLA")  # Committed after the query read the table
+        index.handle_change("edgar_filings", "INSERT", ["TSLA"])
+        source.release.set()
+        await loading
+
+        assert "TSLA" not in index
+        assert await index.exists("TSLA")
+        assert source.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_invalidation(self):
+        """If the reload fails, the old snapshot is served and the next lookup retries."""
+        from agent_framework import DatabaseError, TickerIndex
+
+        source = _CountingTickerSource(["AAPL"])
+        index = TickerIndex(source, ttl=0)
+        await index.load()
+
+        async def failing():
+            raise DatabaseError("down")
+
+        source.list_tickers = failing
+        index.invalidate()
+        assert await index.exists("AAPL")
+        assert index.is_stale
+
+        del source.list_tickers
+        source.tickers.append("TSLA")
+        assert await index.exists("TSLA")
+
+    def test_handle_change(self):
+        """Only filing changes that can alter the ticker list invalidate the index."""
+        from agent_framework import TickerIndex
+
+        index = TickerIndex(_CountingTickerSource([]), ttl=0)
+        index._tickers = frozenset(["AAPL"])
+        index._loaded_at = 0.0
+
+        index.handle_change("prices", "INSERT", ["TSLA"])
+        index.handle_change("edgar_filings", "INSERT", ["AAPL"])
+        assert not index.is_stale
+
+        index.handle_change("edgar_filings", "INSERT", ["TSLA"])
+        assert index.is_stale
+
+
+class TestLRUCache:
+    """Test the read-through query cache."""
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_lru_eviction(self):
+        """Entries expire after their TTL and the least recently used is evicted."""
+        from agent_framework import LRUCache
+
+        now = [0.0]
+        cache = LRUCache(max_entries=2, clock=lambda: now[0])
+
+        async def load():
+            return "value"
+
+        await cache.get_or_load(("a",), load, ttl=10)
+        await cache.get_or_load(("b",), load, ttl=10)
+        await cache.get_or_load(("a",), load, ttl=10)  # Hit; "b" is now oldest
+        await cache.get_or_load(("c",), load, ttl=10)
+        assert await cache.get(("b",)) is LRUCache.MISSING
+        assert cache.stats.hits == 1 and cache.stats.evictions == 1
+
+        now[0] = 11.0
+        assert await cache.get(("a",)) is LRUCache.MISSING
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self):
+        """Concurrent misses on one key share a single load; failures are not cached."""
+        import asyncio
+
+        from agent_framework import LRUCache
+
+        cache = LRUCache()
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*[cache.get_or_load(("k",), load, 60) for _ in range(10)])
+        assert results == [1] * 10
+        assert calls == 1
+
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await cache.get_or_load(("bad",), fail, 60)
+        assert await cache.get(("bad",)) is LRUCache.MISSING
+
+    @pytest.mark.asyncio
+    async def test_invalidate_prefix(self):
+        """invalidate() drops keys by prefix."""
+        from agent_framework import LRUCache
+
+        cache = LRUCache()
+        for key in [("get_fundamentals", "AAPL"), ("get_fundamentals", "MSFT"), ("other",)]:
+            await cache.set(key, 1, ttl=60)
+
+        assert await cache.invalidate("get_fundamentals", "AAPL") == 1
+        assert await cache.invalidate("get_fundamentals") == 1
+        assert len(cache) == 1
+
+
+class TestSQLiteCache:
+    """Test the on-disk cache backend."""
+
+    @pytest.mark.asyncio
+    async def test_ttl_lru_and_persistence(self, tmp_path):
+        """Entries expire, the least recently used is evicted, and data survives reopening."""
+        from agent_framework import SQLiteCache
+
+        path = str(tmp_path / "cache.sqlite3")
+        now = [0.0]
+        cache = SQLiteCache(path, max_entries=2, clock=lambda: now[0])
+
+        await cache.set(("a",), {"text": "A"}, ttl=10)
+        now[0] = 1.0
+        await cache.set(("b",), "B", ttl=10)
+        now[0] = 2.0
+        assert await cache.get(("a",)) == {"text": "A"}  # "b" is now oldest
+        await cache.set(("c",), "C", ttl=10)
+        assert await cache.get(("b",)) is SQLiteCache.MISSING
+        assert cache.stats.evictions == 1
+        cache.close()
+
+        reopened = SQLiteCache(path, clock=lambda: now[0])
+        assert await reopened.get(("c",)) == "C"
+        now[0] = 20.0
+        assert await reopened.get(("c",)) is SQLiteCache.MISSING
+        reopened.close()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_prefix(self, tmp_path):
+        """invalidate() drops keys by prefix without touching look-alike keys."""
+        from agent_framework import SQLiteCache
+
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+        for key in [("llm_chat", "x"), ("llm_chat", "y"), ("llm_chat_old", "x"), ("llm_chat",)]:
+            await cache.set(key, 1, ttl=60)
+
+        assert await cache.invalidate("llm_chat", "x") == 1
+        assert await cache.invalidate("llm_chat") == 2
+        assert len(cache) == 1
+        cache.close()
+
+
+class TestLLMResponseCache:
+    """Test LLMClient response caching."""
+
+    class _CountingProvider:
+        """Replaces the provider call so no LLM is needed."""
+
+        calls = 0
+
+        async def __call__(self, message, context):
+            self.calls += 1
+            return f"answer {self.calls}"
+
+    @pytest.mark.asyncio
+    async def test_chat_reuses_identical_prompts(self):
+        """Identical prompts hit the cache; other settings, prompts or fresh=True do not."""
+        from agent_framework import LLMClient, LRUCache
+
+        cache = LRUCache()
+        provider = self._CountingProvider()
+
+        def client(**overrides):
+            llm = LLMClient(LLMConfig(provider="openai", model="gpt-4", **overrides), cache=cache)
+            llm._generate = provider
+            return llm
+
+        assert await client().chat("Analyze AAPL") == "answer 1"
+        assert await client().chat("Analyze AAPL") == "answer 1"
+        assert await client(temperature=0.1).chat("Analyze AAPL") == "answer 2"
+        assert await client().chat("Analyze AAPL", context="10-K") == "answer 3"
+        assert await client().chat("Analyze AAPL", fresh=True) == "answer 4"
+        assert provider.calls == 4
+        assert cache.stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_calls_are_coalesced(self):
+        """A burst of identical calls makes one provider call; fresh=True opts out."""
+        import asyncio
+
+        from agent_framework import LLMClient
+        from agent_framework.llm import call_stats
+
+        class SlowProvider(self._CountingProvider):
+            async def __call__(self, message, context):
+                await asyncio.sleep(0.01)
+                return await super().__call__(message, context)
+
+        provider = SlowProvider()
+        llm = LLMClient(LLMConfig(provider="openai", use_cache=False))
+        llm._generate = provider
+        coalesced = call_stats.coalesced
+
+        results = await asyncio.gather(*[llm.chat("Analyze AAPL") for _ in range(10)])
+        assert results == ["answer 1"] * 10
+        assert provider.calls == 1
+        assert call_stats.coalesced - coalesced == 9
+
+        await asyncio.gather(*[llm.chat("Analyze AAPL", fresh=True) for _ in range(2)])
+        assert provider.calls == 3
+
+    def test_cache_is_opt_in(self):
+        """No cache unless use_cache is set."""
+        from agent_framework import LLMClient
+
+        assert LLMClient(LLMConfig(provider="openai", use_cache=False)).cache is None
+
+
+class TestRateLimiter:
+    """Test client-side LLM rate limiting and retry timing."""
+
+    def test_token_bucket(self):
+        """Budget refills continuously; oversized requests wait for a full bucket."""
+        from agent_framework.resilience import TokenBucket
+
+        now = [0.0]
+        bucket = TokenBucket(per_minute=60, clock=lambda: now[0])  # 1 per second
+
+        assert bucket.wait_time(60) == 0
+        bucket.take(60)
+        assert bucket.wait_time(1) == pytest.approx(1.0)
+        now[0] = 30.0
+        assert bucket.wait_time(30) == 0
+        assert bucket.wait_time(1000) == pytest.approx(30.0)
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency(self):
+        """No more than max_concurrency calls run at once; the rest wait."""
+        import asyncio
+
+        from agent_framework.resilience import RateLimiter
+
+        limiter = RateLimiter(max_concurrency=2)
+        running = peak = 0
+
+        async def call():
+            nonlocal running, peak
+            async with limiter.acquire():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*[call() for _ in range(5)])
+        assert peak == 2
+        assert limiter.throttled == 3
+        assert limiter.in_flight == 0 and limiter.waiting == 0
+
+    def test_retry_after(self):
+        """Retry-After (seconds or retry-after-ms) drives the retry delay."""
+        from types import SimpleNamespace
+
+        from agent_framework.resilience import is_rate_limit, retry_after, retry_delay
+
+        def error(status, headers):
+            return SimpleNamespace(status_code=status, response=SimpleNamespace(headers=headers))
+
+        assert retry_after(error(429, {"retry-after": "3"})) == 3.0
+        assert retry_after(error(429, {"retry-after-ms": "250"})) == 0.25
+        assert retry_after(error(500, {})) is None
+        assert is_rate_limit(error(429, {}))
+
+        assert 3.0 <= retry_delay(error(429, {"retry-after": "3"}), attempt=0) <= 3.75
+        assert 2.0 <= retry_delay(error(429, {}), attempt=0) <= 4.0
+        assert 0.5 <= retry_delay(ValueError("boom"), attempt=0) <= 1.0
+
+
+class TestCircuitBreaker:
+    """Test provider circuit breakers and fallback chains."""
+
+    def test_open_probe_and_close(self):
+        """Opens after N failures, lets one probe through after the timeout, closes on success."""
+        from agent_framework.resilience import CircuitBreaker
+
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+
+        now[0] = 10.0
+        assert breaker.allow()  # Probe
+        assert not breaker.allow()  # Only one per timeout
+        breaker.record_failure()
+        assert breaker.state == "open" and breaker.retry_in() == 10.0
+
+        now[0] = 20.0
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.allow()
+
+    @pytest.mark.asyncio
+    async def test_fallback_skips_provider_with_open_breaker(self):
+        """Failures move to the fallback; once the breaker opens the primary isn't tried."""
+        from agent_framework import LLMClient
+
+        config = LLMConfig(
+            provider="openai",
+            base_url="http://primary.test",
+            max_retries=1,
+            use_cache=False,
+            fallbacks=[LLMConfig(provider="anthropic", base_url="http://fallback.test")],
+        )
+        llm = LLMClient(config)
+        primary_calls = 0
+
+        async def no_client():
+            return None
+
+        async def down(client, messages):
+            nonlocal primary_calls
+            primary_calls += 1
+            raise ConnectionError("connection refused")
+
+        async def up(client, messages):
+            return "fallback answer"
+
+        llm._get_client = llm.fallbacks[0]._get_client = no_client
+        llm._chat_openai = down
+        llm.fallbacks[0]._chat_anthropic = up
+
+        threshold = Config.get_llm_breaker_failure_threshold()
+        for i in range(threshold + 3):
+            assert await llm.chat(f"Analyze {i}") == "fallback answer"
+        assert primary_calls == threshold
+        assert llm._get_breaker().state == "open"
+
+    def test_only_outages_count_as_provider_failures(self):
+        """5xx, timeouts and transport errors trip the breaker; 4xx and parse errors don't."""
+        from types import SimpleNamespace
+
+        from agent_framework.resilience import is_client_error, is_provider_failure
+
+        class APITimeoutError(Exception):  # Named like the openai/anthropic SDK error
+            pass
+
+        def http(status):
+            return SimpleNamespace(status_code=status)
+
+        for error in (http(500), http(503), http(408), TimeoutError(), APITimeoutError()):
+            assert is_provider_failure(error) and not is_client_error(error)
+        for error in (http(400), http(401), http(404)):
+            assert is_client_error(error) and not is_provider_failure(error)
+        for error in (http(429), KeyError("choices"), ValueError("bad JSON")):
+            assert not is_client_error(error) and not is_provider_failure(error)
+
+    @pytest.mark.asyncio
+    async def test_rejected_request_is_not_retried_or_counted(self):
+        """A 401 (e.g. bad API key) raises at once and leaves the breaker closed."""
+        from agent_framework import APIError, LLMClient
+
+        class AuthenticationError(Exception):
+            status_code = 401
+
+        llm = LLMClient(
+            LLMConfig(
+                provider="openai",
+                base_url="http://bad-key.test",
+                max_retries=3,
+                use_cache=False,
+            )
+        )
+        calls = 0
+
+        async def no_client():
+            return None
+
+        async def rejected(client, messages):
+            nonlocal calls
+            calls += 1
+            raise AuthenticationError("invalid api key")
+
+        llm._get_client = no_client
+        llm._chat_openai = rejected
+
+        threshold = Config.get_llm_breaker_failure_threshold()
+        for i in range(threshold + 2):
+            with pytest.raises(APIError, match="rejected the request"):
+                await llm.chat(f"Analyze {i}")
+        assert calls == threshold + 2  # One attempt per call
+        assert llm._get_breaker().state == "closed"
+        assert llm._get_breaker().failures == 0
+
+
+class TestHedging:
+    """Test hedged LLM requests."""
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged_and_loser_cancelled(self):
+        """A call slower than the latency percentile races a hedge; the first answer wins."""
+        import asyncio
+
+        from agent_framework import LLMClient
+        from agent_framework.llm import call_stats, llm_latency
+
+        llm = LLMClient(
+            LLMConfig(
+                provider="openai",
+                model="hedge-test",
+                base_url="http://hedge.test",
+                hedge_percentile=95,
+                use_cache=False,
+            )
+        )
+        for _ in range(Config.get_llm_hedge_min_samples()):
+            llm_latency.record("openai/hedge-test", 0.01)
+        assert llm.hedge_delay() == pytest.approx(0.01)
+
+        calls = []
+
+        async def no_client():
+            return None
+
+        async def provider(client, messages):
+            calls.append(asyncio.current_task())
+            if len(calls) == 1:
+                await asyncio.sleep(5)  # Stuck request
+                return "slow answer"
+            return "fast answer"
+
+        llm._get_client = no_client
+        llm._chat_openai = provider
+        hedged, wins = call_stats.hedged, call_stats.hedge_wins
+
+        assert await asyncio.wait_for(llm.chat("Analyze AAPL"), timeout=1) == "fast answer"
+        await asyncio.sleep(0)
+        assert calls[0].cancelled()
+        assert (call_stats.hedged - hedged, call_stats.hedge_wins - wins) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_hedge_delay_does_not_drift_down(self):
+        """Cancelled slow calls still count, so repeated hedging keeps the percentile."""
+        import asyncio
+
+        from agent_framework import LLMClient
+        from agent_framework.llm import call_stats, llm_latency
+
+        fast, slow = 0.002, 0.05
+        llm = LLMClient(
+            LLMConfig(
+                provider="openai",
+                model="hedge-drift-test",
+                base_url="http://hedge-drift.test",
+                hedge_percentile=90,
+                use_cache=False,
+            )
+        )
+        # One call in five is slow, so the true p90 is the slow latency
+        for i in range(Config.get_llm_hedge_min_samples()):
+            llm_latency.record("openai/hedge-drift-test", slow if i % 5 == 0 else fast)
+        initial = llm.hedge_delay()
+        assert initial == pytest.approx(slow)
+
+        seen = set()
+
+        async def no_client():
+            return None
+
+        async def provider(client, messages):
+            prompt = messages[-1]["content"]
+            is_hedge = prompt in seen
+            seen.add(prompt)
+            index = int(prompt.split()[-1])
+            await asyncio.sleep(4 * slow if index % 5 == 0 and not is_hedge else fast)
+            return "answer"
+
+        llm._get_client = no_client
+        llm._chat_openai = provider
+        hedged = call_stats.hedged
+
+        for i in range(50):
+            assert await llm.chat(f"Analyze {i}") == "answer"
+
+        assert call_stats.hedged - hedged == 10  # Only the slow calls, every time
+        assert llm.hedge_delay() >= 0.9 * initial
+
+
+class TestSharedClients:
+    """Test the shared SDK client registry."""
+
+    @pytest.mark.asyncio
+    async def test_agents_share_one_sdk_client_per_endpoint(self):
+        """Per-agent model, temperature, persona and timeout don't create new clients."""
+        pytest.importorskip("openai")
+        from agent_framework import LLMClient, aclose_llm_clients
+        from agent_framework.llm import llm_client_stats
+
+        llms = [
+            LLMClient(
+                LLMConfig(
+                    provider="openai",
+                    model=f"model-{i % 3}",
+                    api_key="test",
+                    base_url="http://registry.test/v1",
+                    temperature=0.1 * i,
+                    system_prompt=f"Persona {i}",
+                    timeout=10 + i,
+                )
+            )
+            for i in range(20)
+        ]
+        other_key = LLMClient(
+            LLMConfig(provider="openai", api_key="other", base_url="http://registry.test/v1")
+        )
+
+        clients = {id(await llm._get_client()) for llm in llms}
+        assert len(clients) == 1
+        assert id(await other_key._get_client()) not in clients
+        assert llm_client_stats()["openai"] == {"clients": 2, "connections": 0, "idle": 0}
+
+        await aclose_llm_clients()
+        assert llm_client_stats() == {}
+
+
+class TestAsyncSDKClients:
+    """Test that LLM calls await the SDKs' native async clients."""
+
+    @staticmethod
+    def _fake_sdk(constructed, calls):
+        """SDK module stand-in whose clients record their kwargs and calling thread."""
+        import threading
+        from types import SimpleNamespace
+
+        async def create(**kwargs):
+            calls.append(threading.get_ident())
+            usage = SimpleNamespace(
+                prompt_tokens=3, completion_tokens=2, input_tokens=3, output_tokens=2
+            )
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content="openai"))],
+                content=[SimpleNamespace(text="anthropic")],
+                usage=usage,
+            )
+
+        async def ollama_chat(**kwargs):
+            calls.append(threading.get_ident())
+            return {"message": {"content": "ollama"}}
+
+        async def close():
+            pass
+
+        def client(name):
+            def construct(**kwargs):
+                constructed.append((name, kwargs))
+                return SimpleNamespace(
+                    chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+                    messages=SimpleNamespace(create=create),
+                    close=close,
+                )
+
+            return construct
+
+        def ollama_client(**kwargs):
+            constructed.append(("AsyncClient", kwargs))
+            return SimpleNamespace(chat=ollama_chat, close=close)
+
+        return SimpleNamespace(
+            AsyncOpenAI=client("AsyncOpenAI"),
+            AsyncAnthropic=client("AsyncAnthropic"),
+            AsyncClient=ollama_client,
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "provider, constructor, answer",
+        [
+            ("openai", "AsyncOpenAI", "openai"),
+            ("anthropic", "AsyncAnthropic", "anthropic"),
+            ("ollama", "AsyncClient", "ollama"),
+        ],
+    )
+    async def test_chat_awaits_async_client_on_loop_thread(
+        self, monkeypatch, provider, constructor, answer
+    ):
+        """The async SDK client is built with the timeout and called without to_thread."""
+        import threading
+
+        import agent_framework.llm as llm_module
+        from agent_framework import LLMClient, aclose_llm_clients
+
+        constructed, calls = [], []
+        sdk = self._fake_sdk(constructed, calls)
+        monkeypatch.setattr(LLMClient, "_import_sdk", lambda self: sdk)
+        llm = LLMClient(
+            LLMConfig(
+                provider=provider,
+                model="test-model",
+                api_key="test",
+                base_url="http://async-sdk.test",
+                timeout=17,
+                max_retries=1,
+            )
+        )
+        await llm._get_client()  # The SDK import itself may use a thread
+
+        async def no_threads(*args, **kwargs):
+            raise AssertionError("LLM call went through asyncio.to_thread")
+
+        monkeypatch.setattr(llm_module.asyncio, "to_thread", no_threads)
+        try:
+            assert await llm.chat("Analyze AAPL", fresh=True) == answer
+        finally:
+            await aclose_llm_clients()
+
+        assert [name for name, _ in constructed] == [constructor]
+        assert constructed[0][1]["timeout"] == 17
+        assert calls == [threading.get_ident()]
+
+
+class TestPromptCaching:
+    """Test prompt-prefix caching and token usage reporting."""
+
+    def test_anthropic_prompt_marks_stable_prefix(self):
+        """The persona and context are cache breakpoints; the question is not."""
+        from agent_framework import LLMClient
+
+        config = LLMConfig(provider="anthropic", api_key="test", system_prompt="Persona")
+        llm = LLMClient(config)
+        messages = llm._build_messages("Is AAPL cheap?", context="Long filing")
+        system, prompt = llm._anthropic_prompt(messages)
+
+        assert system == [
+            {"type": "text", "text": "Persona", "cache_control": {"type": "ephemeral"}}
+        ]
+        context, question = prompt[0]["content"]
+        assert context["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in question
+        assert context["text"] + question["text"] == messages[0]["content"]
+
+        plain = LLMClient(config.model_copy(update={"prompt_caching": False}))
+        assert plain._anthropic_prompt(messages) == ("Persona", messages)
+
+    @pytest.mark.asyncio
+    async def test_cached_input_tokens_are_reported(self):
+        """Anthropic cache reads/writes and OpenAI cached_tokens land in token_usage."""
+        from types import SimpleNamespace
+
+        from agent_framework import LLMClient
+        from agent_framework.llm import token_usage_stats
+
+        async def anthropic_create(**kwargs):
+            usage = SimpleNamespace(
+                input_tokens=10,
+                output_tokens=5,
+                cache_read_input_tokens=1200,
+                cache_creation_input_tokens=0,
+            )
+            return SimpleNamespace(usage=usage, content=[SimpleNamespace(text="ok")])
+
+        async def openai_create(**kwargs):
+            usage = SimpleNamespace(
+                prompt_tokens=2000,
+                completion_tokens=7,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=1024),
+            )
+            choice = SimpleNamespace(message=SimpleNamespace(content="ok"))
+            return SimpleNamespace(usage=usage, choices=[choice])
+
+        fake_anthropic = SimpleNamespace(messages=SimpleNamespace(create=anthropic_create))
+        fake_openai = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=openai_create))
+        )
+
+        anthropic = LLMClient(LLMConfig(provider="anthropic", model="usage-test", api_key="t"))
+        openai = LLMClient(LLMConfig(provider="openai", model="usage-test", api_key="t"))
+        assert await anthropic._chat_anthropic(fake_anthropic, [{"role": "user", "content": "q"}])
+        assert await openai._chat_openai(fake_openai, [{"role": "user", "content": "q"}])
+
+        stats = token_usage_stats()
+        assert stats["anthropic/usage-test"]["input_tokens"] == 1210
+        assert stats["anthropic/usage-test"]["cached_input_tokens"] == 1200
+        assert stats["openai/usage-test"]["uncached_input_tokens"] == 976
+        assert stats["openai/usage-test"]["cached_input_ratio"] == 0.512
+
+
+class TestBatchMode:
+    """Test offline batch-API execution."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_batch_job(self, monkeypatch):
+        """Calls in the window go out as one job; each caller gets its own result."""
+        import asyncio
+
+        from agent_framework import LLMClient
+        from agent_framework.llm import batch_stats
+
+        monkeypatch.setenv("LLM_BATCH_WINDOW", "0.01")
+        monkeypatch.setenv("LLM_BATCH_POLL_INTERVAL", "0.01")
+        monkeypatch.setenv("STUB_BATCH_LATENCY", "0.05")
+        llm = LLMClient(LLMConfig(provider="stub", batch=True, use_cache=False))
+        direct = LLMClient(LLMConfig(provider="stub", use_cache=False))
+
+        prompts = [f"Analyze T{i}" for i in range(50)]
+        answers = await asyncio.gather(*(llm.chat(prompt) for prompt in prompts))
+
+        assert answers == [await direct.chat(prompt) for prompt in prompts]
+        stats = batch_stats()["stub"]
+        assert (stats["batches_submitted"], stats["requests_submitted"]) == (1, 50)
+        assert stats["succeeded"] == 50
+
+    @pytest.mark.asyncio
+    async def test_openai_backend_fans_out_results_and_errors(self):
+        """Output and error files are matched back to requests by custom_id."""
+        import asyncio
+        import json
+        from types import SimpleNamespace
+
+        from agent_framework.batch import LLMBatcher, OpenAIBatchBackend
+
+        submitted = []
+        polls = 0
+
+        async def create_file(file, purpose):
+            submitted.extend(json.loads(line) for line in file[1].splitlines())
+            return SimpleNamespace(id="file-in")
+
+        async def file_content(file_id):
+            ok, bad = submitted
+            lines = {
+                "file-out": {
+                    "custom_id": ok["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "choices": [{"message": {"content": "bullish|70|ok"}}],
+                            "usage": {"prompt_tokens": 12, "completion_tokens": 4},
+                        },
+                    },
+                },
+                "file-err": {
+                    "custom_id": bad["custom_id"],
+                    "response": {
+                        "status_code": 400,
+                        "body": {"error": {"message": "bad request"}},
+                    },
+                },
+            }
+            return SimpleNamespace(text=json.dumps(lines[file_id]))
+
+        async def create_batch(**kwargs):
+            assert kwargs["endpoint"] == "/v1/chat/completions"
+            return SimpleNamespace(id="batch-1")
+
+        async def retrieve_batch(batch_id):
+            nonlocal polls
+            polls += 1
+            return SimpleNamespace(
+                status="completed" if polls > 1 else "in_progress",
+                output_file_id="file-out",
+                error_file_id="file-err",
+                errors=None,
+            )
+
+        fake_openai = SimpleNamespace(
+            files=SimpleNamespace(create=create_file, content=file_content),
+            batches=SimpleNamespace(create=create_batch, retrieve=retrieve_batch),
+        )
+
+        batcher = LLMBatcher(
+            OpenAIBatchBackend(fake_openai), max_size=2, window=60, poll_interval=0
+        )
+        ok, bad = await asyncio.gather(
+            batcher.submit({"model": "m", "messages": [{"role": "user", "content": "a"}]}),
+            batcher.submit({"model": "m", "messages": [{"role": "user", "content": "b"}]}),
+        )
+
+        assert polls == 2
+        assert submitted[0]["body"]["messages"][0]["content"] == "a"
+        assert (ok.text, ok.input_tokens, ok.output_tokens) == ("bullish|70|ok", 12, 4)
+        assert bad.error == "bad request"
+        assert batcher.to_dict()["failed"] == 1
+
+
+class TestStubLLM:
+    """Test the in-process stub LLM provider."""
+
+    @pytest.mark.asyncio
+    async def test_chat_is_deterministic_and_parseable(self):
+        """Same prompt, same answer, in the DIRECTION|CONFIDENCE|REASONING format."""
+        from agent_framework import LLMClient, parse_llm_signal
+
+        llm = LLMClient(LLMConfig(provider="stub", system_prompt="Value investor", use_cache=False))
+        first = await llm.chat("Analyze AAPL", fresh=True)
+        assert await llm.chat("Analyze AAPL", fresh=True) == first
+        assert "".join([delta async for delta in llm.stream("Analyze AAPL")]) == first
+        assert await llm.chat("Analyze MSFT", fresh=True) != first
+
+        signal = parse_llm_signal(first)
+        assert signal.direction in ("bullish", "bearish", "neutral")
+        assert 0.5 <= signal.confidence <= 0.95
+        assert signal.reasoning.startswith("Stub analysis")
+
+    @pytest.mark.asyncio
+    async def test_error_injection_and_token_accounting(self):
+        """Injected errors look like provider errors; usage is counted per call."""
+        from agent_framework.resilience import is_rate_limit, retry_after
+        from agent_framework.stub_llm import StubLLM, StubLLMError, parse_latency
+
+        messages = [{"role": "user", "content": "Analyze AAPL"}]
+        with pytest.raises(StubLLMError) as failure:
+            await StubLLM(error_rate=1.0).complete("stub", messages)
+        assert failure.value.status_code == 503
+        assert not is_rate_limit(failure.value)
+
+        with pytest.raises(StubLLMError) as limited:
+            await StubLLM(rate_limit_rate=1.0).complete("stub", messages)
+        assert is_rate_limit(limited.value)
+        assert retry_after(limited.value) == 1
+
+        stub = StubLLM(output_tokens=20, seed=1)
+        response = await stub.complete("stub", messages)
+        assert response.usage.input_tokens == 3
+        assert stub.stats.to_dict()["output_tokens"] == response.usage.output_tokens >= 20
+
+        assert 0.1 <= parse_latency("uniform:0.1,0.2")(StubLLM()._rng) <= 0.2
+        with pytest.raises(ValueError):
+            parse_latency("gaussian:1")
+
+    def test_provider_override(self, monkeypatch):
+        """LLM_PROVIDER_OVERRIDE routes every config to the stub."""
+        monkeypatch.setenv("LLM_PROVIDER_OVERRIDE", "stub")
+        config = LLMConfig(provider="ollama", model="llama3.2", base_url="http://gpu:11434")
+        assert (config.provider, config.model, config.base_url) == ("stub", "stub", None)
+
+
 class TestAgent:
     """Test Agent base class."""
 
@@ -248,6 +1354,74 @@ class TestRAGSystem:
         chunks = rag.chunk_text(text)
         assert len(chunks) > 1
 
+    @pytest.mark.asyncio
+    async def test_stream_chunks_match_chunk_text(self):
+        """Streamed pieces (split mid-word) chunk the same as the joined text."""
+        from agent_framework import RAGSystem
+
+        rag = RAGSystem(RAGConfig(chunk_size=10, chunk_overlap=3))
+        text = " ".join(f"word{i}" for i in range(57))
+
+        async def pieces():
+            for start in range(0, len(text), 7):
+                yield text[start : start + 7]
+
+        streamed = [chunk async for chunk in rag._stream_chunks(pieces())]
+        assert streamed == rag.chunk_text(text)
+
+    def test_search_matches_cosine_ranking(self):
+        """Normalized dot-product + argpartition ranks like full cosine + argsort."""
+        import numpy as np
+
+        from agent_framework import RAGSystem
+
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((500, 16)) * rng.uniform(0.1, 10, (500, 1))
+        rag = RAGSystem(RAGConfig(top_k=5))
+        rag._store([f"chunk {i}" for i in range(500)], vectors)
+        query = rng.standard_normal(16)
+
+        cosine = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+        indices, scores = rag._search(query, 5)
+        assert list(indices) == list(np.argsort(cosine)[::-1][:5])
+        assert np.allclose(scores, cosine[indices], atol=1e-5)
+        assert rag.embeddings.dtype == np.float32
+        assert len(rag._search(query, 1000)[0]) == 500
+
+    def test_store_grows_buffer_without_reallocating_each_add(self):
+        """Repeated adds append into doubling capacity and keep chunk order."""
+        import numpy as np
+
+        from agent_framework import RAGSystem
+
+        rng = np.random.default_rng(1)
+        rag = RAGSystem(RAGConfig())
+        rag._embeddings.initial_capacity = 4
+        vectors = rng.standard_normal((30, 8))
+        capacities = []
+        for start in range(0, 30, 3):
+            chunks = [f"chunk {i} – ünïcode" for i in range(start, start + 3)]
+            rag._store(chunks, vectors[start : start + 3])
+            capacities.append(rag._embeddings.capacity)
+
+        assert sorted(set(capacities)) == [4, 8, 16, 32]
+        assert rag.embeddings.shape == (30, 8)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        assert np.allclose(rag.embeddings, vectors / norms, atol=1e-6)
+        assert len(rag.documents) == 30
+        assert rag.documents[np.int64(29)] == "chunk 29 – ünïcode"
+        assert rag.documents[-30] == "chunk 0 – ünïcode"
+        assert list(rag.documents)[10] == "chunk 10 – ünïcode"
+        with pytest.raises(IndexError):
+            rag.documents[30]
+        with pytest.raises(ValueError):
+            rag._store(["wrong width"], rng.standard_normal((1, 4)))
+        assert len(rag.documents) == 30
+
+        rag.clear()
+        assert len(rag.documents) == 0 and rag.embeddings is None
+        assert rag.get_stats()["embedding_shape"] is None
+
     def test_add_document(self):
         """Test adding documents."""
         from agent_framework import RAGSystem
@@ -309,6 +1483,122 @@ class TestRAGSystem:
         assert stats["num_chunks"] == 0
 
 
+class TestVectorIndex:
+    """Test RAG search indexes (no embedding model needed)."""
+
+    @staticmethod
+    def _clustered(n, rng, clusters=40, dim=16):
+        centers = rng.standard_normal((clusters, dim))
+        return centers[rng.integers(0, clusters, n)] + 0.3 * rng.standard_normal((n, dim))
+
+    def test_default_index_is_exact(self):
+        """RAGConfig picks the index; exact unless configured otherwise."""
+        from agent_framework import ExactIndex, IVFIndex, RAGSystem
+
+        assert isinstance(RAGSystem(RAGConfig()).index, ExactIndex)
+        rag = RAGSystem(RAGConfig(index="ivf", ivf_nlist=32, ivf_nprobe=4))
+        assert isinstance(rag.index, IVFIndex)
+        assert (rag.index.nlist, rag.index.nprobe) == (32, 4)
+        with pytest.raises(ValueError):
+            RAGConfig(index="hnsw")
+
+    @pytest.mark.asyncio
+    async def test_ivf_recall_against_exact(self):
+        """IVF trains once enough chunks are stored and finds the exact top-k."""
+        import numpy as np
+
+        from agent_framework import IVFIndex, RAGSystem
+
+        rng = np.random.default_rng(0)
+        vectors = self._clustered(2000, rng)
+        exact = RAGSystem(RAGConfig())
+        ivf = RAGSystem(RAGConfig(), index=IVFIndex(nlist=16, nprobe=4))
+
+        exact._store(["x"] * 300, vectors[:300])
+        ivf._store(["x"] * 300, vectors[:300])
+        await ivf._train_index()
+        assert not ivf.index.is_trained  # Below 16 * 39 rows: exact fallback
+        query = vectors[0]
+        assert list(ivf._search(query, 5)[0]) == list(exact._search(query, 5)[0])
+
+        for start in range(300, 2000, 425):
+            exact._store(["x"] * 425, vectors[start : start + 425])
+            ivf._store(["x"] * 425, vectors[start : start + 425])
+            await ivf._train_index()
+        assert ivf.get_stats()["index"]["trained"]
+        assert ivf.get_stats()["index"]["indexed"] == 2000
+
+        hits = 0
+        queries = vectors[rng.integers(0, 2000, 50)] + 0.3 * rng.standard_normal((50, 16))
+        for query in queries:
+            expected = set(exact._search(query, 5)[0])
+            indices, scores = ivf._search(query, 5)
+            hits += len(expected & set(indices))
+            assert np.all(np.diff(scores) <= 0)
+        assert hits / 250 >= 0.9
+
+        ivf.index.nprobe = 16  # Every cell: same as exact
+        assert list(ivf._search(query, 5)[0]) == list(exact._search(query, 5)[0])
+
+        ivf.clear()
+        assert not ivf.index.is_trained
+
+    @pytest.mark.asyncio
+    async def test_ivf_trains_off_the_event_loop(self):
+        """Training runs in a thread; chunks stored meanwhile are indexed once."""
+        import asyncio
+        import threading
+
+        import numpy as np
+
+        from agent_framework import IVFIndex, RAGSystem
+
+        stored = threading.Event()
+
+        class WaitingIVF(IVFIndex):
+            def train(self, embeddings):
+                assert stored.wait(5)  # Would deadlock if run on the loop
+                super().train(embeddings)
+
+        rng = np.random.default_rng(0)
+        vectors = self._clustered(800, rng)
+        rag = RAGSystem(RAGConfig(), index=WaitingIVF(nlist=16, nprobe=16))
+        rag._store(["x"] * 700, vectors[:700])
+        training = asyncio.create_task(rag._train_index())
+        await asyncio.sleep(0)
+
+        rag._store(["y"] * 100, vectors[700:])
+        await rag._train_index()  # Already training: no second copy
+        assert not rag.index.is_trained  # Still searching exactly
+        stored.set()
+        await training
+
+        assert rag.get_stats()["index"]["trained"]
+        assert rag.get_stats()["index"]["indexed"] == 800
+        assert list(rag._search(vectors[750], 1)[0]) == [750]
+
+    def test_custom_index(self):
+        """Any VectorIndex can be plugged into RAGSystem."""
+        import numpy as np
+
+        from agent_framework import RAGSystem, VectorIndex
+
+        class FirstRows(VectorIndex):
+            def add(self, embeddings, start):
+                self.added = len(embeddings)
+
+            def search(self, embeddings, query, k):
+                return np.arange(k), embeddings[:k] @ query
+
+            def reset(self):
+                self.added = 0
+
+        rag = RAGSystem(RAGConfig(), index=FirstRows())
+        rag._store(["a", "b", "c"], np.eye(3))
+        assert rag.index.added == 3
+        assert list(rag._search(np.ones(3), 2)[0]) == [0, 1]
+
+
 class TestUtilities:
     """Test utility functions."""
 
@@ -356,6 +1646,205 @@ class TestUtilities:
         assert confidence > 0.5
 
 
+class TestLatencyTracker:
+    """Test rolling latency percentiles."""
+
+    def test_percentiles(self):
+        """Percentiles are computed per key."""
+        from agent_framework import LatencyTracker
+
+        tracker = LatencyTracker()
+        for ms in range(1, 101):
+            tracker.record("GET /tickers", ms / 1000)
+
+        assert tracker.percentile("GET /tickers", 50) == pytest.approx(0.0505)
+        assert tracker.percentile("missing", 50) is None
+
+        summary = tracker.summary()["GET /tickers"]
+        assert summary["count"] == 100
+        assert summary["max_ms"] == pytest.approx(100.0)
+        assert summary["p50_ms"] <= summary["p99_ms"]
+
+    def test_window_is_bounded(self):
+        """Only the most recent samples are kept."""
+        from agent_framework import LatencyTracker
+
+        tracker = LatencyTracker(window=10)
+        for i in range(100):
+            tracker.record("key", float(i))
+
+        summary = tracker.summary()["key"]
+        assert summary["count"] == 100
+        assert summary["window"] == 10
+        assert tracker.percentile("key", 0) == 90.0
+
+    def test_histogram(self):
+        """Histogram counts windowed samples per bucket, ending in an open bucket."""
+        from agent_framework import LatencyTracker
+
+        tracker = LatencyTracker()
+        for ms in (5, 10, 11, 60000):
+            tracker.record("key", ms / 1000)
+
+        histogram = tracker.histogram("key", bounds_ms=(10, 100))
+        assert histogram == [
+            {"le_ms": 10.0, "count": 2},
+            {"le_ms": 100.0, "count": 1},
+            {"le_ms": "+Inf", "count": 1},
+        ]
+        assert tracker.histogram("missing") == []
+
+
+class TestStreamingAPI:
+    """Test the Server-Sent Events analysis endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_analyze_stream_sends_signal_event(self, test_db):
+        """Agents without an LLM stream just the final signal."""
+        httpx = pytest.importorskip("httpx")
+        from agent_framework import TickerIndex
+        from agent_framework.api import app, clear_agents, register_agent_instance
+
+        class AsyncTestAgent(Agent):
+            async def analyze(self, ticker: str, data: dict) -> Signal:
+                return SimpleTestAgent().analyze(ticker, data)
+
+        ticker = (await test_db.list_tickers())[0]
+        app.state.db = test_db
+        app.state.ticker_index = TickerIndex(test_db)
+        register_agent_instance("stream_test", AsyncTestAgent())
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/analyze/stream", json={"agent_name": "stream_test", "ticker": ticker}
+                )
+                missing = await client.post(
+                    "/analyze/stream", json={"agent_name": "missing", "ticker": ticker}
+                )
+        finally:
+            clear_agents()
+            del app.state.db, app.state.ticker_index
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = response.text.strip().split("\n\n")
+        assert events[-1].startswith("event: signal\ndata: ")
+        assert '"direction": ' in events[-1]
+        assert missing.status_code == 404
+
+
+class TestBatchAPI:
+    """Test POST /analyze/batch with a stub agent, database and ticker index."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        pytest.importorskip("httpx")
+        from fastapi.testclient import TestClient
+
+        from agent_framework.api import (
+            app,
+            clear_agents,
+            get_db,
+            get_ticker_index,
+            register_agent_instance,
+        )
+
+        class StubDB:
+            def __init__(self):
+                self.fundamentals_calls = []
+
+            async def get_fundamentals_many(self, tickers):
+                self.fundamentals_calls.append(list(tickers))
+                return {t: {"ticker": t, "pe_ratio": 10} for t in tickers}
+
+        class StubIndex:
+            async def exists(self, ticker):
+                return ticker in ("AAPL", "MSFT")
+
+        class CountingAgent(Agent):
+            def __init__(self):
+                super().__init__()
+                self.calls = []
+
+            async def analyze(self, ticker: str, data: dict) -> Signal:
+                self.calls.append(ticker)
+                return Signal(direction="bullish", confidence=0.7, reasoning=f"{ticker} cheap")
+
+        db, agent = StubDB(), CountingAgent()
+        app.dependency_overrides[get_db] = lambda: db
+        app.dependency_overrides[get_ticker_index] = lambda: StubIndex()
+        register_agent_instance("batch_test", agent)
+        monkeypatch.setenv("BATCH_MAX_ITEMS", "4")
+        try:
+            yield TestClient(app), db, agent
+        finally:
+            app.dependency_overrides.clear()
+            clear_agents()
+
+    def test_json_response_reports_failures_per_item(self, client):
+        """Unknown agents and tickers become item errors; the rest succeed."""
+        client, db, agent = client
+        response = client.post(
+            "/analyze/batch",
+            json={"agent_names": ["batch_test", "missing"], "tickers": ["AAPL", "XYZ"]},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["succeeded"], body["failed"]) == (1, 3)
+        results = {(r["agent_name"], r["ticker"]): r for r in body["results"]}
+        assert list(results) == [
+            ("batch_test", "AAPL"),
+            ("batch_test", "XYZ"),
+            ("missing", "AAPL"),
+            ("missing", "XYZ"),
+        ]
+        assert results[("batch_test", "AAPL")]["signal"]["direction"] == "bullish"
+        assert results[("batch_test", "XYZ")]["error"] == "Ticker XYZ not found"
+        assert results[("missing", "AAPL")]["error"] == "Agent missing not found"
+        assert db.fundamentals_calls == [["AAPL"]]  # One query for all known tickers
+        assert agent.calls == ["AAPL"]
+
+    def test_stream_returns_ndjson(self, client):
+        """stream=true sends one JSON result per line."""
+        import json
+
+        client, _, _ = client
+        response = client.post(
+            "/analyze/batch",
+            json={"agent_names": ["batch_test"], "tickers": ["AAPL", "MSFT"], "stream": True},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        items = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(item["ticker"] for item in items) == ["AAPL", "MSFT"]
+        assert all(item["error"] is None for item in items)
+
+    def test_duplicate_pairs_are_analyzed_once(self, client):
+        """Repeated agent names and tickers are deduplicated."""
+        client, _, agent = client
+        response = client.post(
+            "/analyze/batch",
+            json={"agent_names": ["batch_test", "batch_test"], "tickers": ["AAPL", "AAPL"]},
+        )
+
+        assert len(response.json()["results"]) == 1
+        assert agent.calls == ["AAPL"]
+
+    def test_too_many_pairs_rejected(self, client):
+        """More than BATCH_MAX_ITEMS pairs returns 400 before any analysis."""
+        client, _, agent = client
+        response = client.post(
+            "/analyze/batch",
+            json={"agent_names": ["batch_test"], "tickers": ["A", "B", "C", "D", "E"]},
+        )
+
+        assert response.status_code == 400
+        assert agent.calls == []
+
+
 class TestIntegration:
     """Integration tests."""
 